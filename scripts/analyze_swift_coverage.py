@@ -13,6 +13,16 @@ Usage:
 Options:
     --filter <pattern>    Only analyze files matching this pattern (e.g., "UseCases")
     --output <path>       Output file path (default: COVERAGE_REPORT.md in package dir)
+    --stream             Stream the export instead of loading it into memory
+    --merge              Merge every export found for the package (architectures, shards) first
+    --pack <path>         Read the analysis from a coverage pack (coverage_pack.py) instead of the export
+    --summary-only       Use llvm-cov's per-file summaries only; skip segment analysis
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --cache-dir <path>    Analysis cache directory (default: <package>/.build/coverage-cache)
+    --no-cache           Analyze every file from scratch without reading or writing the cache
+    --profile            Print per-phase timing and memory and write a JSON trace
+    --profile-trace <path> Where to write the trace (default: coverage_profile.json in package dir)
+    --profile-top <n>     Number of slowest files to list in the profile (default: 10)
     --help               Show this help message
 
 Examples:
@@ -24,156 +34,26 @@ Examples:
     
     # Specify output location
     python3 analyze_swift_coverage.py ios/Packages/Troop900Domain --output reports/domain_coverage.md
+    
+    # Keep memory flat on very large exports
+    python3 analyze_swift_coverage.py ios/Packages/Troop900Application --stream
+    
+    # Time each phase and list the slowest files
+    python3 analyze_swift_coverage.py ios/Packages/Troop900Application --profile --no-cache
 """
 
-import json
 import sys
 import argparse
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Optional
 
-def load_coverage_data(coverage_path: str) -> dict:
-    """Load the JSON coverage data file."""
-    try:
-        with open(coverage_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Error: Coverage data not found at {coverage_path}")
-        print("Make sure to run 'swift test --enable-code-coverage' first")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in coverage data: {e}")
-        sys.exit(1)
-
-def analyze_segments(segments: List) -> Tuple[int, int, int, int]:
-    """
-    Analyze coverage segments in detail.
-    Returns (covered_lines, total_lines, covered_branches, total_branches)
-    """
-    if not segments:
-        return 0, 0, 0, 0
-    
-    lines = {}  # line_num -> is_covered
-    branches = []
-    
-    for segment in segments:
-        line = segment[0]
-        col = segment[1]
-        count = segment[2]
-        is_region = segment[3]
-        has_count = segment[4]
-        
-        if line not in lines:
-            lines[line] = count > 0
-        else:
-            lines[line] = lines[line] or (count > 0)
-        
-        if is_region and has_count:
-            branches.append(count > 0)
-    
-    covered_lines = sum(1 for covered in lines.values() if covered)
-    total_lines = len(lines)
-    covered_branches = sum(1 for covered in branches if covered)
-    total_branches = len(branches)
-    
-    return covered_lines, total_lines, covered_branches, total_branches
-
-def should_include_file(filename: str, filter_pattern: Optional[str]) -> bool:
-    """Check if a file should be included based on the filter pattern."""
-    if not filter_pattern:
-        return True
-    return filter_pattern in filename
-
-def analyze_file_coverage(coverage_data: dict, package_name: str, filter_pattern: Optional[str] = None) -> Dict[str, Dict]:
-    """
-    Analyze coverage data and extract statistics for each file.
-    Returns a dictionary mapping file paths to coverage statistics.
-    """
-    results = {}
-    
-    data = coverage_data.get('data', [])
-    
-    for file_entry in data:
-        for file_data in file_entry.get('files', []):
-            filename = file_data.get('filename', '')
-            
-            # Only analyze files from the target package
-            if f'/Sources/{package_name}/' not in filename:
-                continue
-            
-            # Apply filter if specified
-            if not should_include_file(filename, filter_pattern):
-                continue
-            
-            # Extract relative path and categorize
-            parts = filename.split(f'/Sources/{package_name}/')
-            if len(parts) == 2:
-                relative_path = parts[1]
-                path_parts = relative_path.split('/')
-                
-                # Determine category (folder structure)
-                if len(path_parts) > 1:
-                    category = path_parts[0]
-                    file_name = Path(filename).stem
-                else:
-                    category = 'Root'
-                    file_name = Path(filename).stem
-                
-                # Get segments
-                segments = file_data.get('segments', [])
-                
-                # Analyze segments
-                covered_lines, total_lines, covered_branches, total_branches = analyze_segments(segments)
-                
-                # Calculate percentages
-                line_pct = (covered_lines / total_lines * 100) if total_lines > 0 else 100.0
-                branch_pct = (covered_branches / total_branches * 100) if total_branches > 0 else 100.0
-                
-                # Overall coverage (weighted average)
-                if total_lines > 0 and total_branches > 0:
-                    overall_pct = (line_pct * 0.5 + branch_pct * 0.5)
-                elif total_lines > 0:
-                    overall_pct = line_pct
-                elif total_branches > 0:
-                    overall_pct = branch_pct
-                else:
-                    overall_pct = 100.0
-                
-                # Identify uncovered regions
-                uncovered_regions = []
-                for segment in segments:
-                    line = segment[0]
-                    col = segment[1]
-                    count = segment[2]
-                    is_region = segment[3]
-                    has_count = segment[4]
-                    
-                    if is_region and has_count and count == 0:
-                        uncovered_regions.append({
-                            'line': line,
-                            'column': col
-                        })
-                
-                results[filename] = {
-                    'category': category,
-                    'name': file_name,
-                    'relative_path': relative_path,
-                    'line_coverage': {
-                        'covered': covered_lines,
-                        'total': total_lines,
-                        'percentage': line_pct
-                    },
-                    'branch_coverage': {
-                        'covered': covered_branches,
-                        'total': total_branches,
-                        'percentage': branch_pct
-                    },
-                    'overall_percentage': overall_pct,
-                    'uncovered_regions': uncovered_regions
-                }
-    
-    return results
+from coverage_core import (ENGINE_CHOICES, build_directory_tree, collect_coverage_stats, format_uncovered_range,
+                           iter_directory_tree, open_coverage_cache, require_coverage_file, uncovered_line_count,
+                           uncovered_region_count)
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import load_pack_stats
+from coverage_profile import DEFAULT_TOP_FILES, DEFAULT_TRACE_NAME, CoverageProfiler, profile_phase, save_profile
 
 def generate_report(coverage_stats: Dict[str, Dict], package_name: str, filter_pattern: Optional[str]) -> str:
     """Generate a formatted coverage report."""
@@ -221,11 +101,23 @@ def generate_report(coverage_stats: Dict[str, Dict], package_name: str, filter_p
     lines.append(f"Combined Coverage Score: {overall_pct:.1f}%")
     lines.append("")
     
+    # Directory roll-up, every level under Sources/<Package>/
+    lines.append("DIRECTORY TREE")
+    lines.append("-" * 100)
+    lines.append(f"{'Directory':<52} {'Files':>7} {'Lines':>12} {'Branches':>12} {'Overall':>9}")
+    tree = build_directory_tree(coverage_stats, package_name)
+    for depth, node in iter_directory_tree(tree):
+        label = f"{'  ' * depth}{node['name']}/"
+        lines.append(f"{label:<52} {node['files']:>7} {node['line_coverage']['percentage']:>11.1f}% "
+                     f"{node['branch_coverage']['percentage']:>11.1f}% {node['overall_percentage']:>8.1f}%")
+    lines.append("")
+    
     # Identify areas needing attention
     needs_attention = []
     for filepath, stats in coverage_stats.items():
         if stats['overall_percentage'] < 100.0:
-            needs_attention.append((stats['category'], stats['name'], stats['overall_percentage'], len(stats['uncovered_regions'])))
+            uncovered_count = stats['branch_coverage']['total'] - stats['branch_coverage']['covered']
+            needs_attention.append((stats['category'], stats['name'], stats['overall_percentage'], uncovered_count))
     
     if needs_attention:
         lines.append("⚠️  FILES WITH COVERAGE GAPS:")
@@ -267,12 +159,14 @@ def generate_report(coverage_stats: Dict[str, Dict], package_name: str, filter_p
             lines.append(f"   Branch Coverage: {branch_cov['covered']}/{branch_cov['total']} ({branch_cov['percentage']:.1f}%)")
             lines.append(f"   Overall Score:   {stats['overall_percentage']:.1f}%")
             
-            if stats['uncovered_regions']:
-                lines.append(f"   Uncovered Regions: {len(stats['uncovered_regions'])}")
-                for region in stats['uncovered_regions'][:5]:
-                    lines.append(f"      Line {region['line']}, Col {region['column']}")
-                if len(stats['uncovered_regions']) > 5:
-                    lines.append(f"      ... and {len(stats['uncovered_regions']) - 5} more")
+            uncovered = stats['uncovered_ranges']
+            if uncovered:
+                lines.append(f"   Uncovered: {len(uncovered)} range(s) over {uncovered_line_count(stats)} line(s), "
+                             f"{uncovered_region_count(stats)} region(s)")
+                for uncovered_range in uncovered[:5]:
+                    lines.append(f"      {format_uncovered_range(uncovered_range)}")
+                if len(uncovered) > 5:
+                    lines.append(f"      ... and {len(uncovered) - 5} more")
             
             lines.append("")
         
@@ -350,31 +244,6 @@ def generate_report(coverage_stats: Dict[str, Dict], package_name: str, filter_p
     
     return "\n".join(lines)
 
-def find_coverage_file(package_path: Path) -> Optional[Path]:
-    """Find the coverage JSON file for a package."""
-    # Try common build locations
-    build_dirs = [
-        package_path / '.build' / 'arm64-apple-macosx' / 'debug' / 'codecov',
-        package_path / '.build' / 'x86_64-apple-macosx' / 'debug' / 'codecov',
-        package_path / '.build' / 'debug' / 'codecov',
-    ]
-    
-    package_name = package_path.name
-    
-    for build_dir in build_dirs:
-        if build_dir.exists():
-            # Look for the package's coverage file
-            coverage_file = build_dir / f'{package_name}.json'
-            if coverage_file.exists():
-                return coverage_file
-            
-            # Fallback: look for any .json file
-            json_files = list(build_dir.glob('*.json'))
-            if json_files:
-                return json_files[0]
-    
-    return None
-
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze Swift code coverage data',
@@ -384,6 +253,20 @@ def main():
     parser.add_argument('package_path', help='Path to the Swift package directory')
     parser.add_argument('--filter', help='Only analyze files matching this pattern')
     parser.add_argument('--output', help='Output file path (default: COVERAGE_REPORT.md in package dir)')
+    parser.add_argument('--stream', action='store_true', help='Stream the export instead of loading it into memory')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+    parser.add_argument('--pack', help='Read the analysis from a coverage pack (coverage_pack.py) instead of the export')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Use llvm-cov's per-file summaries only; skip segment analysis")
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--cache-dir', help='Analysis cache directory (default: <package>/.build/coverage-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    parser.add_argument('--profile', action='store_true', help='Print per-phase timing and memory and write a JSON trace')
+    parser.add_argument('--profile-trace', help='Trace path (default: coverage_profile.json in package dir)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_FILES,
+                        help=f'Slowest files to list in the profile (default: {DEFAULT_TOP_FILES})')
     
     args = parser.parse_args()
     
@@ -395,32 +278,23 @@ def main():
     
     package_name = package_path.name
     
-    # Find coverage file
-    print(f"Looking for coverage data for {package_name}...")
-    coverage_file = find_coverage_file(package_path)
-    
-    if not coverage_file:
-        print(f"\nError: Coverage data not found for {package_name}")
-        print(f"Expected location: {package_path}/.build/.../codecov/{package_name}.json")
-        print("\nPlease run tests with coverage enabled first:")
-        print(f"  cd {package_path}")
-        print(f"  swift test --enable-code-coverage")
-        sys.exit(1)
-    
-    print(f"Found coverage data: {coverage_file}")
-    
-    print("Loading coverage data...")
-    coverage_data = load_coverage_data(str(coverage_file))
-    
-    print(f"Analyzing coverage for {package_name}...")
-    if args.filter:
-        print(f"Filtering files containing: '{args.filter}'")
-    
-    coverage_stats = analyze_file_coverage(coverage_data, package_name, args.filter)
+    # Find and analyze coverage file
+    profiler = CoverageProfiler(package_name, args.profile_top) if args.profile else None
+    if args.pack:
+        coverage_stats = load_pack_stats(Path(args.pack), package_name, args.filter, profiler)
+    else:
+        if args.merge:
+            coverage_file = require_merged_coverage_file(package_path, profiler)
+        else:
+            coverage_file = require_coverage_file(package_path, profiler)
+        cache = open_coverage_cache(package_path, args.cache_dir, not args.no_cache)
+        coverage_stats = collect_coverage_stats(coverage_file, package_name, args.filter, args.stream, cache,
+                                                args.engine, args.summary_only, profiler)
     
     print(f"Found {len(coverage_stats)} files\n")
     
-    report = generate_report(coverage_stats, package_name, args.filter)
+    with profile_phase(profiler, 'render_markdown'):
+        report = generate_report(coverage_stats, package_name, args.filter)
     print(report)
     
     # Save to file
@@ -434,5 +308,8 @@ def main():
     
     print(f"\nDetailed report saved to: {output_path}")
 
+    if profiler is not None:
+        save_profile(profiler, Path(args.profile_trace) if args.profile_trace else package_path / DEFAULT_TRACE_NAME)
+
 if __name__ == '__main__':
     main()
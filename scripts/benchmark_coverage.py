@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Benchmark
+
+Measures how the coverage scripts scale. For each export (synthetic exports from
+generate_synthetic_coverage.py at preset sizes, or real ones given with
+--export) every stage runs in a fresh process, which records:
+
+- wall_seconds      time spent in the stage itself
+- peak_rss_mb       the process's peak resident set size after the stage
+- setup_rss_mb      peak RSS before the stage started (inputs it depends on)
+- segments_per_sec  segments in the export / wall_seconds
+
+Stages:
+    load      load_coverage_data (json.load of the whole export)
+    analyze   analyze_file_coverage on the loaded export
+    stream    stream_file_coverage (streaming parse + analysis)
+    summary   stream_file_coverage with summary_only (llvm-cov summaries, no segments)
+    pack      coverage_stats from a coverage pack written beforehand (coverage_pack.py)
+    markdown  generate_report from the analysis results, written to /dev/null
+    html      write_html_report from the analysis results, to /dev/null
+
+Results are written as JSON. Pass the file from an earlier commit to --compare to
+see the change in time and memory per stage. The analysis cache is not used.
+
+Usage:
+    python3 benchmark_coverage.py [options]
+
+Options:
+    --size <list>         Comma-separated synthetic sizes: tiny, small, medium, large, huge
+                          (default: small,medium)
+    --export <path>       Benchmark an existing export instead (repeatable); the package
+                          name is taken from the file name, e.g. codecov/Troop900Domain.json
+    --stages <list>       Comma-separated stages (default: all)
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --repeat <n>          Run each stage n times and keep the fastest (default: 1)
+    --work-dir <path>     Where synthetic exports are written and kept (default: a temp dir)
+    --output <path>       Results file (default: coverage-benchmark.json)
+    --compare <path>      Earlier results file to compare against
+    --help               Show this help message
+
+Sizes:
+    tiny      10 files,        2k segments
+    small     100 files,      50k segments
+    medium    1k files,        1M segments
+    large     10k files,      10M segments
+    huge      50k files,     100M segments (several GB of JSON)
+
+Examples:
+    # Record a baseline, then compare a later commit against it
+    python3 benchmark_coverage.py --output /tmp/before.json
+    python3 benchmark_coverage.py --compare /tmp/before.json
+
+    # Only the analysis stages at 10M segments
+    python3 benchmark_coverage.py --size large --stages analyze,stream
+"""
+
+import io
+import json
+import os
+import sys
+import shutil
+import argparse
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from analyze_swift_coverage import generate_report
+from coverage_core import (ENGINE_CHOICES, analyze_file_coverage, load_coverage_data, parse_choices,
+                           stream_file_coverage)
+from coverage_pack import CoveragePack, write_coverage_pack
+from coverage_profile import peak_rss_mb, segment_count
+from coverage_stream import iter_export_files
+from generate_html_coverage import write_html_report
+from generate_synthetic_coverage import write_synthetic_export
+
+# name -> (files, segments)
+SIZES = {
+    'tiny': (10, 2_000),
+    'small': (100, 50_000),
+    'medium': (1_000, 1_000_000),
+    'large': (10_000, 10_000_000),
+    'huge': (50_000, 100_000_000),
+}
+
+STAGES = ['load', 'analyze', 'stream', 'summary', 'pack', 'markdown', 'html']
+
+SYNTHETIC_PACKAGE = 'Troop900Application'
+
+# Bump when the results layout changes
+RESULTS_VERSION = 1
+
+def run_stage(stage: str, coverage_file: str, package_name: str, engine: str = 'python') -> Dict:
+    """
+    Run one stage against an export and measure it. Runs in a fresh worker
+    process so each stage's peak RSS is its own.
+    """
+    with redirect_stdout(io.StringIO()):
+        data = stats = None
+        if stage in ('analyze', 'markdown', 'html'):
+            data = load_coverage_data(coverage_file)
+        if stage in ('markdown', 'html'):
+            stats = analyze_file_coverage(data, package_name, engine=engine)
+            data = None
+        if stage == 'pack':
+            fd, pack_path = tempfile.mkstemp(suffix='.covpack')
+            os.close(fd)
+            write_coverage_pack(Path(coverage_file), Path(pack_path), package_name, engine=engine)
+        setup_rss = peak_rss_mb()
+
+        started = time.perf_counter()
+        if stage == 'load':
+            data = load_coverage_data(coverage_file)
+        elif stage == 'analyze':
+            stats = analyze_file_coverage(data, package_name, engine=engine)
+        elif stage == 'stream':
+            stats = stream_file_coverage(coverage_file, package_name, engine=engine)
+        elif stage == 'summary':
+            stats = stream_file_coverage(coverage_file, package_name, summary_only=True)
+        elif stage == 'pack':
+            with CoveragePack(Path(pack_path)) as pack:
+                stats = pack.coverage_stats()
+        elif stage == 'markdown':
+            with open(os.devnull, 'w') as f:
+                f.write(generate_report(stats, package_name, None))
+        elif stage == 'html':
+            write_html_report(stats, package_name, None, os.devnull)
+        wall = time.perf_counter() - started
+        if stage == 'pack':
+            os.unlink(pack_path)
+
+    return {'wall_seconds': wall, 'peak_rss_mb': peak_rss_mb(), 'setup_rss_mb': setup_rss}
+
+def count_export(coverage_file: Path, package_name: str) -> Dict:
+    """Count file entries and segments in an export without decoding them."""
+    files = source_files = segments = 0
+    for entry in iter_export_files(str(coverage_file), raw=True):
+        files += 1
+        if f'/Sources/{package_name}/' in entry['filename']:
+            source_files += 1
+        segments += segment_count(entry.get('segments', '[]'))
+    return {'files': files, 'source_files': source_files, 'segments': segments,
+            'bytes': coverage_file.stat().st_size}
+
+def benchmark_export(coverage_file: Path, package_name: str, export_info: Dict, stages: List[str],
+                     engine: str = 'python', repeat: int = 1) -> Dict:
+    """Run each stage `repeat` times in fresh processes and keep the fastest run."""
+    results = {}
+    for stage in stages:
+        best = None
+        for _ in range(max(1, repeat)):
+            with ProcessPoolExecutor(max_workers=1) as worker:
+                measured = worker.submit(run_stage, stage, str(coverage_file), package_name, engine).result()
+            if best is None or measured['wall_seconds'] < best['wall_seconds']:
+                best = measured
+        best['segments_per_sec'] = export_info['segments'] / best['wall_seconds'] if best['wall_seconds'] > 0 else None
+        results[stage] = best
+        rss = f"{best['peak_rss_mb']:.0f} MB" if best['peak_rss_mb'] is not None else 'n/a'
+        print(f"  {stage:<9} {best['wall_seconds']:>9.3f}s  {rss:>9} peak  "
+              f"{(best['segments_per_sec'] or 0) / 1e6:>7.2f}M segments/s")
+    return results
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository, if available."""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(Path(__file__).parent),
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def format_comparison(results: Dict, baseline: Dict) -> str:
+    """Per-stage change in wall time and peak RSS against an earlier results file."""
+    lines = []
+    lines.append(f"Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')})")
+    lines.append(f"{'Run':<12} {'Stage':<9} {'Before':>9} {'After':>9} {'Time':>8} {'Peak RSS':>9}")
+    lines.append("-" * 62)
+
+    def change(before, after):
+        if not before or after is None:
+            return '-'
+        return f"{(after - before) / before * 100:+.1f}%"
+
+    for name, run in results['runs'].items():
+        previous = baseline.get('runs', {}).get(name)
+        if previous is None:
+            continue
+        for stage, measured in run['stages'].items():
+            before = previous['stages'].get(stage)
+            if before is None:
+                continue
+            lines.append(
+                f"{name:<12} {stage:<9} {before['wall_seconds']:>8.3f}s {measured['wall_seconds']:>8.3f}s "
+                f"{change(before['wall_seconds'], measured['wall_seconds']):>8} "
+                f"{change(before['peak_rss_mb'], measured['peak_rss_mb']):>9}"
+            )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Swift coverage scripts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--size', type=parse_choices(SIZES), default=['small', 'medium'],
+                        help=f"Comma-separated synthetic sizes: {', '.join(SIZES)} (default: small,medium)")
+    parser.add_argument('--export', action='append', default=[], help='Benchmark an existing export instead')
+    parser.add_argument('--stages', type=parse_choices(STAGES), default=STAGES,
+                        help=f"Comma-separated stages: {', '.join(STAGES)} (default: all)")
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per stage, fastest kept (default: 1)')
+    parser.add_argument('--work-dir', help='Where synthetic exports are written and kept (default: a temp dir)')
+    parser.add_argument('--output', default='coverage-benchmark.json',
+                        help='Results file (default: coverage-benchmark.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read {args.compare}: {e}")
+            sys.exit(1)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'runs': {},
+    }
+
+    work_dir = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='coverage-benchmark-'))
+    try:
+        if args.export:
+            runs = []
+            for export in args.export:
+                coverage_file = Path(export)
+                if not coverage_file.exists():
+                    print(f"Error: Export not found: {coverage_file}")
+                    sys.exit(1)
+                print(f"Counting segments in {coverage_file}...")
+                runs.append((coverage_file.stem, coverage_file, coverage_file.stem,
+                             count_export(coverage_file, coverage_file.stem)))
+        else:
+            runs = []
+            for size in args.size:
+                files, segments = SIZES[size]
+                coverage_file = work_dir / size / f'{SYNTHETIC_PACKAGE}.json'
+                print(f"Generating {size} export ({files:,} files, {segments:,} segments)...")
+                info = write_synthetic_export(coverage_file, SYNTHETIC_PACKAGE, files, segments)
+                runs.append((size, coverage_file, SYNTHETIC_PACKAGE, info))
+
+        for name, coverage_file, package_name, info in runs:
+            print("")
+            print(f"{name}: {info['files']:,} files, {info['segments']:,} segments, "
+                  f"{info['bytes'] / (1024 * 1024):.1f} MB")
+            stages = benchmark_export(coverage_file, package_name, info, args.stages, args.engine, args.repeat)
+            results['runs'][name] = {'export': info, 'stages': stages}
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print("")
+    print(f"✅ Results saved to: {args.output}")
+
+    if baseline is not None:
+        print("")
+        print(format_comparison(results, baseline))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Orchestrator
+
+Analyzes several Swift packages concurrently in a process pool and prints one
+summary table. Each package's export is parsed once and rendered to the
+requested formats, exactly as coverage_report.py would. The exit status is 1
+if any package fails, else 2 if, with --thresholds, any misses a threshold.
+
+With --run-tests the tests and the analysis are pipelined: a bounded pool runs
+`swift test --enable-code-coverage` per package, and each package's analysis
+starts as soon as its own tests finish, while other packages are still testing.
+
+Usage:
+    python3 coverage_all.py [PACKAGE ...] [options]
+
+    PACKAGE: Package names to analyze (default: all six Troop900 packages)
+
+Options:
+    --packages-dir <path> Directory containing the packages (default: ios/Packages)
+    --format <list>       Comma-separated formats: markdown, html, json, summary (default: markdown,html,summary)
+    --filter <pattern>    Only analyze files matching this pattern
+    --stream             Stream exports instead of loading them into memory
+    --merge              Merge every export found for each package (architectures, shards) first
+    --summary-only       Use llvm-cov's per-file summaries only; skip segment analysis
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --jobs <n>            Number of analysis worker processes (default: CPU count)
+    --run-tests          Run each package's tests before analyzing it
+    --test-jobs <n>       Number of test processes run at once (default: 1)
+    --test-command <cmd>  Test command run in each package directory
+                          (default: $COVERAGE_TEST_COMMAND or "swift test --enable-code-coverage")
+    --cache-dir <path>    Analysis cache directory (default: <package>/.build/coverage-cache)
+    --no-cache           Analyze every file from scratch without reading or writing the cache
+    --profile            Profile each package and write coverage_profile.json to its directory
+    --profile-top <n>     Number of slowest files to list per package (default: 10)
+    --history <path>      Also record each package's run in a coverage history database
+    --thresholds <path>   Check each package against a threshold file (coverage_thresholds.py)
+    --help               Show this help message
+
+Examples:
+    # All packages, all cores
+    python3 coverage_all.py
+
+    # Two packages, JSON only
+    python3 coverage_all.py Troop900Domain Troop900Data --format json
+
+    # Test and analyze everything, two test processes at a time
+    python3 coverage_all.py --run-tests --test-jobs 2
+
+    # Exercise the scheduler on Linux with a stand-in for swift test
+    python3 coverage_all.py --run-tests --test-command "sleep 2"
+
+    # Per-phase timing and memory for every package
+    python3 coverage_all.py --profile
+
+    # Gate CI on the checked-in thresholds
+    python3 coverage_all.py --thresholds ios/Packages/coverage-thresholds.json
+"""
+
+import io
+import os
+import sys
+import time
+import shlex
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from coverage_core import (ENGINE_CHOICES, collect_coverage_stats, coverage_level, open_coverage_cache,
+                           require_coverage_file, summarize_coverage)
+from coverage_history import CoverageHistory, git_commit
+from coverage_merge import require_merged_coverage_file
+from coverage_profile import DEFAULT_TOP_FILES, DEFAULT_TRACE_NAME, CoverageProfiler, format_profile
+from coverage_report import DEFAULT_FORMATS, REPORT_FORMATS, parse_formats, write_reports
+from coverage_thresholds import VIOLATION_EXIT_STATUS, check_thresholds, format_violations, load_thresholds
+
+PACKAGES = [
+    'Troop900Application',
+    'Troop900Domain',
+    'Troop900Data',
+    'Troop900Presentation',
+    'Troop900DesignSystem',
+    'Troop900Bootstrap',
+]
+
+DEFAULT_PACKAGES_DIR = Path(__file__).resolve().parent.parent / 'ios' / 'Packages'
+
+DEFAULT_TEST_COMMAND = os.environ.get('COVERAGE_TEST_COMMAND', 'swift test --enable-code-coverage')
+
+# Lines of test output shown when a package's tests fail
+TEST_LOG_TAIL = 20
+
+def coverage_status(overall_pct: float) -> str:
+    """Status marker matching run_coverage.sh's summary levels."""
+    return coverage_level(overall_pct)['marker']
+
+def analyze_package(package_path: str, formats: List[str], filter_pattern: Optional[str] = None,
+                    stream: bool = False, cache_dir: Optional[str] = None, use_cache: bool = True,
+                    engine: str = 'python', summary_only: bool = False, profile: bool = False,
+                    profile_top: int = DEFAULT_TOP_FILES, merge: bool = False,
+                    history: Optional[str] = None, thresholds: Optional[Dict] = None,
+                    return_stats: bool = False) -> Dict:
+    """
+    Analyze one package and write its reports. Runs inside a worker process.
+    Console output is captured so concurrent packages don't interleave.
+    With profile, the trace is written to the package directory and returned as result['profile'].
+    With history, the run is recorded in that database; workers take turns writing.
+    With parsed thresholds, result['violations'] lists the ones the package misses.
+    With return_stats, result['stats'] holds the per-file statistics.
+    """
+    path = Path(package_path)
+    log = io.StringIO()
+    result = {'package': path.name, 'ok': False, 'summary': None, 'reports': {}, 'error': None, 'profile': None,
+              'violations': [], 'stats': None}
+    profiler = CoverageProfiler(path.name, profile_top) if profile else None
+
+    try:
+        with redirect_stdout(log):
+            if not path.exists():
+                print(f"Error: Package path does not exist: {path}")
+                sys.exit(1)
+            if merge:
+                coverage_file = require_merged_coverage_file(path, profiler)
+            else:
+                coverage_file = require_coverage_file(path, profiler)
+            cache = open_coverage_cache(path, cache_dir, use_cache)
+            coverage_stats = collect_coverage_stats(coverage_file, path.name, filter_pattern, stream, cache,
+                                                    engine, summary_only, profiler)
+            written = write_reports(coverage_stats, path.name, filter_pattern, formats, path, profiler)
+            if history:
+                with CoverageHistory(Path(history)) as database:
+                    database.record_run(path.name, coverage_stats, git_commit(path), filter_pattern=filter_pattern)
+        result['summary'] = summarize_coverage(coverage_stats)
+        if return_stats:
+            result['stats'] = coverage_stats
+        result['reports'] = {name: str(output_path) for name, output_path in written.items()}
+        if thresholds is not None:
+            result['violations'] = check_thresholds(coverage_stats, path.name, thresholds)
+        result['ok'] = True
+        if profiler is not None:
+            result['profile'] = profiler.to_dict()
+            result['profile']['trace'] = str(profiler.write_trace(path / DEFAULT_TRACE_NAME))
+    except SystemExit:
+        errors = [line.strip() for line in log.getvalue().splitlines() if line.strip().startswith('Error')]
+        result['error'] = errors[0] if errors else 'Analysis failed'
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['log'] = log.getvalue()
+    return result
+
+def run_package_tests(package_path: Path, test_command: str) -> Dict:
+    """Run the test command in a package directory. Runs on a test pool thread."""
+    started = time.monotonic()
+    try:
+        completed = subprocess.run(shlex.split(test_command), cwd=str(package_path),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True)
+        returncode, output = completed.returncode, completed.stdout
+    except OSError as e:
+        returncode, output = 127, f"{e}\n"
+    return {
+        'ok': returncode == 0,
+        'returncode': returncode,
+        'duration': time.monotonic() - started,
+        'output': output,
+    }
+
+def run_packages(package_paths: List[Path], formats: List[str], filter_pattern: Optional[str] = None,
+                 stream: bool = False, jobs: Optional[int] = None, test_command: Optional[str] = None,
+                 test_jobs: int = 1, cache_dir: Optional[str] = None, use_cache: bool = True,
+                 engine: str = 'python', summary_only: bool = False, profile: bool = False,
+                 profile_top: int = DEFAULT_TOP_FILES, merge: bool = False,
+                 history: Optional[str] = None, thresholds: Optional[Dict] = None,
+                 return_stats: bool = False) -> List[Dict]:
+    """
+    Analyze packages in a process pool; results are returned in input order.
+
+    When test_command is given, tests run first on a pool of test_jobs threads
+    and each package is handed to the analysis pool the moment its tests pass.
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(package_paths)))
+    results = {}
+    pending = {}
+    test_seconds = {}
+
+    # Analysis workers are spawned, not forked: a worker forked while a test
+    # thread is starting a subprocess inherits that subprocess's exec-status
+    # pipe, and the test thread then waits on it forever.
+    with ThreadPoolExecutor(max_workers=max(1, test_jobs)) as tests, \
+            ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as analysis:
+
+        def start_analysis(path: Path):
+            future = analysis.submit(analyze_package, str(path), formats, filter_pattern, stream,
+                                     cache_dir, use_cache, engine, summary_only, profile, profile_top,
+                                     merge, history, thresholds, return_stats)
+            pending[future] = ('analysis', path)
+
+        for path in package_paths:
+            if test_command and path.exists():
+                pending[tests.submit(run_package_tests, path, test_command)] = ('tests', path)
+            else:
+                start_analysis(path)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, path = pending.pop(future)
+                if stage == 'tests':
+                    test_result = future.result()
+                    test_seconds[path.name] = test_result['duration']
+                    if test_result['ok']:
+                        print(f"✓ {path.name} tests passed ({test_result['duration']:.1f}s)")
+                        start_analysis(path)
+                        continue
+                    print(f"✗ {path.name} tests failed (exit {test_result['returncode']})")
+                    for line in test_result['output'].splitlines()[-TEST_LOG_TAIL:]:
+                        print(f"    {line}")
+                    results[path.name] = {
+                        'package': path.name, 'ok': False, 'summary': None, 'reports': {},
+                        'error': f"Tests failed (exit {test_result['returncode']})",
+                        'log': test_result['output'], 'violations': [], 'stats': None,
+                    }
+                    continue
+
+                result = future.result()
+                if result['profile'] is not None and path.name in test_seconds:
+                    result['profile']['test_seconds'] = test_seconds[path.name]
+                marker = '✓' if result['ok'] else '✗'
+                print(f"{marker} {result['package']}")
+                results[path.name] = result
+
+    return [results[path.name] for path in package_paths]
+
+def format_summary_table(results: List[Dict]) -> str:
+    """Render the combined per-package summary table."""
+    lines = []
+    lines.append(f"{'Package':<24} {'Files':>6} {'Overall':>8} {'Line':>8} {'Branch':>8}  Status")
+    lines.append("-" * 72)
+
+    for result in results:
+        if not result['ok']:
+            lines.append(f"{result['package']:<24} {'-':>6} {'-':>8} {'-':>8} {'-':>8}  ✗ {result['error']}")
+            continue
+        summary = result['summary']
+        overall = summary['overall_percentage']
+        lines.append(
+            f"{result['package']:<24} {summary['files']:>6} {overall:>7.1f}% "
+            f"{summary['line_coverage']['percentage']:>7.1f}% {summary['branch_coverage']['percentage']:>7.1f}%  "
+            f"{coverage_status(overall)}"
+        )
+
+    return "\n".join(lines)
+
+def format_profiles(results: List[Dict]) -> str:
+    """Render each profiled package's trace, slowest package first."""
+    profiled = sorted((result for result in results if result.get('profile')),
+                      key=lambda result: result['profile']['total_seconds'], reverse=True)
+    sections = []
+    for result in profiled:
+        trace = result['profile']
+        section = format_profile(trace)
+        if 'test_seconds' in trace:
+            section += f"\nTests: {trace['test_seconds']:.3f}s before analysis"
+        sections.append(section + f"\nTrace: {trace['trace']}")
+    return "\n\n".join(sections)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Analyze Swift package coverage in parallel',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('packages', nargs='*', help='Package names (default: all packages)')
+    parser.add_argument('--packages-dir', default=str(DEFAULT_PACKAGES_DIR),
+                        help='Directory containing the packages (default: ios/Packages)')
+    parser.add_argument('--format', type=parse_formats, default=DEFAULT_FORMATS,
+                        help=f"Comma-separated formats: {', '.join(REPORT_FORMATS)} (default: {','.join(DEFAULT_FORMATS)})")
+    parser.add_argument('--filter', help='Only analyze files matching this pattern')
+    parser.add_argument('--stream', action='store_true', help='Stream exports instead of loading them into memory')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for each package (architectures, shards) first')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Use llvm-cov's per-file summaries only; skip segment analysis")
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--cache-dir', help='Analysis cache directory (default: <package>/.build/coverage-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    parser.add_argument('--jobs', type=int, help='Number of analysis worker processes (default: CPU count)')
+    parser.add_argument('--run-tests', action='store_true', help="Run each package's tests before analyzing it")
+    parser.add_argument('--test-jobs', type=int, default=1, help='Number of test processes run at once (default: 1)')
+    parser.add_argument('--test-command', default=DEFAULT_TEST_COMMAND,
+                        help='Test command run in each package directory (default: swift test --enable-code-coverage)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each package and write coverage_profile.json to its directory')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_FILES,
+                        help=f'Slowest files to list per package (default: {DEFAULT_TOP_FILES})')
+    parser.add_argument('--history', help="Also record each package's run in a coverage history database")
+    parser.add_argument('--thresholds', help='Check each package against a threshold file (coverage_thresholds.py)')
+
+    args = parser.parse_args()
+
+    thresholds = None
+    if args.thresholds:
+        try:
+            thresholds = load_thresholds(Path(args.thresholds))
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid thresholds file {args.thresholds}: {e}")
+            sys.exit(1)
+
+    packages_dir = Path(args.packages_dir).resolve()
+    package_paths = [packages_dir / name for name in (args.packages or PACKAGES)]
+
+    print(f"Analyzing {len(package_paths)} package(s)...")
+    test_command = args.test_command if args.run_tests else None
+    results = run_packages(package_paths, args.format, args.filter, args.stream, args.jobs,
+                           test_command, args.test_jobs, args.cache_dir, not args.no_cache, args.engine,
+                           args.summary_only, args.profile, args.profile_top, args.merge, args.history,
+                           thresholds)
+
+    print("")
+    print(format_summary_table(results))
+
+    if args.profile:
+        print("")
+        print(format_profiles(results))
+
+    violations = [violation for result in results for violation in result['violations']]
+    if violations:
+        print("")
+        print(format_violations(violations))
+
+    failed = [result['package'] for result in results if not result['ok']]
+    gated = sorted({violation['package'] for violation in violations})
+    print("")
+    if failed:
+        print(f"Failed: {len(failed)} of {len(results)} package(s)")
+    if gated:
+        print(f"Below thresholds: {', '.join(gated)}")
+    if failed:
+        sys.exit(1)
+    if gated:
+        sys.exit(VIOLATION_EXIT_STATUS)
+    print(f"All {len(results)} package(s) analyzed successfully")
+
+if __name__ == '__main__':
+    main()
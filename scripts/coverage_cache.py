@@ -0,0 +1,128 @@
+"""
+Persistent on-disk cache for coverage analysis.
+
+Two kinds of entries are stored, both as small JSON files:
+
+- Per-file results, keyed by package plus a hash of the file entry's segments.
+  Unchanged source files reuse their `line_coverage`, `branch_coverage`,
+  `overall_percentage` and `uncovered_ranges` instead of being re-analyzed.
+- Whole-export results, keyed by the export's path, mtime and size (plus the
+  filter). When the export hasn't changed at all, parsing is skipped entirely.
+
+Entries live under `<cache_dir>/<package>/` and are written atomically, so
+several orchestrator workers can share one cache directory. Every hit touches
+the entry's mtime; when the directory grows past its size budget, the least
+recently used entries are evicted first.
+
+Usage:
+    from coverage_cache import CoverageCache
+
+    cache = CoverageCache(package_path / '.build' / 'coverage-cache', package_name)
+    stats = cache.get(cache.file_key(segments))
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# Bump whenever the analysis output changes so stale entries are never reused
+CACHE_VERSION = '2'
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_cache_dir(package_path: Path) -> Path:
+    """Default cache location, inside the package's (untracked) build directory."""
+    return package_path / '.build' / 'coverage-cache'
+
+class CoverageCache:
+    """Content-addressed JSON cache for one package, with LRU size-bounded eviction."""
+
+    def __init__(self, cache_dir: Path, package_name: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.package_dir = self.cache_dir / package_name
+        self.package_name = package_name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _hash(self, *parts: Union[str, bytes]) -> str:
+        digest = hashlib.sha1(f'{CACHE_VERSION}\0{self.package_name}\0'.encode('utf-8'))
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def file_key(self, segments: Union[str, List]) -> str:
+        """
+        Key for one file entry's analysis. Accepts decoded segments or the raw
+        JSON text from the streaming reader; both hash to the same key.
+        """
+        if isinstance(segments, str):
+            # Segments hold only numbers and booleans, so whitespace is insignificant
+            text = ''.join(segments.split())
+        else:
+            text = json.dumps(segments, separators=(',', ':'))
+        return 'f-' + self._hash(text)
+
+    def export_key(self, coverage_file: Path, filter_pattern: Optional[str] = None) -> str:
+        """Key for a whole export's results, based on its path, mtime and size."""
+        stat = os.stat(coverage_file)
+        return 'x-' + self._hash(str(Path(coverage_file).resolve()), str(stat.st_mtime_ns),
+                                 str(stat.st_size), filter_pattern or '')
+
+    def _path(self, key: str) -> Path:
+        return self.package_dir / key[2:4] / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached value, marking it as recently used, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict):
+        """Store a value atomically; cache write failures are not fatal."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes. Returns entries removed."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        if total <= self.max_bytes:
+            return removed
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            if total <= self.max_bytes:
+                break
+        return removed
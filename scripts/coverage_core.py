@@ -0,0 +1,618 @@
+"""
+Shared core for the Swift coverage tools.
+
+Finds, loads and analyzes the llvm-cov export for a package exactly once and
+returns the per-file statistics model that every report renderer consumes.
+`analyze_swift_coverage.py`, `generate_html_coverage.py` and
+`coverage_report.py` all import from here.
+
+Usage:
+    from coverage_core import require_coverage_file, collect_coverage_stats, open_coverage_cache
+
+    coverage_file = require_coverage_file(package_path)
+    cache = open_coverage_cache(package_path)
+    coverage_stats = collect_coverage_stats(coverage_file, package_name, cache=cache)
+"""
+
+import json
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+
+from coverage_cache import CoverageCache, default_cache_dir
+from coverage_profile import CoverageProfiler, profile_phase, segment_count
+from coverage_segments import (SegmentResult, analyze_segments_array, analyze_segments_numpy,
+                               merge_uncovered_segments, np)
+from coverage_stream import iter_export_files
+
+def load_coverage_data(coverage_path: str) -> dict:
+    """Load the JSON coverage data file."""
+    try:
+        with open(coverage_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Coverage data not found at {coverage_path}")
+        print("Make sure to run 'swift test --enable-code-coverage' first")
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+
+def analyze_segments(segments: List) -> Tuple[int, int, int, int]:
+    """
+    Analyze coverage segments in detail.
+    Returns (covered_lines, total_lines, covered_branches, total_branches)
+    """
+    if not segments:
+        return 0, 0, 0, 0
+    
+    lines = {}  # line_num -> is_covered
+    branches = []
+    
+    for segment in segments:
+        line = segment[0]
+        col = segment[1]
+        count = segment[2]
+        is_region = segment[3]
+        has_count = segment[4]
+        
+        if line not in lines:
+            lines[line] = count > 0
+        else:
+            lines[line] = lines[line] or (count > 0)
+        
+        if is_region and has_count:
+            branches.append(count > 0)
+    
+    covered_lines = sum(1 for covered in lines.values() if covered)
+    total_lines = len(lines)
+    covered_branches = sum(1 for covered in branches if covered)
+    total_branches = len(branches)
+    
+    return covered_lines, total_lines, covered_branches, total_branches
+
+def analyze_segments_python(segments: Union[str, List]) -> SegmentResult:
+    """Reference engine: analyze_segments plus the uncovered range merge."""
+    if isinstance(segments, str):
+        segments = json.loads(segments)
+    covered_lines, total_lines, covered_branches, total_branches = analyze_segments(segments)
+    uncovered = merge_uncovered_segments(segments)
+    return covered_lines, total_lines, covered_branches, total_branches, uncovered
+
+# Segment analysis engines; see coverage_segments.py for the columnar ones
+SEGMENT_ENGINES = {
+    'python': analyze_segments_python,
+    'array': analyze_segments_array,
+}
+if np is not None:
+    SEGMENT_ENGINES['numpy'] = analyze_segments_numpy
+
+ENGINE_CHOICES = ['python', 'array', 'numpy']
+
+def select_segment_engine(engine: str = 'python'):
+    """Look up a segment analysis engine by name, exiting if it isn't available."""
+    if engine not in SEGMENT_ENGINES:
+        print(f"Error: Segment engine '{engine}' is not available (is NumPy installed?)")
+        sys.exit(1)
+    return SEGMENT_ENGINES[engine]
+
+def parse_choices(choices: Iterable[str]) -> Callable[[str], List[str]]:
+    """argparse type for a comma-separated, non-empty subset of choices (e.g. report formats)."""
+    choices = list(choices)
+
+    def parse(value: str) -> List[str]:
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in choices]
+        if unknown or not names:
+            raise argparse.ArgumentTypeError(
+                f"unknown value(s): {', '.join(unknown) or 'none given'} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+def should_include_file(filename: str, filter_pattern: Optional[str]) -> bool:
+    """Check if a file should be included based on the filter pattern."""
+    if not filter_pattern:
+        return True
+    return filter_pattern in filename
+
+def build_file_stats(covered_lines: int, total_lines: int, covered_branches: int, total_branches: int,
+                     uncovered_ranges: List[Dict]) -> Dict:
+    """Assemble one file's statistics from its line and branch (region) counts."""
+    # Calculate percentages
+    line_pct = (covered_lines / total_lines * 100) if total_lines > 0 else 100.0
+    branch_pct = (covered_branches / total_branches * 100) if total_branches > 0 else 100.0
+    
+    # Overall coverage (weighted average)
+    if total_lines > 0 and total_branches > 0:
+        overall_pct = (line_pct * 0.5 + branch_pct * 0.5)
+    elif total_lines > 0:
+        overall_pct = line_pct
+    elif total_branches > 0:
+        overall_pct = branch_pct
+    else:
+        overall_pct = 100.0
+    
+    return {
+        'line_coverage': {
+            'covered': covered_lines,
+            'total': total_lines,
+            'percentage': line_pct
+        },
+        'branch_coverage': {
+            'covered': covered_branches,
+            'total': total_branches,
+            'percentage': branch_pct
+        },
+        'overall_percentage': overall_pct,
+        'uncovered_ranges': uncovered_ranges
+    }
+
+def analyze_segment_stats(segments: Union[str, List], engine: str = 'python') -> Dict:
+    """
+    Compute one file's coverage statistics from its segments, which may be
+    decoded or raw JSON text. This is the per-file result the cache stores.
+    """
+    analyze = select_segment_engine(engine)
+    covered_lines, total_lines, covered_branches, total_branches, uncovered = analyze(segments)
+    uncovered_ranges = [{'line': line, 'column': col, 'end_line': end_line, 'end_column': end_col, 'regions': regions}
+                        for line, col, end_line, end_col, regions in uncovered]
+    return build_file_stats(covered_lines, total_lines, covered_branches, total_branches, uncovered_ranges)
+
+def format_uncovered_range(uncovered: Dict) -> str:
+    """`Lines 10:5-24:2 (4 regions)`; the end position is exclusive."""
+    regions = uncovered['regions']
+    lines = 'Line' if uncovered['line'] == uncovered['end_line'] else 'Lines'
+    return (f"{lines} {uncovered['line']}:{uncovered['column']}-{uncovered['end_line']}:{uncovered['end_column']} "
+            f"({regions} region{'' if regions == 1 else 's'})")
+
+def uncovered_region_count(stats: Dict) -> int:
+    """Number of never-executed regions in a file's uncovered ranges."""
+    return sum(uncovered['regions'] for uncovered in stats['uncovered_ranges'])
+
+def uncovered_line_count(stats: Dict) -> int:
+    """
+    Number of source lines a file's uncovered ranges span, each counted once.
+    A range ending at column 1 stops on the line before its end.
+    """
+    total = previous = 0
+    for uncovered in stats['uncovered_ranges']:
+        last = uncovered['end_line']
+        if uncovered['end_column'] <= 1 and last > uncovered['line']:
+            last -= 1
+        first = max(uncovered['line'], previous + 1)
+        if last >= first:
+            total += last - first + 1
+        previous = max(previous, last)
+    return total
+
+def summary_file_stats(summary: Dict) -> Dict:
+    """
+    Compute one file's statistics from llvm-cov's own per-file `summary` block
+    instead of its segments. Lines and regions are counted by llvm-cov, so they
+    can differ slightly from the segment analysis, and uncovered ranges are
+    unknown.
+    """
+    lines = summary.get('lines') or {}
+    regions = summary.get('regions') or {}
+    return build_file_stats(lines.get('covered', 0), lines.get('count', 0),
+                            regions.get('covered', 0), regions.get('count', 0), [])
+
+def classify_source_file(filename: str, package_name: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a package source path into (category, name, relative_path), where
+    category is the top-level folder under Sources/<Package>/ ('Root' for
+    files directly in it). Returns None for paths outside the package sources.
+    """
+    parts = filename.split(f'/Sources/{package_name}/')
+    if len(parts) != 2:
+        return None
+    relative_path = parts[1]
+    path_parts = relative_path.split('/')
+    
+    # Determine category (folder structure)
+    category = path_parts[0] if len(path_parts) > 1 else 'Root'
+    return category, Path(filename).stem, relative_path
+
+def analyze_file_coverage(coverage_data: dict, package_name: str, filter_pattern: Optional[str] = None,
+                          cache: Optional[CoverageCache] = None, engine: str = 'python',
+                          profiler: Optional[CoverageProfiler] = None) -> Dict[str, Dict]:
+    """
+    Analyze coverage data and extract statistics for each file.
+    Returns a dictionary mapping file paths to coverage statistics.
+    """
+    data = coverage_data.get('data', [])
+    file_entries = (file_data for file_entry in data for file_data in file_entry.get('files', []))
+    return analyze_file_entries(file_entries, package_name, filter_pattern, cache, engine, profiler=profiler)
+
+def analyze_file_entries(file_entries: Iterable[dict], package_name: str, filter_pattern: Optional[str] = None,
+                         cache: Optional[CoverageCache] = None, engine: str = 'python',
+                         summary_only: bool = False,
+                         profiler: Optional[CoverageProfiler] = None) -> Dict[str, Dict]:
+    """
+    Analyze an iterable of `files[]` entries, one entry at a time.
+    Accepts entries from a loaded export or from the streaming reader, whose
+    segments may still be raw JSON text. With a cache, files whose segments
+    are unchanged reuse their stored statistics. With summary_only, each
+    file's `summary` block is used and segments are ignored. A profiler
+    records each file's analysis time and segment count.
+    A file that appears more than once (several `data[]` entries) keeps its
+    last entry only; coverage_merge.py combines such copies instead.
+    """
+    results = {}
+    duplicates = 0
+    
+    for file_data in file_entries:
+        filename = file_data.get('filename', '')
+        
+        # Only analyze files from the target package
+        if f'/Sources/{package_name}/' not in filename:
+            continue
+        
+        # Apply filter if specified
+        if not should_include_file(filename, filter_pattern):
+            continue
+        
+        # Extract relative path and categorize
+        source = classify_source_file(filename, package_name)
+        if source is not None:
+            category, file_name, relative_path = source
+            
+            if profiler is not None:
+                started = time.perf_counter()
+            
+            # Get segments
+            segments = file_data.get('segments', [])
+            
+            if summary_only:
+                stats = summary_file_stats(file_data.get('summary') or {})
+            else:
+                stats = None
+                if cache is not None:
+                    key = cache.file_key(segments)
+                    stats = cache.get(key)
+                if stats is None:
+                    stats = analyze_segment_stats(segments, engine)
+                    if cache is not None:
+                        cache.put(key, stats)
+            
+            if profiler is not None:
+                profiler.record_file(filename, time.perf_counter() - started, segment_count(segments))
+            
+            if filename in results:
+                duplicates += 1
+            results[filename] = {
+                'category': category,
+                'name': file_name,
+                'relative_path': relative_path,
+                **stats
+            }
+    
+    if duplicates:
+        print(f"Warning: {duplicates} file entries repeat a file seen earlier in the export and replaced it; "
+              "use --merge to sum their counts instead")
+    
+    return results
+
+def stream_file_coverage(coverage_path: str, package_name: str, filter_pattern: Optional[str] = None,
+                         cache: Optional[CoverageCache] = None, engine: str = 'python',
+                         summary_only: bool = False,
+                         profiler: Optional[CoverageProfiler] = None) -> Dict[str, Dict]:
+    """
+    Analyze coverage data by streaming the export instead of loading it whole.
+    Files outside the package or filter are skipped without being decoded.
+    Segments are handed on as raw JSON text, so cache hits never decode them
+    and the NumPy engine can parse the text directly. With summary_only only
+    the `summary` blocks are decoded, segments are skipped unparsed, and
+    reading stops at the end of the files array.
+    """
+    def include(filename: str) -> bool:
+        return f'/Sources/{package_name}/' in filename and should_include_file(filename, filter_pattern)
+    
+    try:
+        if summary_only:
+            file_entries = iter_export_files(coverage_path, include=include, fields=('summary',), files_only=True)
+        else:
+            file_entries = iter_export_files(coverage_path, include=include, raw=True)
+        return analyze_file_entries(file_entries, package_name, filter_pattern, cache, engine, summary_only,
+                                    profiler)
+    except FileNotFoundError:
+        print(f"Error: Coverage data not found at {coverage_path}")
+        print("Make sure to run 'swift test --enable-code-coverage' first")
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+
+def coverage_build_dirs(package_path: Path) -> List[Path]:
+    """Directories SwiftPM writes coverage exports to, most specific first."""
+    return [
+        package_path / '.build' / 'arm64-apple-macosx' / 'debug' / 'codecov',
+        package_path / '.build' / 'x86_64-apple-macosx' / 'debug' / 'codecov',
+        package_path / '.build' / 'debug' / 'codecov',
+    ]
+
+def find_coverage_file(package_path: Path) -> Optional[Path]:
+    """Find the coverage JSON file for a package."""
+    # Try common build locations
+    build_dirs = coverage_build_dirs(package_path)
+    
+    package_name = package_path.name
+    
+    for build_dir in build_dirs:
+        if build_dir.exists():
+            # Look for the package's coverage file
+            coverage_file = build_dir / f'{package_name}.json'
+            if coverage_file.exists():
+                return coverage_file
+            
+            # Fallback: look for any .json file
+            json_files = list(build_dir.glob('*.json'))
+            if json_files:
+                return json_files[0]
+    
+    return None
+
+def find_coverage_files(package_path: Path) -> List[Path]:
+    """
+    Find every coverage JSON file for a package, e.g. one per architecture or
+    test shard, for merging. `.build/debug` is usually a symlink to one of the
+    architecture directories, so exports are de-duplicated by real path.
+    """
+    found = []
+    seen = set()
+    for build_dir in coverage_build_dirs(package_path):
+        if not build_dir.exists():
+            continue
+        for coverage_file in sorted(build_dir.glob('*.json')):
+            real_path = coverage_file.resolve()
+            if real_path not in seen:
+                seen.add(real_path)
+                found.append(coverage_file)
+    return found
+
+def require_coverage_file(package_path: Path, profiler: Optional[CoverageProfiler] = None) -> Path:
+    """Find the coverage JSON file for a package, or exit with instructions."""
+    package_name = package_path.name
+    
+    print(f"Looking for coverage data for {package_name}...")
+    with profile_phase(profiler, 'find_coverage_file'):
+        coverage_file = find_coverage_file(package_path)
+    
+    if not coverage_file:
+        print(f"\nError: Coverage data not found for {package_name}")
+        print(f"Expected location: {package_path}/.build/.../codecov/{package_name}.json")
+        print("\nPlease run tests with coverage enabled first:")
+        print(f"  cd {package_path}")
+        print(f"  swift test --enable-code-coverage")
+        sys.exit(1)
+    
+    print(f"Found coverage data: {coverage_file}")
+    return coverage_file
+
+def open_coverage_cache(package_path: Path, cache_dir: Optional[str] = None,
+                        enabled: bool = True) -> Optional[CoverageCache]:
+    """Create the analysis cache for a package, or None when caching is disabled."""
+    if not enabled:
+        return None
+    directory = Path(cache_dir) if cache_dir else default_cache_dir(package_path)
+    return CoverageCache(directory, package_path.name)
+
+def collect_coverage_stats(coverage_file: Path, package_name: str, filter_pattern: Optional[str] = None,
+                           stream: bool = False, cache: Optional[CoverageCache] = None,
+                           engine: str = 'python', summary_only: bool = False,
+                           profiler: Optional[CoverageProfiler] = None) -> Dict[str, Dict]:
+    """
+    Parse and analyze a coverage export once, returning per-file statistics.
+    With a cache, an unchanged export is served without parsing at all.
+    With summary_only, statistics come from llvm-cov's per-file summaries
+    (always streamed, never cached) and no segments are analyzed.
+    A profiler times each phase and records per-file analysis times.
+    """
+    if summary_only:
+        print(f"Reading coverage summaries for {package_name}...")
+        if filter_pattern:
+            print(f"Filtering files containing: '{filter_pattern}'")
+        with profile_phase(profiler, 'read_summaries'):
+            return stream_file_coverage(str(coverage_file), package_name, filter_pattern, summary_only=True,
+                                        profiler=profiler)
+    
+    export_key = None
+    if cache is not None:
+        with profile_phase(profiler, 'cache_lookup'):
+            export_key = cache.export_key(coverage_file, filter_pattern)
+            cached_stats = cache.get(export_key)
+        if cached_stats is not None:
+            print(f"Using cached analysis for {package_name} (export unchanged)")
+            if profiler is not None:
+                profiler.export_cached = True
+            return cached_stats
+    
+    if not stream:
+        print("Loading coverage data...")
+        with profile_phase(profiler, 'load_coverage_data'):
+            coverage_data = load_coverage_data(str(coverage_file))
+    
+    print(f"Analyzing coverage for {package_name}...")
+    if filter_pattern:
+        print(f"Filtering files containing: '{filter_pattern}'")
+    
+    if stream:
+        with profile_phase(profiler, 'stream_file_coverage'):
+            coverage_stats = stream_file_coverage(str(coverage_file), package_name, filter_pattern, cache, engine,
+                                                  profiler=profiler)
+    else:
+        with profile_phase(profiler, 'analyze_file_coverage'):
+            coverage_stats = analyze_file_coverage(coverage_data, package_name, filter_pattern, cache, engine,
+                                                   profiler)
+    
+    if cache is not None:
+        with profile_phase(profiler, 'cache_store'):
+            cache.put(export_key, coverage_stats)
+            cache.evict()
+        print(f"Reused cached analysis for {cache.hits} of {len(coverage_stats)} files")
+    
+    return coverage_stats
+
+def summarize_coverage(coverage_stats: Dict[str, Dict]) -> Dict:
+    """
+    Compute package-wide totals from per-file statistics.
+    Percentages follow the text report's overall summary (0.0 when empty).
+    """
+    lines_covered = sum(s['line_coverage']['covered'] for s in coverage_stats.values())
+    lines_total = sum(s['line_coverage']['total'] for s in coverage_stats.values())
+    branches_covered = sum(s['branch_coverage']['covered'] for s in coverage_stats.values())
+    branches_total = sum(s['branch_coverage']['total'] for s in coverage_stats.values())
+    return _coverage_totals(len(coverage_stats), lines_covered, lines_total, branches_covered, branches_total)
+
+def _coverage_totals(files: int, lines_covered: int, lines_total: int,
+                     branches_covered: int, branches_total: int) -> Dict:
+    line_pct = (lines_covered / lines_total * 100) if lines_total > 0 else 0.0
+    branch_pct = (branches_covered / branches_total * 100) if branches_total > 0 else 0.0
+    overall_pct = (line_pct * 0.5 + branch_pct * 0.5) if lines_total > 0 and branches_total > 0 else 0.0
+    
+    return {
+        'files': files,
+        'line_coverage': {
+            'covered': lines_covered,
+            'total': lines_total,
+            'percentage': line_pct
+        },
+        'branch_coverage': {
+            'covered': branches_covered,
+            'total': branches_total,
+            'percentage': branch_pct
+        },
+        'overall_percentage': overall_pct
+    }
+
+def build_directory_tree(coverage_stats: Dict[str, Dict], package_name: str = '') -> Dict:
+    """
+    Roll line and branch counts up every directory level under
+    Sources/<Package>/. Each file's counts go to its own directory, then one
+    pass over the directories, children before parents, adds each directory's
+    totals to its parent's; the work is linear in files and directories.
+    Returns the package's root node, where every node holds the totals of
+    summarize_coverage plus 'name', 'path' (relative, '' for the root) and
+    'directories', its child nodes by name.
+    """
+    counts = {'': [0, 0, 0, 0, 0]}
+    children = {'': []}
+    # Every directory after its parent
+    directories = []
+    for stats in coverage_stats.values():
+        path = stats['relative_path'].rpartition('/')[0]
+        if path not in counts:
+            missing = []
+            while path not in counts:
+                missing.append(path)
+                path = path.rpartition('/')[0]
+            for path in reversed(missing):
+                counts[path] = [0, 0, 0, 0, 0]
+                children[path] = []
+                children[path.rpartition('/')[0]].append(path)
+                directories.append(path)
+        totals = counts[path]
+        totals[0] += 1
+        totals[1] += stats['line_coverage']['covered']
+        totals[2] += stats['line_coverage']['total']
+        totals[3] += stats['branch_coverage']['covered']
+        totals[4] += stats['branch_coverage']['total']
+
+    for path in reversed(directories):
+        parent = counts[path.rpartition('/')[0]]
+        for position, value in enumerate(counts[path]):
+            parent[position] += value
+
+    def node(path: str, name: str) -> Dict:
+        return {
+            'name': name,
+            'path': path,
+            **_coverage_totals(*counts[path]),
+            'directories': [node(child, child.rpartition('/')[2]) for child in sorted(children[path])],
+        }
+
+    return node('', package_name)
+
+def iter_directory_tree(tree: Dict, depth: int = 0) -> Iterator[Tuple[int, Dict]]:
+    """(depth, node) for a directory tree's nodes, parents before their children."""
+    yield depth, tree
+    for child in tree['directories']:
+        yield from iter_directory_tree(child, depth + 1)
+
+# Package status levels shared by run_coverage.sh, coverage_all.py and CI:
+# (minimum overall %, marker, label), highest first
+STATUS_LEVELS = [
+    (95, '🎯', 'Excellent'),
+    (85, '✅', 'Good'),
+    (70, '⚠️', 'Fair'),
+    (0, '🔴', 'Needs Work'),
+]
+
+# Per-file quality buckets of the text report's distribution:
+# (name, minimum overall %), highest first; 'perfect' means exactly 100%
+QUALITY_BUCKETS = [
+    ('perfect', 100.0),
+    ('excellent', 95),
+    ('good', 85),
+    ('fair', 70),
+    ('poor', 0),
+]
+
+# Bump when the summary layout changes
+SUMMARY_VERSION = 1
+
+def coverage_level(overall_pct: float) -> Dict:
+    """The status level (marker and label) of an overall score."""
+    for minimum, marker, label in STATUS_LEVELS:
+        if overall_pct >= minimum:
+            return {'marker': marker, 'label': label}
+    return {'marker': STATUS_LEVELS[-1][1], 'label': STATUS_LEVELS[-1][2]}
+
+def quality_bucket(overall_pct: float) -> str:
+    for name, minimum in QUALITY_BUCKETS:
+        if overall_pct >= minimum:
+            return name
+    return QUALITY_BUCKETS[-1][0]
+
+def build_coverage_summary(coverage_stats: Dict[str, Dict], package_name: str,
+                           filter_pattern: Optional[str] = None) -> Dict:
+    """
+    Machine-readable summary of one analysis: package and category totals,
+    the quality distribution, the directory roll-up (build_directory_tree)
+    and compact per-file statistics, keyed by path under Sources/<Package>/.
+    Built from the same statistics as the reports.
+    """
+    overall = summarize_coverage(coverage_stats)
+    by_category = {}
+    for filepath, stats in coverage_stats.items():
+        by_category.setdefault(stats['category'], {})[filepath] = stats
+
+    quality = {name: 0 for name, _ in QUALITY_BUCKETS}
+    files = {}
+    for stats in coverage_stats.values():
+        bucket = quality_bucket(stats['overall_percentage'])
+        quality[bucket] += 1
+        files[stats['relative_path']] = {
+            'category': stats['category'],
+            'name': stats['name'],
+            'line_coverage': stats['line_coverage'],
+            'branch_coverage': stats['branch_coverage'],
+            'overall_percentage': stats['overall_percentage'],
+            'quality': bucket,
+            'uncovered_regions': uncovered_region_count(stats),
+            'uncovered_ranges': len(stats['uncovered_ranges']),
+            'uncovered_range_lines': uncovered_line_count(stats),
+        }
+
+    return {
+        'version': SUMMARY_VERSION,
+        'package': package_name,
+        'filter': filter_pattern,
+        'overall': {**overall, 'status': coverage_level(overall['overall_percentage'])},
+        'categories': {category: summarize_coverage(by_category[category]) for category in sorted(by_category)},
+        'quality': quality,
+        'directories': build_directory_tree(coverage_stats, package_name),
+        'files': files,
+    }
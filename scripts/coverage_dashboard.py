@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Dashboard
+
+Analyzes several Swift packages in one combined run and renders a single
+dashboard over all of them. Packages are analyzed in parallel on the
+coverage_all.py process pool, and each reuses its analysis cache, so a
+package whose export hasn't changed is not analyzed again.
+
+A package's export also covers the packages it depends on, but only the
+files under its own Sources/<Package>/ are taken from it (see
+classify_source_file), so every file is counted once, for the package that
+owns it. In the dashboard every file's category and path are prefixed with
+its package, so the directory tree and the category views drill down
+package → category → file.
+
+Usage:
+    python3 coverage_dashboard.py [PACKAGE ...] [options]
+
+    PACKAGE: Package names to combine (default: all six Troop900 packages)
+
+Options:
+    --packages-dir <path> Directory containing the packages (default: ios/Packages)
+    --output-dir <path>   Directory for the dashboard (default: packages dir)
+    --format <list>       Comma-separated formats: html, markdown, json (default: html,markdown,json)
+    --package-format <list> Also write each package's own reports in these formats (coverage_report.py)
+    --title <name>        Dashboard title (default: All Packages)
+    --filter <pattern>    Only analyze files matching this pattern
+    --stream             Stream exports instead of loading them into memory
+    --merge              Merge every export found for each package (architectures, shards) first
+    --summary-only       Use llvm-cov's per-file summaries only; skip segment analysis
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --jobs <n>            Number of analysis worker processes (default: CPU count)
+    --cache-dir <path>    Analysis cache directory (default: <package>/.build/coverage-cache)
+    --no-cache           Analyze every file from scratch without reading or writing the cache
+    --help               Show this help message
+
+Formats:
+    html       coverage_dashboard.html   Interactive report over every package's files
+    markdown   COVERAGE_DASHBOARD.md     Combined summary, package table and package categories
+    json       coverage_dashboard.json   The coverage_summary.json model over every file, plus
+                                         per-package totals and errors
+
+Examples:
+    # Dashboard of all packages, next to them
+    python3 coverage_dashboard.py
+
+    # Dashboard and each package's own Markdown and HTML reports, from one run
+    python3 coverage_dashboard.py --package-format markdown,html
+
+    # Two packages into a CI artifacts directory
+    python3 coverage_dashboard.py Troop900Domain Troop900Data --output-dir build/coverage
+"""
+
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from coverage_all import DEFAULT_PACKAGES_DIR, PACKAGES, format_summary_table, run_packages
+from coverage_core import ENGINE_CHOICES, build_coverage_summary, parse_choices, summarize_coverage
+from coverage_report import parse_formats
+from generate_html_coverage import iter_html_report
+
+DEFAULT_TITLE = 'All Packages'
+
+def combine_package_stats(results: List[Dict]) -> Dict[str, Dict]:
+    """
+    Combine the per-file statistics of analyzed packages, in result order,
+    prefixing each file's category and relative path with its package.
+    """
+    combined = {}
+    for result in results:
+        if not result['ok']:
+            continue
+        package = result['package']
+        for filename, stats in result['stats'].items():
+            combined[filename] = {
+                **stats,
+                'category': f"{package}/{stats['category']}",
+                'relative_path': f"{package}/{stats['relative_path']}",
+            }
+    return combined
+
+def generate_dashboard_text(combined: Dict[str, Dict], results: List[Dict], title: str,
+                            filter_pattern: Optional[str]) -> str:
+    """Combined summary, the package table, then each package's categories."""
+    overall = summarize_coverage(combined)
+    failed = sum(1 for result in results if not result['ok'])
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"COVERAGE DASHBOARD - {title}")
+    if filter_pattern:
+        lines.append(f"Filter: Files containing '{filter_pattern}'")
+    lines.append("=" * 100)
+    lines.append("")
+
+    lines.append("OVERALL SUMMARY")
+    lines.append("-" * 100)
+    lines.append(f"Packages: {len(results) - failed} analyzed" + (f", {failed} failed" if failed else ""))
+    lines.append(f"Total Files Analyzed: {overall['files']}")
+    line_cov, branch_cov = overall['line_coverage'], overall['branch_coverage']
+    lines.append(f"Overall Line Coverage: {line_cov['covered']}/{line_cov['total']} ({line_cov['percentage']:.1f}%)")
+    lines.append(f"Overall Branch Coverage: {branch_cov['covered']}/{branch_cov['total']} "
+                 f"({branch_cov['percentage']:.1f}%)")
+    lines.append(f"Combined Coverage Score: {overall['overall_percentage']:.1f}%")
+    lines.append("")
+
+    lines.append("PACKAGES")
+    lines.append("-" * 100)
+    lines.append(format_summary_table(results))
+    lines.append("")
+
+    by_category = defaultdict(dict)
+    for filename, stats in combined.items():
+        by_category[stats['category']][filename] = stats
+
+    for result in results:
+        if not result['ok']:
+            continue
+        package = result['package']
+        lines.append(f"PACKAGE: {package}")
+        lines.append("-" * 100)
+        lines.append(f"{'Category':<52} {'Files':>7} {'Lines':>12} {'Branches':>12} {'Overall':>9}")
+        for category in sorted(by_category):
+            owner, _, name = category.partition('/')
+            if owner != package:
+                continue
+            totals = summarize_coverage(by_category[category])
+            lines.append(f"{name:<52} {totals['files']:>7} {totals['line_coverage']['percentage']:>11.1f}% "
+                         f"{totals['branch_coverage']['percentage']:>11.1f}% {totals['overall_percentage']:>8.1f}%")
+        lines.append("")
+
+    lines.append("=" * 100)
+    return "\n".join(lines)
+
+def generate_dashboard_json(combined: Dict[str, Dict], results: List[Dict], title: str,
+                            filter_pattern: Optional[str]) -> str:
+    """The summary model over every file, plus per-package totals and errors."""
+    summary = build_coverage_summary(combined, title, filter_pattern)
+    summary['packages'] = {
+        result['package']: {'ok': result['ok'], 'error': result['error'], 'summary': result['summary']}
+        for result in results
+    }
+    return json.dumps(summary, indent=2)
+
+def generate_dashboard_html(combined: Dict[str, Dict], results: List[Dict], title: str,
+                            filter_pattern: Optional[str]):
+    """The interactive report, over the combined files."""
+    return iter_html_report(combined, title, filter_pattern)
+
+DASHBOARD_FORMATS = {
+    'html': ('coverage_dashboard.html', generate_dashboard_html),
+    'markdown': ('COVERAGE_DASHBOARD.md', generate_dashboard_text),
+    'json': ('coverage_dashboard.json', generate_dashboard_json),
+}
+
+DEFAULT_DASHBOARD_FORMATS = ['html', 'markdown', 'json']
+
+def write_dashboard(results: List[Dict], formats: List[str], output_dir: Path, title: str = DEFAULT_TITLE,
+                    filter_pattern: Optional[str] = None) -> Dict[str, Path]:
+    """
+    Combine the results of run_packages(..., return_stats=True) and write
+    each requested dashboard format to output_dir.
+    """
+    combined = combine_package_stats(results)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for name in formats:
+        file_name, render = DASHBOARD_FORMATS[name]
+        output_path = output_dir / file_name
+        report = render(combined, results, title, filter_pattern)
+        with open(output_path, 'w') as f:
+            if isinstance(report, str):
+                f.write(report)
+            else:
+                f.writelines(report)
+        written[name] = output_path
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Combine several Swift packages into one coverage dashboard',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('packages', nargs='*', help='Package names (default: all packages)')
+    parser.add_argument('--packages-dir', default=str(DEFAULT_PACKAGES_DIR),
+                        help='Directory containing the packages (default: ios/Packages)')
+    parser.add_argument('--output-dir', help='Directory for the dashboard (default: packages dir)')
+    parser.add_argument('--format', type=parse_choices(DASHBOARD_FORMATS), default=DEFAULT_DASHBOARD_FORMATS,
+                        help=f"Comma-separated formats: {', '.join(DASHBOARD_FORMATS)} "
+                             f"(default: {','.join(DEFAULT_DASHBOARD_FORMATS)})")
+    parser.add_argument('--package-format', type=parse_formats, default=[],
+                        help="Also write each package's own reports in these formats")
+    parser.add_argument('--title', default=DEFAULT_TITLE, help=f'Dashboard title (default: {DEFAULT_TITLE})')
+    parser.add_argument('--filter', help='Only analyze files matching this pattern')
+    parser.add_argument('--stream', action='store_true', help='Stream exports instead of loading them into memory')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for each package (architectures, shards) first')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Use llvm-cov's per-file summaries only; skip segment analysis")
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--jobs', type=int, help='Number of analysis worker processes (default: CPU count)')
+    parser.add_argument('--cache-dir', help='Analysis cache directory (default: <package>/.build/coverage-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+
+    args = parser.parse_args()
+
+    packages_dir = Path(args.packages_dir).resolve()
+    # Each package once, in the order given
+    package_paths = [packages_dir / name for name in dict.fromkeys(args.packages or PACKAGES)]
+    output_dir = Path(args.output_dir) if args.output_dir else packages_dir
+
+    print(f"Analyzing {len(package_paths)} package(s)...")
+    results = run_packages(package_paths, args.package_format, args.filter, args.stream, args.jobs,
+                           cache_dir=args.cache_dir, use_cache=not args.no_cache, engine=args.engine,
+                           summary_only=args.summary_only, merge=args.merge, return_stats=True)
+
+    if not any(result['ok'] for result in results):
+        print("Error: No package could be analyzed")
+        for result in results:
+            print(f"  {result['package']}: {result['error']}")
+        sys.exit(1)
+
+    written = write_dashboard(results, args.format, output_dir, args.title, args.filter)
+    print("")
+    print(format_summary_table(results))
+    print("")
+    for name, output_path in written.items():
+        print(f"✅ Dashboard {name} saved to: {output_path}")
+
+    failed = [result['package'] for result in results if not result['ok']]
+    if failed:
+        print(f"Failed: {len(failed)} of {len(results)} package(s)")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Swift symbol demangling for function names in coverage exports.
+
+llvm-cov reports Swift functions by their mangled symbols
+(`$s19Troop900Application13SignUpUseCaseC7execute7shiftIdySS_tYaKF`). Names
+are demangled in one batch, with the toolchain's `swift demangle --simplified`
+when it is on PATH, giving the short form Xcode shows:
+`SignUpUseCase.execute(shiftId:)`.
+
+Without a toolchain, a small built-in demangler covers the symbols coverage
+records hold: functions, methods, initializers, deinitializers, property
+accessors and closures in any of them, including word substitutions. Parameter
+types are not decoded, so a function without argument labels shows `(_:)`, or
+`(...)` for several parameters. Any symbol it does not recognize keeps its
+mangled name.
+
+Usage:
+    from coverage_demangle import demangle_names
+
+    names = demangle_names(function['name'] for function in functions)
+"""
+
+import re
+import shutil
+import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SYMBOL_PREFIXES = ('_$s', '$s', '_$S', '$S', '_$e', '$e')
+
+# Words a mangled identifier can refer back to
+MAX_WORDS = 26
+
+# llvm-cov prefixes file-private symbols with their source file
+_FILE_PREFIX_RE = re.compile(r'^[^:$]+:(?=_?\$)')
+
+# A word starts at a character other than a digit or '_' and ends at '_' or
+# at an uppercase letter that follows a non-uppercase one
+_WORD_RE = re.compile(r'[^\d_](?:[^_A-Z]|(?<=[A-Z])[A-Z])*')
+
+_SUBSTITUTION_RE = re.compile(r'A(?:\d*_|[a-z]*[A-Z])')
+_STANDARD_TYPE_RE = re.compile(r'S\d*(?:c[A-Za-z]|[A-Za-z])')
+
+# Accessor kind letters after 'v' (variables) or 'i' (subscripts)
+ACCESSORS = {
+    'g': 'getter', 's': 'setter', 'M': 'modify', 'r': 'read',
+    'w': 'willset', 'W': 'didset', 'a': 'unsafeMutableAddressor', 'l': 'unsafeAddressor',
+}
+
+# Nominal type kinds: class, struct, enum, protocol, type alias
+TYPE_KINDS = set('CVOPa')
+
+# Function type effects that may follow the parameters
+_EFFECT_OPS = {'K', 'Ya', 'Yb', 'YK'}
+
+class _Token:
+    """One unit of a mangled symbol: an identifier, an index or an operator."""
+    __slots__ = ('kind', 'text')
+
+    def __init__(self, kind: str, text: str):
+        self.kind = kind
+        self.text = text
+
+    def op(self, *texts: str) -> bool:
+        return self.kind == 'op' and self.text in texts
+
+def _tokenize(symbol: str) -> Optional[List[_Token]]:
+    """Split a symbol (without prefix) into tokens, or None if it uses an unsupported form."""
+    tokens = []
+    words = []
+    position = 0
+    length = len(symbol)
+
+    def natural() -> Optional[int]:
+        nonlocal position
+        start = position
+        while position < length and symbol[position].isdigit():
+            position += 1
+        return int(symbol[start:position]) if position > start else None
+
+    while position < length:
+        char = symbol[position]
+        previous = tokens[-1] if tokens else None
+        if char.isdigit() and previous is not None and previous.op('U', 'u', 'q', 'L'):
+            # INDEX after closures, generic parameters and local declarations
+            index = natural()
+            if position >= length or symbol[position] != '_':
+                return None
+            position += 1
+            tokens.append(_Token('index', str(index + 2)))
+            continue
+        if char.isdigit():
+            substituted = char == '0'
+            if substituted:
+                position += 1
+                if position < length and symbol[position] == '0':
+                    return None  # Punycode identifiers
+            identifier = ''
+            while True:
+                while substituted and position < length and symbol[position].isalpha():
+                    letter = symbol[position]
+                    position += 1
+                    index = ord(letter.lower()) - ord('a')
+                    if index >= len(words):
+                        return None
+                    identifier += words[index]
+                    if letter.isupper():
+                        substituted = False
+                if position < length and symbol[position] == '0':
+                    position += 1
+                    break
+                count = natural()
+                if not count or position + count > length:
+                    return None
+                part = symbol[position:position + count]
+                position += count
+                identifier += part
+                if len(words) < MAX_WORDS:
+                    words.extend(word for word in _WORD_RE.findall(part) if len(word) >= 2)
+                    del words[MAX_WORDS:]
+                if not substituted:
+                    break
+            tokens.append(_Token('id', identifier))
+            continue
+        if char == '_' and previous is not None and previous.op('U', 'u', 'q', 'L'):
+            # INDEX '_' is the first closure, generic parameter or local declaration
+            position += 1
+            tokens.append(_Token('index', '1'))
+            continue
+        if char == 'A':
+            match = _SUBSTITUTION_RE.match(symbol, position)
+            if match is None:
+                return None
+            tokens.append(_Token('sub', match.group()))
+            position = match.end()
+            continue
+        if char == 'S':
+            match = _STANDARD_TYPE_RE.match(symbol, position)
+            if match is None:
+                return None
+            tokens.append(_Token('std', match.group()))
+            position = match.end()
+            continue
+        if char == 'Y' and position + 1 < length:
+            tokens.append(_Token('op', symbol[position:position + 2]))
+            position += 2
+            continue
+        tokens.append(_Token('op', char))
+        position += 1
+    return tokens
+
+def _context(tokens: List[_Token], end: int) -> Tuple[List[str], int]:
+    """
+    Read the module and nested types at the start of tokens, up to end.
+    Returns (type names, index of the first token after them).
+    """
+    index = 1 if tokens and (tokens[0].kind == 'id' or tokens[0].op('s')) else 0
+    names = []
+    while index + 1 < end and tokens[index].kind == 'id':
+        following = tokens[index + 1]
+        if following.kind == 'op' and following.text in TYPE_KINDS:
+            names.append(tokens[index].text)
+        elif not following.op('E'):  # 'E' closes an extension and names its module
+            break
+        index += 2
+    return names, index
+
+def _labels(tokens: List[_Token], start: int, end: int) -> Tuple[Optional[List[str]], int]:
+    """Argument labels from start, stopping where the function type begins."""
+    labels = []
+    index = start
+    while index < end and (tokens[index].kind == 'id' or tokens[index].op('_')):
+        following = tokens[index + 1] if index + 1 < end else None
+        if (tokens[index].kind == 'id' and following is not None and following.kind == 'id'
+                and index + 2 < end and tokens[index + 2].kind == 'op' and tokens[index + 2].text in TYPE_KINDS):
+            break  # a module name followed by a type: the signature has started
+        if tokens[index].kind == 'id' and following is not None and following.kind == 'op' \
+                and following.text in TYPE_KINDS:
+            break
+        labels.append('_' if tokens[index].op('_') else tokens[index].text)
+        index += 1
+    return labels, index
+
+def _parameters(tokens: List[_Token], labels: List[str], start: int, end: int) -> str:
+    """The `(label:...)` part of a function name."""
+    if labels:
+        return '(' + ''.join(f'{label}:' for label in labels) + ')'
+    while end > start and tokens[end - 1].op(*_EFFECT_OPS):
+        end -= 1
+    if end > start and tokens[end - 1].op('y'):
+        return '()'
+    if end > start and tokens[end - 1].op('t'):
+        return '(...)'
+    return '(_:)'
+
+def _describe(tokens: List[_Token], end: int) -> Optional[str]:
+    """Simplified name of the entity whose mangling is tokens[:end]."""
+    if end >= 3 and tokens[end - 1].kind == 'index' and tokens[end - 2].op('U', 'u') and tokens[end - 3].op('f'):
+        kind = 'closure' if tokens[end - 2].text == 'U' else 'implicit closure'
+        # The closure's type follows its parent; the parent ends at the last entity marker before it
+        for parent_end in range(end - 3, 0, -1):
+            parent = _describe(tokens, parent_end)
+            if parent is not None and _is_entity_end(tokens, parent_end):
+                return f"{kind} #{tokens[end - 1].text} in {parent}"
+        return None
+    if end < 2:
+        return None
+
+    last, before = tokens[end - 1], tokens[end - 2]
+    if last.kind == 'op' and last.text in ACCESSORS and before.op('v', 'i'):
+        context, index = _context(tokens, end - 2)
+        if before.op('i'):
+            name = 'subscript'
+        elif index < end - 2 and tokens[index].kind == 'id':
+            name = tokens[index].text
+        else:
+            return None
+        return '.'.join(context + [name, ACCESSORS[last.text]])
+    if before.op('f') and last.op('C', 'c', 'D', 'd'):
+        context, index = _context(tokens, end - 2)
+        if not context:
+            return None
+        if last.op('D', 'd'):
+            return '.'.join(context + ['deinit'])
+        # An initializer's type is marked as a function type with 'c'
+        type_end = end - 3 if tokens[end - 3].op('c') else end - 2
+        labels, index = _labels(tokens, index, type_end)
+        return '.'.join(context + ['init' + _parameters(tokens, labels, index, type_end)])
+    if last.op('F'):
+        context, index = _context(tokens, end - 1)
+        if index >= end - 1 or tokens[index].kind != 'id':
+            return None
+        name = tokens[index].text
+        labels, index = _labels(tokens, index + 1, end - 1)
+        return '.'.join(context + [name + _parameters(tokens, labels, index, end - 1)])
+    return None
+
+def _is_entity_end(tokens: List[_Token], end: int) -> bool:
+    """Whether tokens[:end] ends with an entity marker (function, accessor, initializer or closure)."""
+    last = tokens[end - 1]
+    if last.op('F'):
+        return True
+    if end < 2:
+        return False
+    before = tokens[end - 2]
+    return ((last.kind == 'op' and last.text in ACCESSORS and before.op('v', 'i'))
+            or (before.op('f') and last.op('C', 'c', 'D', 'd'))
+            or (last.kind == 'index' and before.op('U', 'u')))
+
+def split_symbol(name: str) -> Tuple[str, str]:
+    """Split llvm-cov's `<file>:` prefix of file-private symbols from the symbol."""
+    match = _FILE_PREFIX_RE.match(name)
+    if match is None:
+        return '', name
+    return match.group(), name[match.end():]
+
+def demangle_swift_symbol(name: str) -> Optional[str]:
+    """
+    Built-in demangling of a function symbol to its simplified name, or None
+    when the symbol is not Swift or uses a form this demangler doesn't read.
+    """
+    _, symbol = split_symbol(name)
+    for prefix in SYMBOL_PREFIXES:
+        if symbol.startswith(prefix):
+            symbol = symbol[len(prefix):]
+            break
+    else:
+        return None
+    try:
+        tokens = _tokenize(symbol)
+        return _describe(tokens, len(tokens)) if tokens else None
+    except IndexError:
+        return None
+
+def find_swift_demangler() -> Optional[List[str]]:
+    """Command of the toolchain's demangler, if one is installed."""
+    if shutil.which('swift-demangle'):
+        return ['swift-demangle']
+    if shutil.which('swift'):
+        return ['swift', 'demangle']
+    return None
+
+def _tool_demangle(command: List[str], symbols: List[str]) -> Optional[List[str]]:
+    """Demangle symbols with one run of the toolchain demangler; None if it fails."""
+    try:
+        completed = subprocess.run(command + ['--simplified', '--compact'], input='\n'.join(symbols) + '\n',
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    names = completed.stdout.split('\n')[:len(symbols)]
+    if completed.returncode != 0 or len(names) != len(symbols):
+        return None
+    return names
+
+def demangle_names(names: Iterable[str], use_toolchain: bool = True) -> Dict[str, str]:
+    """
+    Map each distinct name to its demangled form, keeping names that can't be
+    demangled. The toolchain demangler, when available, is run once for all.
+    """
+    unique = {}
+    for name in names:
+        if name not in unique:
+            unique[name] = split_symbol(name)[1]
+    demangled = {}
+    command = find_swift_demangler() if use_toolchain else None
+    if command is not None and unique:
+        symbols = list(unique.values())
+        results = _tool_demangle(command, symbols)
+        if results is not None:
+            for (name, symbol), result in zip(unique.items(), results):
+                demangled[name] = result if result and result != symbol else name
+            return demangled
+    for name in unique:
+        demangled[name] = demangle_swift_symbol(name) or name
+    return demangled
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Diff
+
+Compares two coverage runs of a package line by line and reports, per file and
+per category, which lines gained or lost coverage, which lines changed hit
+counts, which uncovered regions appeared or were resolved, and how the line
+coverage moved. Either side can be an llvm-cov export (.json) or a coverage
+pack (.covpack, see coverage_pack.py), so a base branch's run can be packed
+once and diffed against every PR.
+
+The base run is indexed first: for each source file, a sorted array of the
+lines that carry segments with the highest count on each line. The head run is
+then streamed; a file whose segments are identical to the base's (same
+segment text or same pack columns) is counted as unchanged without being
+decoded, and only the changed files are indexed and compared.
+
+Lines are compared by number. When a PR moves code, the moved lines show up
+as removed on one side and added on the other; the totals stay exact.
+
+Usage:
+    python3 coverage_diff.py <base> <head> [options]
+
+    base: Export (.json) or coverage pack (.covpack) of the earlier run (required)
+    head: Export (.json) or coverage pack (.covpack) of the later run (required)
+
+Options:
+    --package <name>      Package whose sources to compare (default: the pack's package,
+                          else the base export's file name, e.g. Troop900Application.json)
+    --filter <pattern>    Only compare files matching this pattern
+    --output <path>       Write the text report here instead of printing it
+    --json <path>         Also write the diff as JSON
+    --max-ranges <n>      Line ranges to list per file and kind (default: 10)
+    --help               Show this help message
+
+Examples:
+    # Pack main's coverage once, then diff each PR's export against it
+    python3 coverage_pack.py ios/Packages/Troop900Application --output /tmp/main.covpack
+    python3 coverage_diff.py /tmp/main.covpack \\
+        ios/Packages/Troop900Application/.build/debug/codecov/Troop900Application.json
+
+    # Two exports, UseCases only, with a JSON copy for CI
+    python3 coverage_diff.py base.json head.json --package Troop900Application \\
+        --filter UseCases --json coverage_diff.json
+"""
+
+import hashlib
+import json
+import sys
+import argparse
+import time
+from array import array
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from coverage_core import classify_source_file, should_include_file
+from coverage_pack import PACK_SUFFIX, CoveragePack
+from coverage_stream import iter_export_files
+
+DEFAULT_MAX_RANGES = 10
+
+# Sorted line numbers, the highest count on each line, the uncovered region
+# starts as (line, column), and the number of covered lines
+LineIndex = Tuple[array, array, List[Tuple[int, int]], int]
+
+def build_line_index(segments: Iterable) -> LineIndex:
+    """Index a file's segments by line, the way analyze_segments counts lines."""
+    hits = {}
+    uncovered = []
+    for segment in segments:
+        line, count = segment[0], segment[2]
+        previous = hits.get(line)
+        if previous is None or count > previous:
+            hits[line] = count
+        if segment[3] and segment[4] and count == 0:
+            uncovered.append((line, segment[1]))
+    lines = sorted(hits)
+    counts = array('q', [hits[line] for line in lines])
+    covered = sum(1 for count in counts if count > 0)
+    return array('i', lines), counts, uncovered, covered
+
+# Yields (filename, digest, load) per source file; load() returns its LineIndex.
+# Digests only compare between sources of the same kind.
+SourceFiles = Iterator[Tuple[str, str, Callable[[], LineIndex]]]
+
+def iter_export_sources(coverage_file: Path, include: Callable[[str], bool]) -> SourceFiles:
+    for entry in iter_export_files(str(coverage_file), include, raw=True):
+        text = entry.get('segments', '[]')
+        # Segments hold only numbers and booleans, so whitespace is insignificant
+        digest = 'json:' + hashlib.sha1(''.join(text.split()).encode('utf-8')).hexdigest()
+        yield entry['filename'], digest, lambda text=text: build_line_index(json.loads(text))
+
+def iter_pack_sources(pack: CoveragePack, include: Callable[[str], bool]) -> SourceFiles:
+    c = pack.columns
+    for index in range(len(pack)):
+        filename = pack.filename(index)
+        if not include(filename):
+            continue
+        start = c['f.seg_start'][index]
+        end = start + c['f.seg_count'][index]
+        digest = hashlib.sha1()
+        for column in ('s.line', 's.col', 's.count', 's.flags'):
+            digest.update(c[column][start:end].tobytes())
+        yield filename, 'pack:' + digest.hexdigest(), lambda start=start, end=end: build_line_index(
+            zip(c['s.line'][start:end], c['s.col'][start:end], c['s.count'][start:end],
+                (flags & 1 for flags in c['s.flags'][start:end]), (flags & 2 for flags in c['s.flags'][start:end])))
+
+def line_ranges(lines: List[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted line numbers into (first, last) runs of consecutive lines."""
+    ranges = []
+    for line in lines:
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], line)
+        else:
+            ranges.append((line, line))
+    return ranges
+
+def line_totals(covered: int, total: int) -> Dict:
+    return {
+        'covered': covered,
+        'total': total,
+        'percentage': (covered / total * 100) if total > 0 else 0.0,
+    }
+
+def diff_line_indexes(base: Optional[LineIndex], head: Optional[LineIndex]) -> Dict:
+    """Compare one file's base and head indexes; either may be None (file added or removed)."""
+    base_lines, base_hits, base_uncovered, base_covered = base or (array('i'), array('q'), [], 0)
+    head_lines, head_hits, head_uncovered, head_covered = head or (array('i'), array('q'), [], 0)
+    gained, lost, new_covered, new_uncovered = [], [], [], []
+    changed = removed = 0
+    i = j = 0
+    while i < len(base_lines) or j < len(head_lines):
+        if j >= len(head_lines) or (i < len(base_lines) and base_lines[i] < head_lines[j]):
+            removed += 1
+            i += 1
+        elif i >= len(base_lines) or head_lines[j] < base_lines[i]:
+            (new_covered if head_hits[j] > 0 else new_uncovered).append(head_lines[j])
+            j += 1
+        else:
+            before, after = base_hits[i], head_hits[j]
+            if before > 0 and after <= 0:
+                lost.append(base_lines[i])
+            elif before <= 0 and after > 0:
+                gained.append(base_lines[i])
+            elif before != after:
+                changed += 1
+            i += 1
+            j += 1
+
+    base_regions = set(base_uncovered)
+    head_regions = set(head_uncovered)
+    return {
+        'status': 'changed' if base and head else ('added' if head else 'removed'),
+        'base': line_totals(base_covered, len(base_lines)) if base else None,
+        'head': line_totals(head_covered, len(head_lines)) if head else None,
+        'gained_lines': len(gained),
+        'lost_lines': len(lost),
+        'changed_hits': changed,
+        'new_covered_lines': len(new_covered),
+        'new_uncovered_lines': len(new_uncovered),
+        'removed_lines': removed,
+        'gained': line_ranges(gained),
+        'lost': line_ranges(lost),
+        'new_uncovered': line_ranges(new_uncovered),
+        'new_uncovered_regions': [{'line': line, 'column': col}
+                                  for line, col in sorted(head_regions - base_regions)],
+        'resolved_regions': [{'line': line, 'column': col}
+                             for line, col in sorted(base_regions - head_regions)],
+    }
+
+# Per-file counts summed into the category and overall totals
+DIFF_COUNTS = ['gained_lines', 'lost_lines', 'changed_hits', 'new_covered_lines', 'new_uncovered_lines',
+               'removed_lines']
+
+def has_changes(file_diff: Dict) -> bool:
+    return (file_diff['status'] != 'changed' or any(file_diff[key] for key in DIFF_COUNTS)
+            or file_diff['new_uncovered_regions'] or file_diff['resolved_regions'])
+
+def diff_coverage(base_files: SourceFiles, head_files: SourceFiles, package_name: str) -> Dict:
+    """
+    Diff two runs' source files. The base is indexed in full, the head streamed
+    against it. Returns per-file diffs (changed files only) with per-category
+    and overall line totals for both runs.
+    """
+    base = {}
+    for filename, digest, load in base_files:
+        base[filename] = (digest, load())
+
+    files = {}
+    categories = defaultdict(lambda: {
+        'base_covered': 0, 'base_total': 0, 'head_covered': 0, 'head_total': 0, 'files_changed': 0,
+        **{key: 0 for key in DIFF_COUNTS},
+    })
+    unchanged = 0
+
+    def add_file(filename: str, base_index: Optional[LineIndex], head_index: Optional[LineIndex]):
+        category, _, relative_path = classify_source_file(filename, package_name)
+        totals = categories[category]
+        for side, index in (('base', base_index), ('head', head_index)):
+            if index is not None:
+                totals[f'{side}_covered'] += index[3]
+                totals[f'{side}_total'] += len(index[0])
+        if base_index is head_index or base_index == head_index:
+            # Same segments, or (across an export and a pack) the same lines and counts
+            return False
+        file_diff = diff_line_indexes(base_index, head_index)
+        if not has_changes(file_diff):
+            return False
+        totals['files_changed'] += 1
+        for key in DIFF_COUNTS:
+            totals[key] += file_diff[key]
+        files[filename] = {'category': category, 'relative_path': relative_path, **file_diff}
+        return True
+
+    for filename, digest, load in head_files:
+        base_digest, base_index = base.pop(filename, (None, None))
+        if base_index is not None and digest == base_digest:
+            add_file(filename, base_index, base_index)
+            unchanged += 1
+        elif not add_file(filename, base_index, load()):
+            unchanged += 1
+    for filename, (_, base_index) in base.items():
+        add_file(filename, base_index, None)
+
+    by_category = {}
+    overall = {'files_changed': 0, 'files_unchanged': unchanged, **{key: 0 for key in DIFF_COUNTS}}
+    base_covered = base_total = head_covered = head_total = 0
+    for category in sorted(categories):
+        totals = categories[category]
+        by_category[category] = {
+            'base': line_totals(totals['base_covered'], totals['base_total']),
+            'head': line_totals(totals['head_covered'], totals['head_total']),
+            'files_changed': totals['files_changed'],
+            **{key: totals[key] for key in DIFF_COUNTS},
+        }
+        base_covered += totals['base_covered']
+        base_total += totals['base_total']
+        head_covered += totals['head_covered']
+        head_total += totals['head_total']
+        overall['files_changed'] += totals['files_changed']
+        for key in DIFF_COUNTS:
+            overall[key] += totals[key]
+    overall['base'] = line_totals(base_covered, base_total)
+    overall['head'] = line_totals(head_covered, head_total)
+
+    return {'package': package_name, 'totals': overall, 'categories': by_category, 'files': files}
+
+def format_ranges(ranges: List, limit: int) -> str:
+    text = ', '.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges[:limit])
+    if len(ranges) > limit:
+        text += f', ... and {len(ranges) - limit} more'
+    return text
+
+def format_change(before: Optional[Dict], after: Optional[Dict]) -> str:
+    if before is None:
+        return f"new, {after['covered']}/{after['total']} ({after['percentage']:.1f}%)"
+    if after is None:
+        return f"removed, was {before['covered']}/{before['total']} ({before['percentage']:.1f}%)"
+    return (f"{before['covered']}/{before['total']} ({before['percentage']:.1f}%) -> "
+            f"{after['covered']}/{after['total']} ({after['percentage']:.1f}%), "
+            f"{after['percentage'] - before['percentage']:+.1f}%")
+
+def generate_diff_report(diff: Dict, base_label: str, head_label: str, filter_pattern: Optional[str],
+                         max_ranges: int = DEFAULT_MAX_RANGES) -> str:
+    """Format a diff as a text report."""
+    totals = diff['totals']
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"COVERAGE DIFF - {diff['package']}")
+    lines.append(f"Base: {base_label}")
+    lines.append(f"Head: {head_label}")
+    if filter_pattern:
+        lines.append(f"Filter: Files containing '{filter_pattern}'")
+    lines.append("=" * 100)
+    lines.append("")
+
+    lines.append("OVERALL")
+    lines.append("-" * 100)
+    lines.append(f"Line Coverage: {format_change(totals['base'], totals['head'])}")
+    lines.append(f"Files changed: {totals['files_changed']}, unchanged: {totals['files_unchanged']}")
+    lines.append(f"Lines gained coverage: {totals['gained_lines']}, lost coverage: {totals['lost_lines']}, "
+                 f"hit counts changed: {totals['changed_hits']}")
+    lines.append(f"New lines: {totals['new_covered_lines']} covered, {totals['new_uncovered_lines']} uncovered; "
+                 f"removed lines: {totals['removed_lines']}")
+    lines.append("")
+
+    lines.append("BY CATEGORY")
+    lines.append("-" * 100)
+    lines.append(f"{'Category':<24} {'Base':>8} {'Head':>8} {'Delta':>8} {'Files':>6} {'Gained':>7} {'Lost':>7} "
+                 f"{'New unc.':>9}")
+    for category, stats in diff['categories'].items():
+        before, after = stats['base']['percentage'], stats['head']['percentage']
+        lines.append(f"{category:<24} {before:>7.1f}% {after:>7.1f}% {after - before:>+7.1f}% "
+                     f"{stats['files_changed']:>6} {stats['gained_lines']:>7} {stats['lost_lines']:>7} "
+                     f"{stats['new_uncovered_lines']:>9}")
+    lines.append("")
+
+    if not diff['files']:
+        lines.append("No coverage changes.")
+        lines.append("")
+        lines.append("=" * 100)
+        return "\n".join(lines)
+
+    lines.append("CHANGED FILES (most lost or new uncovered lines first)")
+    lines.append("-" * 100)
+    files = sorted(diff['files'].items(),
+                   key=lambda item: (-(item[1]['lost_lines'] + item[1]['new_uncovered_lines']),
+                                     item[1]['category'], item[1]['relative_path']))
+    for filename, file_diff in files:
+        status = "❌" if file_diff['lost_lines'] or file_diff['new_uncovered_lines'] else "✅"
+        lines.append(f"{status} {file_diff['relative_path']}")
+        lines.append(f"   Line Coverage: {format_change(file_diff['base'], file_diff['head'])}")
+        if file_diff['lost']:
+            lines.append(f"   Lost coverage ({file_diff['lost_lines']}): {format_ranges(file_diff['lost'], max_ranges)}")
+        if file_diff['new_uncovered']:
+            lines.append(f"   New uncovered ({file_diff['new_uncovered_lines']}): "
+                         f"{format_ranges(file_diff['new_uncovered'], max_ranges)}")
+        if file_diff['gained']:
+            lines.append(f"   Gained coverage ({file_diff['gained_lines']}): "
+                         f"{format_ranges(file_diff['gained'], max_ranges)}")
+        if file_diff['changed_hits']:
+            lines.append(f"   Hit counts changed: {file_diff['changed_hits']} lines")
+        if file_diff['new_uncovered_regions'] or file_diff['resolved_regions']:
+            lines.append(f"   Uncovered regions: {len(file_diff['new_uncovered_regions'])} new, "
+                         f"{len(file_diff['resolved_regions'])} resolved")
+        lines.append("")
+    lines.append("=" * 100)
+    return "\n".join(lines)
+
+def open_sources(path: Path, include: Callable[[str], bool], stack: ExitStack) -> SourceFiles:
+    """Source files of an export or, by suffix, a coverage pack kept open on the stack."""
+    if path.suffix == PACK_SUFFIX:
+        return iter_pack_sources(stack.enter_context(CoveragePack(path)), include)
+    return iter_export_sources(path, include)
+
+def pack_package(path: Path) -> Optional[str]:
+    if path.suffix != PACK_SUFFIX:
+        return None
+    with CoveragePack(path) as pack:
+        return pack.package_name
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the line coverage of two Swift coverage runs',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('base', help='Export (.json) or coverage pack (.covpack) of the earlier run')
+    parser.add_argument('head', help='Export (.json) or coverage pack (.covpack) of the later run')
+    parser.add_argument('--package', help="Package whose sources to compare (default: from the pack or base file name)")
+    parser.add_argument('--filter', help='Only compare files matching this pattern')
+    parser.add_argument('--output', help='Write the text report here instead of printing it')
+    parser.add_argument('--json', help='Also write the diff as JSON')
+    parser.add_argument('--max-ranges', type=int, default=DEFAULT_MAX_RANGES,
+                        help=f'Line ranges to list per file and kind (default: {DEFAULT_MAX_RANGES})')
+
+    args = parser.parse_args()
+
+    base_path, head_path = Path(args.base), Path(args.head)
+    for path in (base_path, head_path):
+        if not path.exists():
+            print(f"Error: Coverage run not found: {path}")
+            sys.exit(1)
+
+    try:
+        package_name = args.package or pack_package(base_path) or pack_package(head_path) or base_path.stem
+
+        def include(filename: str) -> bool:
+            return (classify_source_file(filename, package_name) is not None
+                    and should_include_file(filename, args.filter))
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            diff = diff_coverage(open_sources(base_path, include, stack), open_sources(head_path, include, stack),
+                                 package_name)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read coverage run: {e}")
+        sys.exit(1)
+
+    report = generate_diff_report(diff, str(base_path), str(head_path), args.filter, args.max_ranges)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+        print(f"✅ Diff report saved to: {args.output}")
+    else:
+        print(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'base': str(base_path), 'head': str(head_path), 'filter': args.filter, **diff}, f, indent=2)
+        print(f"✅ JSON diff saved to: {args.json}")
+    print(f"Compared in {time.perf_counter() - started:.2f}s")
+
+if __name__ == '__main__':
+    main()
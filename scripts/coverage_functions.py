@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Swift Function Coverage
+
+Reports coverage per function from the export's `functions[]` section, which
+the line and branch reports don't read. Each function is attributed to the
+source file of its body and to that file's category, and is one of:
+
+- never executed    Its entry count is 0
+- partially covered It ran, but some of its code regions never did
+- covered           Every code region ran
+
+The export is streamed once. `files[]` entries are skipped without decoding,
+function records are kept in a dict keyed by name, and each distinct file name
+is classified once, so the pass stays linear in the export's size. A function
+that appears in several `data[]` entries is counted once, with its counts
+summed as --merge would. Names are demangled (see coverage_demangle.py) in one
+batch for the functions listed.
+
+Usage:
+    python3 coverage_functions.py <package_path> [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --format <list>       Comma-separated formats: text, json (default: text)
+    --filter <pattern>    Only include files matching this pattern
+    --max-functions <n>   Functions listed per section of the text report (default: 100, 0 for all)
+    --output-dir <path>   Directory for the reports (default: package dir)
+    --mangled            Show mangled symbols instead of demangling them
+    --merge              Merge every export found for the package (architectures, shards) first
+    --help               Show this help message
+
+Formats:
+    text   COVERAGE_FUNCTIONS.md     Totals per category, then the functions to test, by file
+    json   coverage_functions.json   Totals per category and file, and every listed function
+
+Examples:
+    # Which functions did the tests never call?
+    python3 coverage_functions.py ios/Packages/Troop900Domain
+
+    # Every never-executed and partially covered use case function, as JSON
+    python3 coverage_functions.py ios/Packages/Troop900Application --filter UseCases --format text,json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from coverage_core import classify_source_file, parse_choices, require_coverage_file, should_include_file
+from coverage_demangle import demangle_names
+from coverage_diff import line_ranges
+from coverage_merge import merge_regions, require_merged_coverage_file
+from coverage_stream import iter_export_entries
+
+DEFAULT_MAX_FUNCTIONS = 100
+
+# llvm-cov region kinds (element 7 of a function region)
+CODE_REGION = 0
+
+FUNCTION_STATUSES = ['never', 'partial', 'covered']
+
+def collect_functions(coverage_file: Path, package_name: str, filter_pattern: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Stream `functions[]` once and return the package's functions by name:
+    {'file', 'category', 'line', 'column', 'count', 'regions'}, where regions
+    are the code regions in the function's own file. Copies are merged.
+    """
+    sources = {}
+    functions = {}
+    for _, function in iter_export_entries(str(coverage_file), lambda filename: False):
+        regions = function.get('regions') or []
+        filenames = function.get('filenames') or []
+        if not regions or regions[0][5] >= len(filenames):
+            continue
+        file_id = regions[0][5]
+        filename = filenames[file_id]
+        source = sources.get(filename, False)
+        if source is False:
+            source = classify_source_file(filename, package_name)
+            if source is not None and not should_include_file(filename, filter_pattern):
+                source = None
+            sources[filename] = source
+        if source is None:
+            continue
+
+        code_regions = [region for region in regions
+                        if len(region) > 7 and region[7] == CODE_REGION and region[5] == file_id]
+        name = function.get('name', '')
+        record = functions.get(name)
+        if record is None:
+            functions[name] = {
+                'file': source[2], 'category': source[0], 'line': regions[0][0], 'column': regions[0][1],
+                'count': function.get('count', 0), 'regions': code_regions,
+            }
+        else:
+            record['count'] += function.get('count', 0)
+            record['regions'] = merge_regions([record['regions'], code_regions])
+    return functions
+
+def function_status(record: Dict) -> str:
+    """'never', 'partial' or 'covered'."""
+    if record['count'] <= 0:
+        return 'never'
+    if any(region[4] <= 0 for region in record['regions']):
+        return 'partial'
+    return 'covered'
+
+def _empty_totals() -> Dict:
+    return {'functions': 0, 'executed': 0, 'covered': 0, 'never': 0, 'partial': 0, 'regions': 0, 'covered_regions': 0}
+
+def _add_totals(totals: Dict, status: str, regions: int, covered_regions: int):
+    totals['functions'] += 1
+    totals['executed'] += status != 'never'
+    totals[status] += 1
+    totals['regions'] += regions
+    totals['covered_regions'] += covered_regions
+
+def _percentages(totals: Dict) -> Dict:
+    functions = totals['functions']
+    totals['executed_percentage'] = (totals['executed'] / functions * 100) if functions > 0 else 0
+    totals['covered_percentage'] = (totals['covered'] / functions * 100) if functions > 0 else 0
+    totals['region_percentage'] = (totals['covered_regions'] / totals['regions'] * 100) if totals['regions'] > 0 else 0
+    return totals
+
+def analyze_functions(functions: Dict[str, Dict], package_name: str, demangle: bool = True) -> Dict:
+    """
+    Totals per package, category and file, and the never-executed and
+    partially covered functions ordered by file and line.
+    """
+    totals = _empty_totals()
+    categories = {}
+    files = {}
+    listed = {'never': [], 'partial': []}
+    for name, record in functions.items():
+        status = function_status(record)
+        covered_regions = sum(1 for region in record['regions'] if region[4] > 0)
+        for scope in (totals, categories.setdefault(record['category'], _empty_totals()),
+                      files.setdefault(record['file'], _empty_totals())):
+            _add_totals(scope, status, len(record['regions']), covered_regions)
+        if status == 'covered':
+            continue
+        entry = {'symbol': name, 'file': record['file'], 'category': record['category'],
+                 'line': record['line'], 'column': record['column'], 'count': record['count'],
+                 'regions': len(record['regions']), 'covered_regions': covered_regions}
+        if status == 'partial':
+            entry['uncovered_lines'] = line_ranges(sorted({region[0] for region in record['regions']
+                                                           if region[4] <= 0}))
+        listed[status].append(entry)
+
+    names = demangle_names(entry['symbol'] for entries in listed.values() for entry in entries) if demangle else {}
+    for entries in listed.values():
+        entries.sort(key=lambda entry: (entry['file'], entry['line'], entry['column']))
+        for entry in entries:
+            entry['name'] = names.get(entry['symbol'], entry['symbol'])
+
+    return {
+        'package': package_name,
+        'totals': _percentages(totals),
+        'categories': {category: _percentages(categories[category]) for category in sorted(categories)},
+        'files': {relative_path: _percentages(files[relative_path]) for relative_path in sorted(files)},
+        'never_executed': listed['never'],
+        'partially_covered': listed['partial'],
+    }
+
+def _format_ranges(ranges: List) -> str:
+    return ', '.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges)
+
+def _function_lines(entries: List[Dict], max_functions: int, partial: bool) -> List[str]:
+    lines = []
+    shown = entries if max_functions <= 0 else entries[:max_functions]
+    current_file = None
+    for entry in shown:
+        if entry['file'] != current_file:
+            current_file = entry['file']
+            lines.append(f"{current_file}")
+        detail = ''
+        if partial:
+            detail = (f"  ({entry['covered_regions']}/{entry['regions']} regions, "
+                      f"uncovered at {_format_ranges(entry['uncovered_lines'])})")
+        lines.append(f"   {entry['line']:>6}  {entry['name']}{detail}")
+    if len(shown) < len(entries):
+        lines.append(f"   ... and {len(entries) - len(shown):,} more")
+    return lines
+
+def generate_function_report(analysis: Dict, filter_pattern: Optional[str] = None,
+                             max_functions: int = DEFAULT_MAX_FUNCTIONS) -> str:
+    """Format function coverage as a text report."""
+    totals = analysis['totals']
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"FUNCTION COVERAGE - {analysis['package']}")
+    if filter_pattern:
+        lines.append(f"Filter: Files containing '{filter_pattern}'")
+    lines.append("=" * 100)
+    if totals['functions'] == 0:
+        lines.append("No functions found.")
+        return "\n".join(lines)
+    lines.append(f"Functions:     {totals['functions']:,}")
+    lines.append(f"Executed:      {totals['executed']:,} ({totals['executed_percentage']:.1f}%)")
+    lines.append(f"Fully covered: {totals['covered']:,} ({totals['covered_percentage']:.1f}%)")
+    lines.append(f"Regions:       {totals['covered_regions']:,}/{totals['regions']:,} ({totals['region_percentage']:.1f}%)")
+
+    lines.append("")
+    lines.append("BY CATEGORY")
+    lines.append("-" * 100)
+    lines.append(f"{'Category':<30} {'Functions':>10} {'Executed':>10} {'Covered':>10} {'Never':>8} {'Partial':>8}")
+    for category, stats in analysis['categories'].items():
+        lines.append(f"{category:<30} {stats['functions']:>10,} {stats['executed_percentage']:>9.1f}% "
+                     f"{stats['covered_percentage']:>9.1f}% {stats['never']:>8,} {stats['partial']:>8,}")
+
+    lines.append("")
+    lines.append(f"NEVER-EXECUTED FUNCTIONS ({len(analysis['never_executed']):,})")
+    lines.append("-" * 100)
+    lines.extend(_function_lines(analysis['never_executed'], max_functions, partial=False) or ["None"])
+
+    lines.append("")
+    lines.append(f"PARTIALLY COVERED FUNCTIONS ({len(analysis['partially_covered']):,})")
+    lines.append("-" * 100)
+    lines.extend(_function_lines(analysis['partially_covered'], max_functions, partial=True) or ["None"])
+    lines.append("")
+    lines.append("=" * 100)
+    return "\n".join(lines)
+
+def generate_function_json(analysis: Dict, filter_pattern: Optional[str] = None,
+                           max_functions: int = DEFAULT_MAX_FUNCTIONS) -> str:
+    return json.dumps({**analysis, 'filter': filter_pattern}, indent=2)
+
+# format name -> (default file name, renderer)
+FUNCTION_FORMATS = {
+    'text': ('COVERAGE_FUNCTIONS.md', generate_function_report),
+    'json': ('coverage_functions.json', generate_function_json),
+}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Function-level coverage of a Swift package',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('--format', type=parse_choices(FUNCTION_FORMATS), default=['text'],
+                        help=f"Comma-separated formats: {', '.join(FUNCTION_FORMATS)} (default: text)")
+    parser.add_argument('--filter', help='Only include files matching this pattern')
+    parser.add_argument('--max-functions', type=int, default=DEFAULT_MAX_FUNCTIONS,
+                        help=f'Functions listed per section of the text report (default: {DEFAULT_MAX_FUNCTIONS}, 0 for all)')
+    parser.add_argument('--output-dir', help='Directory for the reports (default: package dir)')
+    parser.add_argument('--mangled', action='store_true', help='Show mangled symbols instead of demangling them')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+
+    package_name = package_path.name
+    output_dir = Path(args.output_dir) if args.output_dir else package_path
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.merge:
+        coverage_file = require_merged_coverage_file(package_path)
+    else:
+        coverage_file = require_coverage_file(package_path)
+    try:
+        functions = collect_functions(coverage_file, package_name, args.filter)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+    analysis = analyze_functions(functions, package_name, demangle=not args.mangled)
+
+    for name in args.format:
+        file_name, render = FUNCTION_FORMATS[name]
+        report = render(analysis, args.filter, args.max_functions)
+        if name == 'text':
+            print(report)
+        output_path = output_dir / file_name
+        with open(output_path, 'w') as f:
+            f.write(report)
+        print(f"✅ {name} report saved to: {output_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage History
+
+Keeps every coverage run in a local SQLite database instead of only the latest
+COVERAGE_REPORT.md, and answers trend questions from it.
+
+Each recorded run stores the package totals, per-category totals and per-file
+line/branch counts, keyed by commit and timestamp. A run is written in one
+transaction with bulk inserts; file paths are interned once per package, so a
+run costs one small row per file. Queries go through indexes on
+(package, timestamp) and (path, run), so they stay fast with thousands of
+runs stored.
+
+Usage:
+    python3 coverage_history.py <command> [options]
+
+Commands:
+    record <package_path>       Analyze a package (like coverage_report.py) and store the run
+    runs                        List recorded runs, newest first
+    trend <package> <pattern>   Per-file coverage over the last runs, for files matching pattern
+    regressions <package>       Files whose coverage dropped the most between two runs
+    rollup                      Package totals over the last runs, with min/max/change
+
+Options (all commands):
+    --db <path>           History database (default: ios/Packages/.coverage-history.sqlite)
+    --json               Print the result as JSON instead of a table
+
+Options (record):
+    --commit <sha>        Commit to record (default: git HEAD of the package directory)
+    --timestamp <iso>     Run time, ISO 8601 (default: now, UTC)
+    --filter <pattern>    Only analyze files matching this pattern
+    --stream             Stream the export instead of loading it into memory
+    --merge              Merge every export found for the package first
+    --pack <path>         Read the analysis from a coverage pack instead of the export
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --no-cache           Analyze every file from scratch without the analysis cache
+
+Options (queries):
+    --package <name>      Restrict runs/rollup to one package
+    --runs <n>            Number of runs to look back over (default: 10; regressions: 2)
+    --base <run>          regressions: earlier run, by id or commit prefix
+    --head <run>          regressions: later run, by id or commit prefix (default: latest)
+    --limit <n>           Maximum rows (default: 20)
+    --by-category        rollup: include per-category totals
+    --filter <pattern>    trend/regressions/rollup: only runs recorded with this filter
+                          (default: unfiltered runs)
+
+Examples:
+    # Record the current run, then see what regressed since the previous one
+    python3 coverage_history.py record ios/Packages/Troop900Application
+    python3 coverage_history.py regressions Troop900Application
+
+    # How one use case's coverage moved over the last 30 runs
+    python3 coverage_history.py trend Troop900Application CreateShift --runs 30
+
+    # All packages over the last 50 runs
+    python3 coverage_history.py rollup --runs 50 --by-category
+
+Recording from the report scripts:
+    python3 coverage_report.py ios/Packages/Troop900Application --history ios/Packages/.coverage-history.sqlite
+"""
+
+import json
+import sqlite3
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from coverage_core import (ENGINE_CHOICES, collect_coverage_stats, open_coverage_cache, require_coverage_file,
+                           summarize_coverage)
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import load_pack_stats
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent.parent / 'ios' / 'Packages' / '.coverage-history.sqlite'
+
+DEFAULT_RUNS = 10
+
+DEFAULT_LIMIT = 20
+
+# Bump when the schema changes; stored as PRAGMA user_version
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    package TEXT NOT NULL,
+    commit_sha TEXT,
+    timestamp TEXT NOT NULL,
+    filter TEXT,
+    files INTEGER NOT NULL,
+    lines_covered INTEGER NOT NULL,
+    lines_total INTEGER NOT NULL,
+    branches_covered INTEGER NOT NULL,
+    branches_total INTEGER NOT NULL,
+    overall_pct REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_package ON runs (package, timestamp, id);
+CREATE INDEX IF NOT EXISTS runs_by_commit ON runs (commit_sha);
+
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    package TEXT NOT NULL,
+    path TEXT NOT NULL,
+    category TEXT NOT NULL,
+    UNIQUE (package, path)
+);
+
+CREATE TABLE IF NOT EXISTS file_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    path_id INTEGER NOT NULL REFERENCES paths (id),
+    lines_covered INTEGER NOT NULL,
+    lines_total INTEGER NOT NULL,
+    branches_covered INTEGER NOT NULL,
+    branches_total INTEGER NOT NULL,
+    overall_pct REAL NOT NULL,
+    PRIMARY KEY (run_id, path_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_stats_by_path ON file_stats (path_id, run_id);
+
+CREATE TABLE IF NOT EXISTS category_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    lines_covered INTEGER NOT NULL,
+    lines_total INTEGER NOT NULL,
+    branches_covered INTEGER NOT NULL,
+    branches_total INTEGER NOT NULL,
+    overall_pct REAL NOT NULL,
+    PRIMARY KEY (run_id, category)
+) WITHOUT ROWID;
+"""
+
+# Column list shared by the runs, file_stats and category_stats queries
+COUNT_COLUMNS = 'lines_covered, lines_total, branches_covered, branches_total, overall_pct'
+
+def git_commit(directory: Path) -> Optional[str]:
+    """HEAD commit of the repository containing directory, if available."""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=str(directory),
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def coverage_row(row: sqlite3.Row) -> Dict:
+    """Line/branch totals of a runs, file_stats or category_stats row, in the report's shape."""
+    def totals(covered: int, total: int) -> Dict:
+        return {'covered': covered, 'total': total,
+                'percentage': (covered / total * 100) if total > 0 else 0.0}
+    return {
+        'line_coverage': totals(row['lines_covered'], row['lines_total']),
+        'branch_coverage': totals(row['branches_covered'], row['branches_total']),
+        'overall_percentage': row['overall_pct'],
+    }
+
+def run_row(row: sqlite3.Row) -> Dict:
+    return {'run': row['id'], 'package': row['package'], 'commit': row['commit_sha'],
+            'timestamp': row['timestamp'], 'files': row['files'], **coverage_row(row)}
+
+class CoverageHistory:
+    """A coverage history database. Use as a context manager to close it."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Orchestrator workers may record concurrently; writers wait for each other
+        self.conn = sqlite3.connect(str(self.path), timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.conn.close()
+            raise ValueError(f"{self.path} has history schema {version}; version {SCHEMA_VERSION} is required")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record_run(self, package_name: str, coverage_stats: Dict[str, Dict], commit: Optional[str] = None,
+                   timestamp: Optional[str] = None, filter_pattern: Optional[str] = None) -> int:
+        """Store one run's package, category and file statistics in a single transaction; returns the run id."""
+        timestamp = timestamp or datetime.now(timezone.utc).isoformat(timespec='seconds')
+        summary = summarize_coverage(coverage_stats)
+        by_category = defaultdict(dict)
+        for filepath, stats in coverage_stats.items():
+            by_category[stats['category']][filepath] = stats
+
+        def counts(stats: Dict) -> tuple:
+            return (stats['line_coverage']['covered'], stats['line_coverage']['total'],
+                    stats['branch_coverage']['covered'], stats['branch_coverage']['total'],
+                    stats['overall_percentage'])
+
+        with self.conn:
+            run_id = self.conn.execute(
+                f'INSERT INTO runs (package, commit_sha, timestamp, filter, files, {COUNT_COLUMNS}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (package_name, commit, timestamp, filter_pattern, summary['files'], *counts(summary))).lastrowid
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO paths (package, path, category) VALUES (?, ?, ?)',
+                ((package_name, stats['relative_path'], stats['category']) for stats in coverage_stats.values()))
+            path_ids = dict(self.conn.execute('SELECT path, id FROM paths WHERE package = ?', (package_name,)))
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO file_stats (run_id, path_id, {COUNT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((run_id, path_ids[stats['relative_path']], *counts(stats)) for stats in coverage_stats.values()))
+            self.conn.executemany(
+                f'INSERT INTO category_stats (run_id, category, files, {COUNT_COLUMNS}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                ((run_id, category, len(files), *counts(summarize_coverage(files)))
+                 for category, files in by_category.items()))
+        return run_id
+
+    def packages(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT package FROM runs ORDER BY package')]
+
+    def recent_run_ids(self, package_name: str, runs: int, filter_pattern: Optional[str] = None) -> List[int]:
+        """
+        Ids of a package's most recent runs recorded with filter_pattern
+        (unfiltered runs by default), newest first.
+        """
+        return [row[0] for row in self.conn.execute(
+            'SELECT id FROM runs WHERE package = ? AND filter IS ? ORDER BY timestamp DESC, id DESC LIMIT ?',
+            (package_name, filter_pattern, runs))]
+
+    def runs(self, package_name: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """Recorded runs, newest first."""
+        if package_name:
+            rows = self.conn.execute('SELECT * FROM runs WHERE package = ? ORDER BY timestamp DESC, id DESC LIMIT ?',
+                                     (package_name, limit))
+        else:
+            rows = self.conn.execute('SELECT * FROM runs ORDER BY timestamp DESC, id DESC LIMIT ?', (limit,))
+        return [run_row(row) for row in rows]
+
+    def run(self, run_id: int) -> Optional[Dict]:
+        row = self.conn.execute('SELECT * FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return run_row(row) if row is not None else None
+
+    def resolve_run(self, package_name: str, reference: str, filter_pattern: Optional[str] = None) -> Optional[int]:
+        """
+        A run id from an id or a commit prefix. A prefix picks the latest run
+        of that commit recorded with filter_pattern (unfiltered by default).
+        """
+        if reference.isdigit():
+            row = self.conn.execute('SELECT id FROM runs WHERE id = ? AND package = ?',
+                                    (int(reference), package_name)).fetchone()
+            if row is not None:
+                return row[0]
+        row = self.conn.execute(
+            'SELECT id FROM runs WHERE package = ? AND filter IS ? AND substr(commit_sha, 1, length(?)) = ? '
+            'ORDER BY timestamp DESC, id DESC LIMIT 1',
+            (package_name, filter_pattern, reference, reference)).fetchone()
+        return row[0] if row is not None else None
+
+    def file_trend(self, package_name: str, pattern: str, runs: int = DEFAULT_RUNS,
+                   filter_pattern: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Coverage of each file whose path contains pattern, over the package's last runs, oldest first."""
+        run_ids = self.recent_run_ids(package_name, runs, filter_pattern)
+        if not run_ids:
+            return {}
+        escaped = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        rows = self.conn.execute(
+            f'SELECT p.path, r.id, r.commit_sha, r.timestamp, f.lines_covered, f.lines_total, '
+            f'f.branches_covered, f.branches_total, f.overall_pct '
+            f'FROM paths p JOIN file_stats f ON f.path_id = p.id JOIN runs r ON r.id = f.run_id '
+            f"WHERE p.package = ? AND p.path LIKE ? ESCAPE '\\' "
+            f"AND f.run_id IN ({','.join('?' * len(run_ids))}) "
+            f'ORDER BY p.path, r.timestamp, r.id',
+            (package_name, f'%{escaped}%', *run_ids))
+        trend = defaultdict(list)
+        for row in rows:
+            trend[row['path']].append({'run': row['id'], 'commit': row['commit_sha'],
+                                       'timestamp': row['timestamp'], **coverage_row(row)})
+        return dict(trend)
+
+    def regressions(self, package_name: str, base_run: int, head_run: int, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """Files whose overall coverage dropped from base_run to head_run, largest drop first."""
+        rows = self.conn.execute(
+            'SELECT p.path, p.category, '
+            'b.lines_covered AS b_lines_covered, b.lines_total AS b_lines_total, '
+            'b.branches_covered AS b_branches_covered, b.branches_total AS b_branches_total, '
+            'b.overall_pct AS b_overall_pct, '
+            'h.lines_covered, h.lines_total, h.branches_covered, h.branches_total, h.overall_pct '
+            'FROM file_stats h JOIN file_stats b ON b.run_id = ? AND b.path_id = h.path_id '
+            'JOIN paths p ON p.id = h.path_id '
+            'WHERE h.run_id = ? AND h.overall_pct < b.overall_pct '
+            'ORDER BY h.overall_pct - b.overall_pct, p.path LIMIT ?',
+            (base_run, head_run, limit))
+        regressions = []
+        for row in rows:
+            before = {key[2:]: row[key] for key in row.keys() if key.startswith('b_')}
+            regressions.append({
+                'path': row['path'],
+                'category': row['category'],
+                'base': coverage_row(before),
+                'head': coverage_row(row),
+                'change': row['overall_pct'] - row['b_overall_pct'],
+            })
+        return regressions
+
+    def rollup(self, package_name: Optional[str] = None, runs: int = DEFAULT_RUNS,
+               by_category: bool = False, filter_pattern: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Per package: its last runs' totals, oldest first, with min, max and
+        change of the overall score. Only runs recorded with filter_pattern
+        (unfiltered by default) are included.
+        """
+        rollup = {}
+        for name in ([package_name] if package_name else self.packages()):
+            rows = self.conn.execute(
+                'SELECT * FROM runs WHERE package = ? AND filter IS ? ORDER BY timestamp DESC, id DESC LIMIT ?',
+                (name, filter_pattern, runs)).fetchall()
+            if not rows:
+                continue
+            package_runs = [run_row(row) for row in reversed(rows)]
+            if by_category:
+                run_ids = [entry['run'] for entry in package_runs]
+                categories = defaultdict(dict)
+                for row in self.conn.execute(
+                        f"SELECT * FROM category_stats WHERE run_id IN ({','.join('?' * len(run_ids))})", run_ids):
+                    categories[row['run_id']][row['category']] = {'files': row['files'], **coverage_row(row)}
+                for entry in package_runs:
+                    entry['categories'] = dict(sorted(categories[entry['run']].items()))
+            scores = [entry['overall_percentage'] for entry in package_runs]
+            rollup[name] = {
+                'runs': package_runs,
+                'min': min(scores),
+                'max': max(scores),
+                'mean': sum(scores) / len(scores),
+                'change': scores[-1] - scores[0],
+            }
+        return rollup
+
+def format_runs(runs: List[Dict]) -> str:
+    lines = []
+    lines.append(f"{'Run':>6}  {'Package':<24} {'Commit':<10} {'Timestamp':<25} {'Files':>6} {'Line':>7} "
+                 f"{'Branch':>7} {'Overall':>8}")
+    lines.append("-" * 100)
+    for run in runs:
+        lines.append(f"{run['run']:>6}  {run['package']:<24} {(run['commit'] or '-')[:10]:<10} {run['timestamp']:<25} "
+                     f"{run['files']:>6} {run['line_coverage']['percentage']:>6.1f}% "
+                     f"{run['branch_coverage']['percentage']:>6.1f}% {run['overall_percentage']:>7.1f}%")
+    return "\n".join(lines)
+
+def format_trend(trend: Dict[str, List[Dict]]) -> str:
+    if not trend:
+        return "No matching files in the recorded runs."
+    lines = []
+    for path, points in trend.items():
+        first, last = points[0]['overall_percentage'], points[-1]['overall_percentage']
+        lines.append(f"{path}  ({len(points)} runs, {last - first:+.1f}%)")
+        for point in points:
+            lines.append(f"   {point['timestamp']:<25} {(point['commit'] or '-')[:10]:<10} "
+                         f"Line {point['line_coverage']['covered']}/{point['line_coverage']['total']} "
+                         f"({point['line_coverage']['percentage']:.1f}%)  Overall {point['overall_percentage']:.1f}%")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+def format_regressions(regressions: List[Dict], base: Dict, head: Dict) -> str:
+    lines = []
+    lines.append(f"Run {base['run']} ({(base['commit'] or '-')[:10]}, {base['timestamp']}) -> "
+                 f"run {head['run']} ({(head['commit'] or '-')[:10]}, {head['timestamp']})")
+    lines.append(f"Package overall: {base['overall_percentage']:.1f}% -> {head['overall_percentage']:.1f}% "
+                 f"({head['overall_percentage'] - base['overall_percentage']:+.1f}%)")
+    lines.append("-" * 100)
+    if not regressions:
+        lines.append("No file lost coverage.")
+    for entry in regressions:
+        lines.append(f"{entry['change']:>+7.1f}%  {entry['base']['overall_percentage']:>5.1f}% -> "
+                     f"{entry['head']['overall_percentage']:>5.1f}%  {entry['path']}")
+    return "\n".join(lines)
+
+def format_rollup(rollup: Dict[str, Dict]) -> str:
+    if not rollup:
+        return "No recorded runs."
+    lines = []
+    lines.append(f"{'Package':<24} {'Runs':>5} {'Latest':>8} {'Min':>8} {'Max':>8} {'Mean':>8} {'Change':>8}")
+    lines.append("-" * 76)
+    for name, entry in rollup.items():
+        lines.append(f"{name:<24} {len(entry['runs']):>5} {entry['runs'][-1]['overall_percentage']:>7.1f}% "
+                     f"{entry['min']:>7.1f}% {entry['max']:>7.1f}% {entry['mean']:>7.1f}% {entry['change']:>+7.1f}%")
+    for name, entry in rollup.items():
+        if 'categories' not in entry['runs'][-1]:
+            continue
+        lines.append("")
+        lines.append(f"{name} by category (overall %, oldest run first)")
+        categories = sorted({category for run in entry['runs'] for category in run['categories']})
+        for category in categories:
+            scores = [run['categories'][category]['overall_percentage'] if category in run['categories'] else None
+                      for run in entry['runs']]
+            lines.append(f"  {category:<22} " + " ".join(f"{score:>5.1f}" if score is not None else "    -"
+                                                          for score in scores))
+    return "\n".join(lines)
+
+def record_package(history: CoverageHistory, args) -> int:
+    """Analyze a package as coverage_report.py would and record the run."""
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+    package_name = package_path.name
+    if args.pack:
+        coverage_stats = load_pack_stats(Path(args.pack), package_name, args.filter)
+    else:
+        if args.merge:
+            coverage_file = require_merged_coverage_file(package_path)
+        else:
+            coverage_file = require_coverage_file(package_path)
+        cache = open_coverage_cache(package_path, None, not args.no_cache)
+        coverage_stats = collect_coverage_stats(coverage_file, package_name, args.filter, args.stream, cache,
+                                                args.engine)
+    commit = args.commit or git_commit(package_path)
+    return history.record_run(package_name, coverage_stats, commit, args.timestamp, args.filter)
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--db', default=str(DEFAULT_HISTORY_PATH),
+                        help='History database (default: ios/Packages/.coverage-history.sqlite)')
+    common.add_argument('--json', action='store_true', help='Print the result as JSON instead of a table')
+
+    # A filtered run covers only part of a package, so it is never compared with full runs
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--filter', help='Only runs recorded with this filter (default: unfiltered runs)')
+
+    parser = argparse.ArgumentParser(
+        description='Record and query Swift coverage history',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    record = commands.add_parser('record', parents=[common], help='Analyze a package and store the run')
+    record.add_argument('package_path', help='Path to the Swift package directory')
+    record.add_argument('--commit', help='Commit to record (default: git HEAD of the package directory)')
+    record.add_argument('--timestamp', help='Run time, ISO 8601 (default: now, UTC)')
+    record.add_argument('--filter', help='Only analyze files matching this pattern')
+    record.add_argument('--stream', action='store_true', help='Stream the export instead of loading it into memory')
+    record.add_argument('--merge', action='store_true', help='Merge every export found for the package first')
+    record.add_argument('--pack', help='Read the analysis from a coverage pack instead of the export')
+    record.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    record.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+
+    runs = commands.add_parser('runs', parents=[common], help='List recorded runs, newest first')
+    runs.add_argument('--package', help='Only runs of this package')
+    runs.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'Maximum rows (default: {DEFAULT_LIMIT})')
+
+    trend = commands.add_parser('trend', parents=[common, selection], help='Per-file coverage over the last runs')
+    trend.add_argument('package', help='Package name')
+    trend.add_argument('pattern', help='Substring of the file paths to show')
+    trend.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                       help=f'Number of runs to look back over (default: {DEFAULT_RUNS})')
+
+    regressions = commands.add_parser('regressions', parents=[common, selection],
+                                      help='Files whose coverage dropped the most between two runs')
+    regressions.add_argument('package', help='Package name')
+    regressions.add_argument('--runs', type=int, default=2,
+                             help='Compare the latest run with the run this many runs back (default: 2, the previous)')
+    regressions.add_argument('--base', help='Earlier run, by id or commit prefix')
+    regressions.add_argument('--head', help='Later run, by id or commit prefix (default: latest)')
+    regressions.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                             help=f'Maximum rows (default: {DEFAULT_LIMIT})')
+
+    rollup = commands.add_parser('rollup', parents=[common, selection], help='Package totals over the last runs')
+    rollup.add_argument('--package', help='Only this package')
+    rollup.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help=f'Number of runs to look back over (default: {DEFAULT_RUNS})')
+    rollup.add_argument('--by-category', action='store_true', help='Include per-category totals')
+
+    args = parser.parse_args()
+
+    try:
+        history = CoverageHistory(Path(args.db))
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"Error: Could not open coverage history {args.db}: {e}")
+        sys.exit(1)
+
+    with history:
+        if args.command == 'record':
+            run_id = record_package(history, args)
+            run = history.run(run_id)
+            if args.json:
+                print(json.dumps(run, indent=2))
+            else:
+                print(f"✅ Recorded run {run_id} ({run['files']} files, {run['overall_percentage']:.1f}% overall) "
+                      f"in {args.db}")
+        elif args.command == 'runs':
+            result = history.runs(args.package, args.limit)
+            print(json.dumps(result, indent=2) if args.json else format_runs(result))
+        elif args.command == 'trend':
+            result = history.file_trend(args.package, args.pattern, args.runs, args.filter)
+            print(json.dumps(result, indent=2) if args.json else format_trend(result))
+        elif args.command == 'regressions':
+            recent = history.recent_run_ids(args.package, max(2, args.runs), args.filter)
+            if args.head:
+                head_id = history.resolve_run(args.package, args.head, args.filter)
+            else:
+                head_id = recent[0] if recent else None
+            if args.base:
+                base_id = history.resolve_run(args.package, args.base, args.filter)
+            else:
+                base_id = recent[max(2, args.runs) - 1] if len(recent) >= max(2, args.runs) else None
+            if head_id is None or base_id is None:
+                print(f"Error: Not enough recorded runs of {args.package} to compare")
+                sys.exit(1)
+            base, head = history.run(base_id), history.run(head_id)
+            result = history.regressions(args.package, base_id, head_id, args.limit)
+            if args.json:
+                print(json.dumps({'base': base, 'head': head, 'regressions': result}, indent=2))
+            else:
+                print(format_regressions(result, base, head))
+        elif args.command == 'rollup':
+            result = history.rollup(args.package, args.runs, args.by_category, args.filter)
+            print(json.dumps(result, indent=2) if args.json else format_rollup(result))
+
+if __name__ == '__main__':
+    main()
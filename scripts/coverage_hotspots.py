@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Hotspots
+
+Uses the execution counts in a coverage export as a cheap profiler. The
+reports only ask whether code ran; this asks how often, and lists the most
+executed lines, regions, functions and files of a package. Hot loops in the
+Domain and Application layers show up straight from a test run.
+
+The export is read in one streaming pass over `files[]` and `functions[]`.
+Each ranking is a bounded heap of the top K entries, so memory stays flat
+however large the export is.
+
+- Lines      A line's hits are the highest count of the segments starting on
+             it, the rule the reports use for line coverage
+- Regions    Code regions of `functions[]`, with their function
+- Functions  Ranked by their hottest region. Calls is the function's entry
+             count; a region run many times per call is a loop
+- Files      Ranked by executions: the sum of their line hits
+
+A file or function that appears in several `data[]` entries is ranked once
+per entry; use --merge to sum the copies first. Function names are demangled
+(see coverage_demangle.py).
+
+Usage:
+    python3 coverage_hotspots.py <package_path> [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --top <n>             Entries kept per ranking (default: 20)
+    --format <list>       Comma-separated formats: text, html, json (default: text,html)
+    --filter <pattern>    Only rank files matching this pattern
+    --output-dir <path>   Directory for the reports (default: package dir)
+    --mangled            Show mangled symbols instead of demangling them
+    --merge              Merge every export found for the package (architectures, shards) first
+    --help               Show this help message
+
+Formats:
+    text   COVERAGE_HOTSPOTS.md      Ranked tables, also printed
+    html   coverage_hotspots.html    The same tables with heat bars
+    json   coverage_hotspots.json    The rankings as data
+
+Examples:
+    # The 20 hottest lines, regions, functions and files
+    python3 coverage_hotspots.py ios/Packages/Troop900Domain
+
+    # Top 50 in the use cases, as JSON
+    python3 coverage_hotspots.py ios/Packages/Troop900Application --filter UseCases --top 50 --format json
+"""
+
+import sys
+import json
+import html
+import heapq
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from coverage_core import classify_source_file, parse_choices, require_coverage_file, should_include_file
+from coverage_demangle import demangle_names
+from coverage_merge import require_merged_coverage_file
+from coverage_stream import iter_export_entries
+
+DEFAULT_TOP = 20
+
+# llvm-cov region kinds (element 7 of a function region)
+CODE_REGION = 0
+
+RANKINGS = ['functions', 'regions', 'lines', 'files']
+
+class TopK:
+    """
+    Keeps the k entries with the highest counts in a min-heap of size k.
+    Ties keep the entry pushed first, so results follow export order.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []
+        self.pushed = 0
+
+    def push(self, count: int, item: Dict):
+        self.pushed += 1
+        entry = (count, -self.pushed, item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def would_keep(self, count: int) -> bool:
+        """Whether an entry with this count could enter the heap; saves building it."""
+        return len(self.heap) < self.k or count > self.heap[0][0]
+
+    def ranked(self) -> List[Dict]:
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+def collect_hotspots(coverage_file: Path, package_name: str, top: int = DEFAULT_TOP,
+                     filter_pattern: Optional[str] = None, demangle: bool = True) -> Dict:
+    """
+    Stream an export once and keep the top entries of every ranking. Function
+    names of the kept entries are demangled afterwards, in one batch.
+    """
+    def include(filename: str) -> bool:
+        return f'/Sources/{package_name}/' in filename and should_include_file(filename, filter_pattern)
+
+    rankings = {name: TopK(top) for name in RANKINGS}
+    files = functions = 0
+    for kind, entry in iter_export_entries(str(coverage_file), include):
+        if kind == 'files':
+            source = classify_source_file(entry['filename'], package_name)
+            if source is None:
+                continue
+            files += 1
+            hits = {}
+            for segment in entry.get('segments', []):
+                line, count = segment[0], segment[2]
+                if count > hits.get(line, -1):
+                    hits[line] = count
+            relative_path = source[2]
+            for line, count in hits.items():
+                if count > 0 and rankings['lines'].would_keep(count):
+                    rankings['lines'].push(count, {'hits': count, 'file': relative_path, 'line': line})
+            executions = sum(hits.values())
+            if executions > 0 and rankings['files'].would_keep(executions):
+                hottest = max(hits, key=lambda line: (hits[line], -line))
+                rankings['files'].push(executions, {
+                    'executions': executions, 'file': relative_path, 'category': source[0],
+                    'lines': len(hits), 'covered_lines': sum(1 for count in hits.values() if count > 0),
+                    'hottest_line': hottest, 'hottest_hits': hits[hottest],
+                })
+            continue
+
+        filenames = entry.get('filenames') or []
+        regions = []
+        for region in entry.get('regions', []):
+            if len(region) < 8 or region[7] != CODE_REGION or region[4] <= 0 or region[5] >= len(filenames):
+                continue
+            filename = filenames[region[5]]
+            if not include(filename):
+                continue
+            source = classify_source_file(filename, package_name)
+            if source is not None:
+                regions.append((region, source[2]))
+        if not regions:
+            continue
+        functions += 1
+        name = entry.get('name', '')
+        for region, relative_path in regions:
+            if rankings['regions'].would_keep(region[4]):
+                rankings['regions'].push(region[4], {
+                    'hits': region[4], 'file': relative_path, 'line': region[0], 'column': region[1],
+                    'end_line': region[2], 'end_column': region[3], 'function': name,
+                })
+        hottest, relative_path = max(regions, key=lambda pair: pair[0][4])
+        if rankings['functions'].would_keep(hottest[4]):
+            calls = entry.get('count', 0)
+            rankings['functions'].push(hottest[4], {
+                'function': name, 'file': regions[0][1], 'line': regions[0][0][0], 'calls': calls,
+                'hottest_hits': hottest[4], 'hottest_line': hottest[0], 'hottest_file': relative_path,
+                'per_call': hottest[4] / calls if calls > 0 else None,
+            })
+
+    ranked = {name: ranking.ranked() for name, ranking in rankings.items()}
+    kept = ranked['functions'] + ranked['regions']
+    names = demangle_names(entry['function'] for entry in kept) if demangle else {}
+    for entry in kept:
+        entry['symbol'] = entry['function']
+        entry['function'] = names.get(entry['symbol'], entry['symbol'])
+
+    return {
+        'package': package_name,
+        'filter': filter_pattern,
+        'top': top,
+        'files_scanned': files,
+        'functions_scanned': functions,
+        **ranked,
+    }
+
+def generate_hotspot_report(hotspots: Dict) -> str:
+    """Format the rankings as a text report."""
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"EXECUTION HOTSPOTS - {hotspots['package']}")
+    if hotspots['filter']:
+        lines.append(f"Filter: Files containing '{hotspots['filter']}'")
+    lines.append("=" * 100)
+    lines.append(f"Top {hotspots['top']} by execution count, from {hotspots['files_scanned']:,} files "
+                 f"and {hotspots['functions_scanned']:,} functions.")
+
+    lines.append("")
+    lines.append("HOTTEST FUNCTIONS")
+    lines.append("-" * 100)
+    lines.append(f"{'Hits':>14} {'Calls':>12} {'Per call':>10}  Function")
+    for entry in hotspots['functions']:
+        per_call = f"{entry['per_call']:,.1f}x" if entry['per_call'] is not None else '-'
+        lines.append(f"{entry['hottest_hits']:>14,} {entry['calls']:>12,} {per_call:>10}  {entry['function']}")
+        lines.append(f"{'':>40}  {entry['file']}:{entry['line']}, hottest at line {entry['hottest_line']}")
+
+    lines.append("")
+    lines.append("HOTTEST REGIONS")
+    lines.append("-" * 100)
+    lines.append(f"{'Hits':>14}  Location")
+    for entry in hotspots['regions']:
+        lines.append(f"{entry['hits']:>14,}  {entry['file']}:{entry['line']}:{entry['column']}"
+                     f"-{entry['end_line']}:{entry['end_column']}  in {entry['function']}")
+
+    lines.append("")
+    lines.append("HOTTEST LINES")
+    lines.append("-" * 100)
+    lines.append(f"{'Hits':>14}  Location")
+    for entry in hotspots['lines']:
+        lines.append(f"{entry['hits']:>14,}  {entry['file']}:{entry['line']}")
+
+    lines.append("")
+    lines.append("HOTTEST FILES")
+    lines.append("-" * 100)
+    lines.append(f"{'Executions':>14} {'Lines run':>11}  File (hottest line)")
+    for entry in hotspots['files']:
+        lines.append(f"{entry['executions']:>14,} {entry['covered_lines']:>5}/{entry['lines']:<5}  {entry['file']} "
+                     f"(line {entry['hottest_line']}: {entry['hottest_hits']:,})")
+
+    if not any(hotspots[name] for name in RANKINGS):
+        lines.append("")
+        lines.append("No executed code found.")
+    lines.append("")
+    lines.append("=" * 100)
+    return "\n".join(lines)
+
+def _heat(count: int, hottest: int) -> str:
+    width = count / hottest * 100 if hottest > 0 else 0
+    return f'<div class="heat"><div class="heat-fill" style="width: {width:.1f}%"></div></div>'
+
+def iter_hotspot_html(hotspots: Dict) -> Iterator[str]:
+    """Render the rankings as a standalone HTML page, in chunks."""
+    package_name = html.escape(hotspots['package'])
+    filter_info = f" (Filtered: {html.escape(hotspots['filter'])})" if hotspots['filter'] else ""
+    yield f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Execution Hotspots - {package_name}</title>
+    <style>
+        * {{
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }}
+
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+            background: #f5f5f7;
+            color: #1d1d1f;
+            line-height: 1.6;
+        }}
+
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+
+        header {{
+            background: linear-gradient(135deg, #ff9f0a 0%, #ff3b30 100%);
+            color: white;
+            padding: 40px 20px;
+            margin-bottom: 30px;
+            border-radius: 12px;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+        }}
+
+        h1 {{
+            font-size: 2.5em;
+            margin-bottom: 10px;
+            font-weight: 600;
+        }}
+
+        .subtitle {{
+            font-size: 1.1em;
+            opacity: 0.9;
+        }}
+
+        .ranking {{
+            background: white;
+            border-radius: 12px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+            margin-bottom: 20px;
+            padding: 20px;
+            overflow-x: auto;
+        }}
+
+        h2 {{
+            font-size: 1.3em;
+            margin-bottom: 10px;
+        }}
+
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 0.9em;
+        }}
+
+        th, td {{
+            text-align: left;
+            padding: 6px 8px;
+            border-bottom: 1px solid #e5e5e7;
+            vertical-align: top;
+        }}
+
+        th {{
+            color: #666;
+            text-transform: uppercase;
+            font-size: 0.8em;
+            letter-spacing: 0.5px;
+        }}
+
+        td.count {{
+            text-align: right;
+            font-variant-numeric: tabular-nums;
+            white-space: nowrap;
+        }}
+
+        .location, .symbol {{
+            font-family: 'Monaco', 'Courier New', monospace;
+            word-break: break-all;
+        }}
+
+        .symbol {{
+            color: #666;
+        }}
+
+        .heat {{
+            width: 120px;
+            height: 8px;
+            background: #e5e5e7;
+            border-radius: 4px;
+            overflow: hidden;
+            margin-top: 6px;
+        }}
+
+        .heat-fill {{
+            height: 100%;
+            background: linear-gradient(90deg, #ff9f0a 0%, #ff3b30 100%);
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <header>
+            <h1>🔥 Execution Hotspots</h1>
+            <div class="subtitle">{package_name}{filter_info} · top {hotspots['top']} of {hotspots['files_scanned']:,} files and {hotspots['functions_scanned']:,} functions</div>
+        </header>
+"""
+    functions = hotspots['functions']
+    hottest = functions[0]['hottest_hits'] if functions else 0
+    yield """
+        <div class="ranking">
+            <h2>Hottest Functions</h2>
+            <table>
+                <tr><th></th><th>Hits</th><th>Calls</th><th>Per call</th><th>Function</th></tr>
+"""
+    for entry in functions:
+        per_call = f"{entry['per_call']:,.1f}x" if entry['per_call'] is not None else '-'
+        yield (f"                <tr><td>{_heat(entry['hottest_hits'], hottest)}</td>"
+               f"<td class=\"count\">{entry['hottest_hits']:,}</td><td class=\"count\">{entry['calls']:,}</td>"
+               f"<td class=\"count\">{per_call}</td>"
+               f"<td><div class=\"symbol\">{html.escape(entry['function'])}</div>"
+               f"<div class=\"location\">{html.escape(entry['file'])}:{entry['line']}, "
+               f"hottest at line {entry['hottest_line']}</div></td></tr>\n")
+    yield """            </table>
+        </div>
+"""
+
+    regions = hotspots['regions']
+    hottest = regions[0]['hits'] if regions else 0
+    yield """
+        <div class="ranking">
+            <h2>Hottest Regions</h2>
+            <table>
+                <tr><th></th><th>Hits</th><th>Region</th></tr>
+"""
+    for entry in regions:
+        yield (f"                <tr><td>{_heat(entry['hits'], hottest)}</td><td class=\"count\">{entry['hits']:,}</td>"
+               f"<td><div class=\"location\">{html.escape(entry['file'])}:{entry['line']}:{entry['column']}"
+               f"-{entry['end_line']}:{entry['end_column']}</div>"
+               f"<div class=\"symbol\">{html.escape(entry['function'])}</div></td></tr>\n")
+    yield """            </table>
+        </div>
+"""
+
+    lines = hotspots['lines']
+    hottest = lines[0]['hits'] if lines else 0
+    yield """
+        <div class="ranking">
+            <h2>Hottest Lines</h2>
+            <table>
+                <tr><th></th><th>Hits</th><th>Line</th></tr>
+"""
+    for entry in lines:
+        yield (f"                <tr><td>{_heat(entry['hits'], hottest)}</td><td class=\"count\">{entry['hits']:,}</td>"
+               f"<td class=\"location\">{html.escape(entry['file'])}:{entry['line']}</td></tr>\n")
+    yield """            </table>
+        </div>
+"""
+
+    files = hotspots['files']
+    hottest = files[0]['executions'] if files else 0
+    yield """
+        <div class="ranking">
+            <h2>Hottest Files</h2>
+            <table>
+                <tr><th></th><th>Executions</th><th>Lines run</th><th>File</th></tr>
+"""
+    for entry in files:
+        yield (f"                <tr><td>{_heat(entry['executions'], hottest)}</td>"
+               f"<td class=\"count\">{entry['executions']:,}</td>"
+               f"<td class=\"count\">{entry['covered_lines']}/{entry['lines']}</td>"
+               f"<td><div class=\"location\">{html.escape(entry['file'])}</div>"
+               f"<div class=\"symbol\">hottest: line {entry['hottest_line']} ({entry['hottest_hits']:,})</div></td></tr>\n")
+    yield """            </table>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+def generate_hotspot_json(hotspots: Dict) -> str:
+    return json.dumps(hotspots, indent=2)
+
+# format name -> (default file name, renderer returning the report text or an iterable of chunks)
+HOTSPOT_FORMATS = {
+    'text': ('COVERAGE_HOTSPOTS.md', generate_hotspot_report),
+    'html': ('coverage_hotspots.html', iter_hotspot_html),
+    'json': ('coverage_hotspots.json', generate_hotspot_json),
+}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rank the most executed code of a Swift package',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help=f'Entries kept per ranking (default: {DEFAULT_TOP})')
+    parser.add_argument('--format', type=parse_choices(HOTSPOT_FORMATS), default=['text', 'html'],
+                        help=f"Comma-separated formats: {', '.join(HOTSPOT_FORMATS)} (default: text,html)")
+    parser.add_argument('--filter', help='Only rank files matching this pattern')
+    parser.add_argument('--output-dir', help='Directory for the reports (default: package dir)')
+    parser.add_argument('--mangled', action='store_true', help='Show mangled symbols instead of demangling them')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+    if args.top < 1:
+        print("Error: --top must be at least 1")
+        sys.exit(1)
+
+    package_name = package_path.name
+    output_dir = Path(args.output_dir) if args.output_dir else package_path
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.merge:
+        coverage_file = require_merged_coverage_file(package_path)
+    else:
+        coverage_file = require_coverage_file(package_path)
+    try:
+        hotspots = collect_hotspots(coverage_file, package_name, args.top, args.filter, demangle=not args.mangled)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+
+    for name in args.format:
+        file_name, render = HOTSPOT_FORMATS[name]
+        report = render(hotspots)
+        if name == 'text':
+            print(report)
+        output_path = output_dir / file_name
+        with open(output_path, 'w') as f:
+            if isinstance(report, str):
+                f.write(report)
+            else:
+                f.writelines(report)
+        print(f"✅ {name} report saved to: {output_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Export Merger
+
+Combines any number of llvm-cov exports (test shards, per-architecture builds,
+several `data[]` entries) into one export. Wherever the same source file
+appears more than once, its execution counts are summed per (line, col)
+segment instead of the last copy replacing the others, so sharded or
+multi-arch runs give one correct report.
+
+Segments are change points: each sets the count from its position up to the
+next segment. Merging sweeps the union of every copy's positions and, at each
+one, sums the count each copy has in effect there. When all copies share the
+same positions - the usual case for shards of one build - this is a plain sum
+per (line, col). Branch counts are summed per branch region and `functions[]`
+entries per function name. The per-file `summary` blocks and `totals` are
+recomputed from the merged counts.
+
+Memory stays bounded regardless of the number or size of the inputs: file and
+function entries are first partitioned into temporary bucket files by a hash of
+their name, then merged one bucket at a time. Only one bucket is decoded at
+once; the merged export is written incrementally.
+
+Usage:
+    python3 coverage_merge.py <output_path> <export> [<export> ...] [options]
+    python3 coverage_merge.py --package <package_path> [options]
+
+Options:
+    --package <path>      Merge every export found in the package's build directories
+                          (default output: <package>/.build/coverage-merged/<Package>.json)
+    --bucket-mb <n>       Target size of one bucket of input in MB (default: 64)
+    --help               Show this help message
+
+Examples:
+    # Combine the exports of four CI test shards
+    python3 coverage_merge.py merged/Troop900Application.json shard*/Troop900Application.json
+
+    # Merge the arm64 and x86_64 builds of a package
+    python3 coverage_merge.py --package ios/Packages/Troop900Application
+
+The report scripts do the same with --merge, e.g.
+    python3 coverage_report.py ios/Packages/Troop900Application --merge
+"""
+
+import json
+import os
+import sys
+import zlib
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from coverage_core import analyze_segments, find_coverage_files, require_coverage_file
+from coverage_profile import CoverageProfiler, profile_phase
+from coverage_stream import iter_export_entries
+
+DEFAULT_BUCKET_BYTES = 64 * 1024 * 1024
+
+# Keeps the number of open bucket files well below the usual descriptor limit
+MAX_BUCKETS = 256
+
+EXPORT_TYPE = 'llvm.coverage.json.export'
+EXPORT_VERSION = '2.0.1'
+
+def merged_export_path(package_path: Path) -> Path:
+    """Where --merge writes a package's merged export."""
+    return package_path / '.build' / 'coverage-merged' / f'{package_path.name}.json'
+
+def merge_inputs_path(output_path: Path) -> Path:
+    """Where the inputs of a merged export are recorded: `<name>.inputs.json` next to it."""
+    return output_path.with_name(output_path.stem + '.inputs.json')
+
+def merge_inputs(export_paths: List[Path]) -> List[List]:
+    """[path, size, mtime_ns] of each export, identifying exactly what a merge read."""
+    inputs = []
+    for path in export_paths:
+        stat = path.stat()
+        inputs.append([str(path.resolve()), stat.st_size, stat.st_mtime_ns])
+    return sorted(inputs)
+
+def record_merge_inputs(output_path: Path, export_paths: List[Path]):
+    """Record the exports a merged export was made from."""
+    with open(merge_inputs_path(output_path), 'w') as f:
+        json.dump(merge_inputs(export_paths), f)
+
+def recorded_merge_inputs(output_path: Path) -> Optional[List]:
+    """The inputs recorded for a merged export, or None if it isn't one."""
+    if not output_path.exists():
+        return None
+    try:
+        with open(merge_inputs_path(output_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def merge_is_current(output_path: Path, export_paths: List[Path]) -> bool:
+    """Whether output_path was merged from exactly these exports, none changed since."""
+    recorded = recorded_merge_inputs(output_path)
+    return recorded is not None and recorded == merge_inputs(export_paths)
+
+def merge_segments(segment_lists: List[List]) -> List:
+    """
+    Merge several copies of one file's segments by summing, at every position
+    any copy has a segment, the counts in effect in each copy.
+    Segments are [line, col, count, has_count, is_region_entry, is_gap_region].
+    """
+    if len(segment_lists) == 1:
+        return segment_lists[0]
+
+    width = max((len(segment) for segments in segment_lists for segment in segments), default=6)
+    active = [None] * len(segment_lists)
+    merged = []
+    position = None
+    at_position = []
+
+    def emit():
+        count = sum(segment[2] for segment in active if segment is not None and segment[3])
+        has_count = any(segment is not None and segment[3] for segment in active)
+        merged_segment = [position[0], position[1], count, has_count,
+                          any(len(segment) > 4 and segment[4] for segment in at_position)]
+        if width > 5:
+            merged_segment.append(all(len(segment) > 5 and segment[5] for segment in at_position))
+        merged.append(merged_segment)
+
+    # Repeated positions within one copy are matched up by their occurrence
+    tagged = []
+    for index, segments in enumerate(segment_lists):
+        previous, occurrence = None, 0
+        for segment in segments:
+            key = (segment[0], segment[1])
+            occurrence = occurrence + 1 if key == previous else 0
+            previous = key
+            tagged.append(((segment[0], segment[1], occurrence), index, segment))
+    tagged.sort(key=lambda item: (item[0], item[1]))
+    for key, index, segment in tagged:
+        if key != position:
+            if position is not None:
+                emit()
+            position = key
+            at_position = []
+        active[index] = segment
+        at_position.append(segment)
+    if position is not None:
+        emit()
+    return merged
+
+def _region_key(region: List) -> Tuple:
+    """A branch or code region's identity: everything but its counts."""
+    return tuple(region[:4]) + tuple(region[6:])
+
+def merge_branches(branch_lists: List[List]) -> List:
+    """Sum true/false counts of identical branch regions."""
+    if len(branch_lists) == 1:
+        return branch_lists[0]
+    merged = {}
+    for branches in branch_lists:
+        for branch in branches:
+            key = _region_key(branch)
+            if key in merged:
+                merged[key][4] += branch[4]
+                merged[key][5] += branch[5]
+            else:
+                merged[key] = list(branch)
+    return sorted(merged.values(), key=lambda branch: (branch[0], branch[1], branch[2], branch[3]))
+
+def merge_regions(region_lists: List[List]) -> List:
+    """Sum the execution counts of identical function regions, keeping first-seen order."""
+    if len(region_lists) == 1:
+        return region_lists[0]
+    merged = {}
+    for regions in region_lists:
+        for region in regions:
+            key = tuple(region[:4]) + tuple(region[5:])
+            if key in merged:
+                merged[key][4] += region[4]
+            else:
+                merged[key] = list(region)
+    return list(merged.values())
+
+def merge_functions(copies: List[Dict]) -> Dict:
+    """Merge copies of one function record."""
+    merged = dict(copies[0])
+    merged['count'] = sum(copy.get('count', 0) for copy in copies)
+    merged['regions'] = merge_regions([copy.get('regions', []) for copy in copies])
+    merged['branches'] = merge_branches([copy.get('branches', []) for copy in copies])
+    return merged
+
+def _summary_block(count: int, covered: int, notcovered: bool = False) -> Dict:
+    block = {'count': count, 'covered': covered,
+             'percent': (covered / count * 100) if count > 0 else 0}
+    if notcovered:
+        block['notcovered'] = count - covered
+    return block
+
+def file_summary(segments: List, branches: List, functions: Tuple[int, int]) -> Dict:
+    """An llvm-cov style summary block for merged file coverage."""
+    covered_lines, total_lines, covered_regions, total_regions = analyze_segments(segments)
+    # llvm-cov counts the true and false side of every branch separately
+    covered_branches = sum((branch[4] > 0) + (branch[5] > 0) for branch in branches)
+    function_count, covered_functions = functions
+    return {
+        'branches': _summary_block(2 * len(branches), covered_branches, notcovered=True),
+        'functions': _summary_block(function_count, covered_functions),
+        'instantiations': _summary_block(function_count, covered_functions),
+        'lines': _summary_block(total_lines, covered_lines),
+        'regions': _summary_block(total_regions, covered_regions, notcovered=True),
+    }
+
+def _bucket(name: str, buckets: int) -> int:
+    return zlib.crc32(name.encode('utf-8')) % buckets
+
+def _partition_exports(export_paths: List[Path], file_parts: List, function_parts: List) -> int:
+    """Spread every file and function entry over the bucket files; returns the number of file entries."""
+    entries = 0
+    for export_path in export_paths:
+        for kind, entry in iter_export_entries(str(export_path), fields=('segments', 'branches', 'expansions'),
+                                               raw=True):
+            if kind == 'functions':
+                line = json.dumps(entry, separators=(',', ':'))
+                function_parts[_bucket(entry.get('name', ''), len(function_parts))].write(line + '\n')
+                continue
+            filename = entry['filename']
+            # Raw JSON can only contain newlines as whitespace, so one record per line is safe
+            record = ','.join([
+                json.dumps(filename),
+                entry.get('segments', '[]'),
+                entry.get('branches', '[]'),
+                entry.get('expansions', '[]'),
+            ]).replace('\n', ' ')
+            file_parts[_bucket(filename, len(file_parts))].write(f'[{record}]\n')
+            entries += 1
+    return entries
+
+def _read_bucket(part) -> Iterable:
+    part.seek(0)
+    for line in part:
+        yield json.loads(line)
+
+def merge_exports(export_paths: List[Path], output_path: Path,
+                  bucket_bytes: int = DEFAULT_BUCKET_BYTES) -> Dict:
+    """
+    Merge llvm-cov exports into output_path. Returns what was merged:
+    exports, entries (file entries read), files, merged_files (files seen
+    more than once), functions, segments and bytes.
+    """
+    export_paths = [Path(path) for path in export_paths]
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    total_bytes = sum(path.stat().st_size for path in export_paths)
+    buckets = max(1, min(MAX_BUCKETS, -(-total_bytes // max(1, bucket_bytes))))
+
+    info = {'exports': len(export_paths), 'entries': 0, 'files': 0, 'merged_files': 0,
+            'functions': 0, 'segments': 0}
+    totals = {}
+    # filename -> [functions, covered functions]; small, one pair per source file
+    function_stats = {}
+
+    with tempfile.TemporaryDirectory(prefix='coverage-merge-') as work_dir:
+        file_parts = [open(os.path.join(work_dir, f'files-{i}.jsonl'), 'w+', encoding='utf-8')
+                      for i in range(buckets)]
+        function_parts = [open(os.path.join(work_dir, f'functions-{i}.jsonl'), 'w+', encoding='utf-8')
+                          for i in range(buckets)]
+        merged_functions = open(os.path.join(work_dir, 'functions.json'), 'w+', encoding='utf-8')
+        partial_path = output_path.with_name(f'.{output_path.name}.partial')
+        try:
+            info['entries'] = _partition_exports(export_paths, file_parts, function_parts)
+
+            # Functions first: each file's summary needs its function counts
+            for part in function_parts:
+                copies_by_key = {}
+                for function in _read_bucket(part):
+                    key = (function.get('name', ''), tuple(function.get('filenames', [])))
+                    copies_by_key.setdefault(key, []).append(function)
+                for key in sorted(copies_by_key):
+                    function = merge_functions(copies_by_key[key])
+                    if info['functions']:
+                        merged_functions.write(',')
+                    merged_functions.write(json.dumps(function, separators=(',', ':')))
+                    info['functions'] += 1
+                    if function.get('filenames'):
+                        stats = function_stats.setdefault(function['filenames'][0], [0, 0])
+                        stats[0] += 1
+                        stats[1] += function['count'] > 0
+                part.close()
+
+            with open(partial_path, 'w', encoding='utf-8') as out:
+                out.write('{"data":[{"files":[')
+                for part in file_parts:
+                    copies_by_name = {}
+                    for filename, segments, branches, expansions in _read_bucket(part):
+                        copies_by_name.setdefault(filename, []).append((segments, branches, expansions))
+                    part.close()
+                    for filename in sorted(copies_by_name):
+                        copies = copies_by_name.pop(filename)
+                        segments = merge_segments([copy[0] for copy in copies])
+                        branches = merge_branches([copy[1] for copy in copies])
+                        summary = file_summary(segments, branches, function_stats.get(filename, (0, 0)))
+                        for kind, block in summary.items():
+                            total = totals.setdefault(kind, {'count': 0, 'covered': 0})
+                            total['count'] += block['count']
+                            total['covered'] += block['covered']
+                        entry = {
+                            'branches': branches,
+                            # Expansions carry no counts of their own to add; the first copy's are kept
+                            'expansions': copies[0][2],
+                            'filename': filename,
+                            'segments': segments,
+                            'summary': summary,
+                        }
+                        if info['files']:
+                            out.write(',')
+                        out.write(json.dumps(entry, separators=(',', ':')))
+                        info['files'] += 1
+                        info['segments'] += len(segments)
+                        info['merged_files'] += len(copies) > 1
+
+                out.write('],"functions":[')
+                merged_functions.seek(0)
+                while True:
+                    chunk = merged_functions.read(1 << 20)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+
+                for kind, total in totals.items():
+                    total.update(_summary_block(total['count'], total['covered'],
+                                                notcovered=kind in ('branches', 'regions')))
+                out.write('],"totals":')
+                out.write(json.dumps({kind: totals[kind] for kind in sorted(totals)}, separators=(',', ':')))
+                out.write(f'}}],"type":"{EXPORT_TYPE}","version":"{EXPORT_VERSION}"}}')
+            os.replace(partial_path, output_path)
+        finally:
+            for part in file_parts + function_parts + [merged_functions]:
+                part.close()
+            if partial_path.exists():
+                partial_path.unlink()
+
+    info['bytes'] = output_path.stat().st_size
+    return info
+
+def require_merged_coverage_file(package_path: Path, profiler: Optional[CoverageProfiler] = None) -> Path:
+    """
+    Merge every export found for a package into one, or exit with instructions
+    if there is none. An existing merge is reused while its recorded inputs
+    (paths, sizes and modification times) match the exports found.
+    """
+    package_name = package_path.name
+    with profile_phase(profiler, 'find_coverage_file'):
+        export_paths = find_coverage_files(package_path)
+    if not export_paths:
+        return require_coverage_file(package_path, profiler)
+
+    print(f"Found {len(export_paths)} coverage export(s) for {package_name}:")
+    for export_path in export_paths:
+        print(f"  {export_path}")
+
+    output_path = merged_export_path(package_path)
+    if merge_is_current(output_path, export_paths):
+        print(f"Using merged coverage data: {output_path}")
+        return output_path
+
+    with profile_phase(profiler, 'merge_exports'):
+        info = merge_exports(export_paths, output_path)
+    record_merge_inputs(output_path, export_paths)
+    print(f"Merged {info['entries']} file entries into {info['files']} files "
+          f"({info['merged_files']} combined): {output_path}")
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Merge llvm-cov coverage exports',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('paths', nargs='*', help='Output path followed by the exports to merge')
+    parser.add_argument('--package', help="Merge every export found in the package's build directories")
+    parser.add_argument('--bucket-mb', type=int, default=DEFAULT_BUCKET_BYTES // (1024 * 1024),
+                        help='Target size of one bucket of input in MB (default: 64)')
+
+    args = parser.parse_args()
+
+    if args.package:
+        package_path = Path(args.package).resolve()
+        if not package_path.exists():
+            print(f"Error: Package path does not exist: {package_path}")
+            sys.exit(1)
+        export_paths = find_coverage_files(package_path)
+        if not export_paths:
+            require_coverage_file(package_path)
+        output_path = Path(args.paths[0]) if args.paths else merged_export_path(package_path)
+        if len(args.paths) > 1:
+            print("Error: With --package, only the output path may be given")
+            sys.exit(1)
+    else:
+        if len(args.paths) < 2:
+            print("Error: Give the output path and at least one export to merge")
+            sys.exit(1)
+        output_path = Path(args.paths[0])
+        export_paths = [Path(path) for path in args.paths[1:]]
+        missing = [str(path) for path in export_paths if not path.exists()]
+        if missing:
+            print(f"Error: Export not found: {', '.join(missing)}")
+            sys.exit(1)
+
+    if output_path.resolve() in [path.resolve() for path in export_paths]:
+        print(f"Error: The output would overwrite an input: {output_path}")
+        sys.exit(1)
+
+    print(f"Merging {len(export_paths)} export(s)...")
+    try:
+        info = merge_exports(export_paths, output_path, args.bucket_mb * 1024 * 1024)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+    if args.package:
+        # Lets --merge reuse it while the package's exports are unchanged
+        record_merge_inputs(output_path, export_paths)
+
+    print(f"✓ Wrote {output_path}")
+    print(f"  {info['entries']:,} file entries -> {info['files']:,} files "
+          f"({info['merged_files']:,} combined), {info['segments']:,} segments, "
+          f"{info['functions']:,} functions, {info['bytes'] / (1024 * 1024):.1f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Pack Writer
+
+Analyzes a package's coverage export once and saves the result as a coverage
+pack: a compact, columnar binary file that later report runs, diffs and
+queries open with mmap instead of parsing the JSON export again.
+
+A pack holds, for every source file in the package:
+
+- its path, category, name and relative path, interned in one string table
+- the precomputed statistics (line/branch counts and percentages)
+- its uncovered ranges
+- its segments, sorted by position, as packed line, column, count and flag
+  columns
+
+Each section is a flat little-endian array starting on an 8-byte boundary,
+listed in a directory after the header, so a reader maps the file and views
+each column in place without decoding anything. Files keep the export's order,
+which the reports' tie-breaking depends on; a path-sorted index finds one file
+by binary search, and coverage_query.py finds a line or column within it by
+binary search over the segment columns.
+
+Usage:
+    python3 coverage_pack.py <package_path> [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --output <path>       Pack file path (default: <package>/.build/coverage-pack/<Package>.covpack)
+    --filter <pattern>    Only pack files matching this pattern
+    --merge              Merge every export found for the package (architectures, shards) first
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --help               Show this help message
+
+Examples:
+    # Pack once, then render reports from the pack
+    python3 coverage_pack.py ios/Packages/Troop900Application
+    python3 coverage_report.py ios/Packages/Troop900Application \\
+        --pack ios/Packages/Troop900Application/.build/coverage-pack/Troop900Application.covpack
+
+Reading a pack from Python:
+    from coverage_pack import CoveragePack
+
+    with CoveragePack(path) as pack:
+        coverage_stats = pack.coverage_stats()
+        segments = pack.segments(pack.find(filename))
+"""
+
+import json
+import mmap
+import os
+import sys
+import struct
+import argparse
+import tempfile
+from array import array
+from pathlib import Path
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from coverage_core import (ENGINE_CHOICES, analyze_segment_stats, classify_source_file, find_coverage_file,
+                           find_coverage_files, require_coverage_file, should_include_file)
+from coverage_merge import merge_inputs, recorded_merge_inputs, require_merged_coverage_file
+from coverage_profile import CoverageProfiler, profile_phase
+from coverage_stream import iter_export_files
+
+PACK_MAGIC = b'COVPACK\0'
+
+# Bump when the layout, the stored statistics or the meta change
+PACK_VERSION = 4
+
+PACK_SUFFIX = '.covpack'
+
+# magic, version, number of sections
+HEADER = struct.Struct('<8sII')
+# name, array typecode, offset, length in bytes
+SECTION = struct.Struct('<16s1s7xQQ')
+
+# Per-file columns: name -> array typecode
+FILE_COLUMNS = {
+    'f.path': 'i', 'f.category': 'i', 'f.name': 'i', 'f.relative': 'i',
+    'f.lines_cov': 'q', 'f.lines_total': 'q', 'f.branch_cov': 'q', 'f.branch_total': 'q',
+    'f.line_pct': 'd', 'f.branch_pct': 'd', 'f.overall_pct': 'd',
+    'f.seg_start': 'q', 'f.seg_count': 'q', 'f.unc_start': 'q', 'f.unc_count': 'q',
+    # File indices ordered by path, for binary search
+    'f.by_path': 'i',
+}
+# Columns with one row per segment / uncovered range, written as they are produced
+SEGMENT_COLUMNS = {'s.line': 'i', 's.col': 'i', 's.count': 'q', 's.flags': 'B'}
+UNCOVERED_COLUMNS = {'u.line': 'i', 'u.col': 'i', 'u.end_line': 'i', 'u.end_col': 'i', 'u.regions': 'i'}
+
+# s.flags bits, for segment elements 3, 4 and 5
+FLAG_BITS = (1, 2, 4)
+
+def default_pack_path(package_path: Path) -> Path:
+    return package_path / '.build' / 'coverage-pack' / f'{package_path.name}{PACK_SUFFIX}'
+
+def fresh_default_pack(package_path: Path, merge: bool = False) -> Optional[Path]:
+    """
+    The package's default pack if a report could use it in place of the
+    export: unfiltered, from this pack version, and made the same way the
+    report reads coverage. Without merge that is from the export
+    find_coverage_file picks, and no older than it; with merge, from a merge
+    of exactly the exports found now.
+    """
+    pack_path = default_pack_path(package_path)
+    if not pack_path.exists():
+        return None
+    try:
+        with CoveragePack(pack_path) as pack:
+            meta = pack.meta
+    except (OSError, ValueError):
+        return None  # an earlier pack version
+    if meta.get('filter') is not None:
+        return None
+    if merge:
+        export_paths = find_coverage_files(package_path)
+        if not export_paths or meta.get('inputs') != merge_inputs(export_paths):
+            return None
+        return pack_path
+    coverage_file = find_coverage_file(package_path)
+    if meta.get('inputs') is not None:
+        return None
+    if coverage_file is not None:
+        if meta.get('source') != str(coverage_file.resolve()):
+            return None
+        if coverage_file.stat().st_mtime > pack_path.stat().st_mtime:
+            return None
+    return pack_path
+
+def _native(values: array) -> array:
+    """Arrays are stored little-endian."""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+class _StringTable:
+    """Interns strings; each distinct string is stored once."""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def columns(self) -> Dict[str, array]:
+        offsets = array('q', [0])
+        data = bytearray()
+        for value in self.strings:
+            data += value.encode('utf-8')
+            offsets.append(len(data))
+        return {'str.offsets': offsets, 'str.data': array('B', bytes(data))}
+
+def write_coverage_pack(coverage_file: Path, output_path: Path, package_name: str,
+                        filter_pattern: Optional[str] = None, engine: str = 'python',
+                        profiler: Optional[CoverageProfiler] = None) -> Dict:
+    """
+    Stream a package's export, analyze each source file and write the pack.
+    Segment and uncovered-range columns are spooled to temporary files as
+    they are produced, so memory holds one file's segments at a time.
+    Returns files, segments, uncovered and bytes.
+    """
+    def include(filename: str) -> bool:
+        return f'/Sources/{package_name}/' in filename and should_include_file(filename, filter_pattern)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    strings = _StringTable()
+    # path -> file row; a repeated path keeps its last entry, as in the analysis
+    rows = {}
+    segment_total = uncovered_total = 0
+
+    with tempfile.TemporaryDirectory(prefix='coverage-pack-') as work_dir:
+        spools = {name: open(os.path.join(work_dir, name), 'w+b')
+                  for name in list(SEGMENT_COLUMNS) + list(UNCOVERED_COLUMNS)}
+        try:
+            with profile_phase(profiler, 'analyze_file_coverage'):
+                for file_data in iter_export_files(str(coverage_file), include=include):
+                    filename = file_data['filename']
+                    source = classify_source_file(filename, package_name)
+                    if source is None:
+                        continue
+                    segments = file_data.get('segments', [])
+                    stats = analyze_segment_stats(segments, engine)
+                    # Position lookups bisect the columns; llvm-cov already emits this order
+                    segments = sorted(segments, key=itemgetter(0, 1))
+
+                    columns = {name: array(typecode) for name, typecode in SEGMENT_COLUMNS.items()}
+                    for segment in segments:
+                        columns['s.line'].append(segment[0])
+                        columns['s.col'].append(segment[1])
+                        columns['s.count'].append(segment[2])
+                        flags = 0
+                        for bit, value in zip(FLAG_BITS, segment[3:6]):
+                            if value:
+                                flags |= bit
+                        columns['s.flags'].append(flags)
+                    uncovered = stats['uncovered_ranges']
+                    for name, key in (('u.line', 'line'), ('u.col', 'column'), ('u.end_line', 'end_line'),
+                                      ('u.end_col', 'end_column'), ('u.regions', 'regions')):
+                        columns[name] = array('i', [uncovered_range[key] for uncovered_range in uncovered])
+                    for name, values in columns.items():
+                        _native(values).tofile(spools[name])
+
+                    category, file_name, relative_path = source
+                    rows[filename] = (
+                        strings.intern(filename), strings.intern(category), strings.intern(file_name),
+                        strings.intern(relative_path),
+                        stats['line_coverage']['covered'], stats['line_coverage']['total'],
+                        stats['branch_coverage']['covered'], stats['branch_coverage']['total'],
+                        stats['line_coverage']['percentage'], stats['branch_coverage']['percentage'],
+                        stats['overall_percentage'],
+                        segment_total, len(segments), uncovered_total, len(uncovered),
+                    )
+                    segment_total += len(segments)
+                    uncovered_total += len(uncovered)
+
+            with profile_phase(profiler, 'write_pack'):
+                file_columns = {name: array(typecode) for name, typecode in FILE_COLUMNS.items()}
+                for row in rows.values():
+                    for name, value in zip(FILE_COLUMNS, row):
+                        file_columns[name].append(value)
+                paths = list(rows)
+                file_columns['f.by_path'] = array('i', sorted(range(len(paths)), key=paths.__getitem__))
+                meta = {
+                    'package': package_name,
+                    'filter': filter_pattern,
+                    'engine': engine,
+                    'source': str(Path(coverage_file).resolve()),
+                    # The exports a merged export was made from; None for a single export
+                    'inputs': recorded_merge_inputs(Path(coverage_file)),
+                    'files': len(rows),
+                    'segments': segment_total,
+                }
+                sections = [('meta', 'B', json.dumps(meta).encode('utf-8'))]
+                sections += [(name, values.typecode, values) for name, values in strings.columns().items()]
+                sections += [(name, values.typecode, values) for name, values in file_columns.items()]
+                for name, spool in spools.items():
+                    spool.flush()
+                    typecode = SEGMENT_COLUMNS.get(name) or UNCOVERED_COLUMNS[name]
+                    sections.append((name, typecode, spool))
+                _write_sections(output_path, sections)
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+    return {'files': len(rows), 'segments': segment_total, 'uncovered': uncovered_total,
+            'bytes': output_path.stat().st_size}
+
+def _section_size(content) -> int:
+    if isinstance(content, bytes):
+        return len(content)
+    if isinstance(content, array):
+        return len(content) * content.itemsize
+    return os.fstat(content.fileno()).st_size
+
+def _write_sections(output_path: Path, sections: List):
+    """Write the header, the section directory and each section, 8-byte aligned, atomically."""
+    offset = HEADER.size + SECTION.size * len(sections)
+    offset += _padding(offset)
+    directory = []
+    for name, typecode, content in sections:
+        size = _section_size(content)
+        directory.append(SECTION.pack(name.encode('ascii'), typecode.encode('ascii'), offset, size))
+        offset += size + _padding(size)
+
+    partial_path = output_path.with_name(f'.{output_path.name}.partial')
+    try:
+        with open(partial_path, 'wb') as out:
+            out.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(sections)))
+            out.write(b''.join(directory))
+            out.write(b'\0' * _padding(out.tell()))
+            for _, _, content in sections:
+                if isinstance(content, bytes):
+                    out.write(content)
+                elif isinstance(content, array):
+                    _native(content).tofile(out)
+                else:
+                    content.seek(0)
+                    while True:
+                        chunk = content.read(1 << 20)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                out.write(b'\0' * _padding(out.tell()))
+        os.replace(partial_path, output_path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+class CoveragePack:
+    """
+    Read-only view of a coverage pack. Columns are memoryviews over the mapped
+    file, so opening a pack costs the same whatever its size.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._views = []
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path} is empty, not a coverage pack")
+        try:
+            self.columns = self._read_directory()
+            self.meta = json.loads(bytes(self.columns['meta']).decode('utf-8'))
+        except Exception:
+            self.close()
+            raise
+        self.package_name = self.meta['package']
+
+    def _read_directory(self) -> Dict:
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{self.path} is not a coverage pack")
+        magic, version, count = HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{self.path} is not a coverage pack")
+        if version != PACK_VERSION:
+            raise ValueError(f"{self.path} is a version {version} pack; version {PACK_VERSION} is required")
+        base = memoryview(self._map)
+        self._views.append(base)
+        columns = {}
+        for index in range(count):
+            raw_name, typecode, offset, size = SECTION.unpack_from(self._map, HEADER.size + index * SECTION.size)
+            view = base[offset:offset + size]
+            self._views.append(view)
+            typecode = typecode.decode('ascii')
+            if typecode != 'B':
+                if sys.byteorder == 'little':
+                    view = view.cast(typecode)
+                    self._views.append(view)
+                else:
+                    values = array(typecode, view.tobytes())
+                    values.byteswap()
+                    view = values
+            columns[raw_name.rstrip(b'\0').decode('ascii')] = view
+        return columns
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.columns = {}
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.columns['f.path'])
+
+    def string(self, string_id: int) -> str:
+        offsets = self.columns['str.offsets']
+        return bytes(self.columns['str.data'][offsets[string_id]:offsets[string_id + 1]]).decode('utf-8')
+
+    def filename(self, index: int) -> str:
+        return self.string(self.columns['f.path'][index])
+
+    def find(self, filename: str) -> Optional[int]:
+        """Index of a file by its full path, or None."""
+        by_path = self.columns['f.by_path']
+        low, high = 0, len(by_path)
+        while low < high:
+            middle = (low + high) // 2
+            if self.filename(by_path[middle]) < filename:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(by_path) and self.filename(by_path[low]) == filename:
+            return by_path[low]
+        return None
+
+    def file_stats(self, index: int) -> Dict:
+        """One file's entry in the per-file statistics model, as the analysis returns it."""
+        c = self.columns
+        start = c['f.unc_start'][index]
+        end = start + c['f.unc_count'][index]
+        lines, cols, end_lines, end_cols, regions = (c['u.line'], c['u.col'], c['u.end_line'], c['u.end_col'],
+                                                     c['u.regions'])
+        return {
+            'category': self.string(c['f.category'][index]),
+            'name': self.string(c['f.name'][index]),
+            'relative_path': self.string(c['f.relative'][index]),
+            'line_coverage': {
+                'covered': c['f.lines_cov'][index],
+                'total': c['f.lines_total'][index],
+                'percentage': c['f.line_pct'][index],
+            },
+            'branch_coverage': {
+                'covered': c['f.branch_cov'][index],
+                'total': c['f.branch_total'][index],
+                'percentage': c['f.branch_pct'][index],
+            },
+            'overall_percentage': c['f.overall_pct'][index],
+            'uncovered_ranges': [{'line': lines[i], 'column': cols[i], 'end_line': end_lines[i],
+                                  'end_column': end_cols[i], 'regions': regions[i]} for i in range(start, end)],
+        }
+
+    def coverage_stats(self, filter_pattern: Optional[str] = None) -> Dict[str, Dict]:
+        """The per-file statistics model every report renderer consumes."""
+        stats = {}
+        for index in range(len(self)):
+            filename = self.filename(index)
+            if should_include_file(filename, filter_pattern):
+                stats[filename] = self.file_stats(index)
+        return stats
+
+    def segments(self, index: int) -> List[List]:
+        """A file's segments, by position, as [line, col, count, has_count, is_region_entry, is_gap_region]."""
+        c = self.columns
+        start = c['f.seg_start'][index]
+        end = start + c['f.seg_count'][index]
+        return [
+            [line, col, count, bool(flags & 1), bool(flags & 2), bool(flags & 4)]
+            for line, col, count, flags in zip(c['s.line'][start:end], c['s.col'][start:end],
+                                               c['s.count'][start:end], c['s.flags'][start:end])
+        ]
+
+def load_pack_stats(pack_path: Path, package_name: str, filter_pattern: Optional[str] = None,
+                    profiler: Optional[CoverageProfiler] = None) -> Dict[str, Dict]:
+    """Read the per-file statistics from a pack, or exit if it can't be used for this package."""
+    print(f"Reading coverage pack: {pack_path}")
+    try:
+        with profile_phase(profiler, 'read_pack'):
+            with CoveragePack(pack_path) as pack:
+                if pack.package_name != package_name:
+                    print(f"Error: {pack_path} holds coverage for {pack.package_name}, not {package_name}")
+                    sys.exit(1)
+                coverage_stats = pack.coverage_stats(filter_pattern)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read coverage pack: {e}")
+        sys.exit(1)
+    if filter_pattern:
+        print(f"Filtering files containing: '{filter_pattern}'")
+    return coverage_stats
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write a coverage pack for a Swift package',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('--output', help='Pack file path (default: <package>/.build/coverage-pack/<Package>.covpack)')
+    parser.add_argument('--filter', help='Only pack files matching this pattern')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+
+    package_name = package_path.name
+    if args.merge:
+        coverage_file = require_merged_coverage_file(package_path)
+    else:
+        coverage_file = require_coverage_file(package_path)
+    output_path = Path(args.output) if args.output else default_pack_path(package_path)
+
+    print(f"Packing coverage for {package_name}...")
+    try:
+        info = write_coverage_pack(coverage_file, output_path, package_name, args.filter, args.engine)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in coverage data: {e}")
+        sys.exit(1)
+
+    print(f"✓ Wrote {output_path}")
+    print(f"  {info['files']:,} files, {info['segments']:,} segments, "
+          f"{info['uncovered']:,} uncovered ranges, {info['bytes'] / (1024 * 1024):.1f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Swift Patch Coverage
+
+Reports coverage for just the lines a change touches: reads a unified diff
+(from `git diff` or a file), keeps the added and modified lines of the package's
+`/Sources/<Package>/` files, and checks each against that file's coverage. For
+PR gating, where only the touched Swift lines matter.
+
+Only the changed files are decoded. From a coverage pack they are looked up
+directly; from an export, the other files' segments are skipped unparsed, and
+a file listed more than once keeps its last entry, as in the reports. The
+package's default pack (coverage_pack.py) is used automatically
+when it is at least as new as the export, was written without a filter and,
+like the run, is merged or not (see fresh_default_pack).
+Each file's segments become a sorted line index (see coverage_diff.py) and
+the changed lines are looked up by binary search. No report is built.
+
+A changed line counts when it carries a segment, the same rule the reports use
+for line coverage. Blank lines, comments and declarations without code are
+not counted.
+
+Usage:
+    python3 coverage_patch.py <package_path> [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --diff <path>         Unified diff to read ('-' for stdin)
+    --base <ref>          Diff the working tree against this git ref instead (default: HEAD)
+    --pack <path>         Read coverage from a coverage pack (coverage_pack.py) instead of the export
+    --no-pack            Read the export even when an up-to-date default pack exists
+    --merge              Merge every export found for the package (architectures, shards) first
+    --json <path>         Also write the result as JSON
+    --fail-under <pct>    Exit with status 1 when patch coverage is below this percentage
+    --help               Show this help message
+
+Examples:
+    # Lines changed since main
+    python3 coverage_patch.py ios/Packages/Troop900Application --base origin/main
+
+    # Gate a PR on 80% patch coverage, from a saved diff
+    git diff origin/main...HEAD > pr.diff
+    python3 coverage_patch.py ios/Packages/Troop900Application --diff pr.diff --fail-under 80
+"""
+
+import json
+import re
+import sys
+import argparse
+import subprocess
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from coverage_core import classify_source_file, require_coverage_file
+from coverage_diff import LineIndex, build_line_index, line_ranges
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import CoveragePack, fresh_default_pack
+from coverage_stream import iter_export_files
+
+_HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+def parse_unified_diff(diff_lines: Iterable[str]) -> Dict[str, Set[int]]:
+    """
+    Map each file in a unified diff to the line numbers added or changed in
+    its new version. Deleted files and pure deletions contribute no lines.
+    """
+    changed = {}
+    current = None
+    new_line = remaining = 0
+    for text in diff_lines:
+        text = text.rstrip('\n')
+        if remaining == 0:
+            if text.startswith('+++ '):
+                path = text[4:].split('\t')[0]
+                if path == '/dev/null':
+                    current = None
+                else:
+                    current = changed.setdefault(path[2:] if path.startswith('b/') else path, set())
+                continue
+            match = _HUNK_RE.match(text)
+            if match:
+                new_line = int(match.group(1))
+                remaining = int(match.group(2)) if match.group(2) is not None else 1
+            continue
+        if text.startswith('+'):
+            if current is not None:
+                current.add(new_line)
+            new_line += 1
+            remaining -= 1
+        elif text.startswith(' ') or text == '':
+            new_line += 1
+            remaining -= 1
+        # '-' lines and '\ No newline at end of file' don't exist in the new version
+    return {path: lines for path, lines in changed.items() if lines}
+
+def read_git_diff(package_path: Path, base: str) -> List[str]:
+    """`git diff <base>` for the package directory, or exit if git fails."""
+    try:
+        completed = subprocess.run(['git', 'diff', '--no-color', '-U0', base, '--', '.'], cwd=str(package_path),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    except OSError as e:
+        print(f"Error: Could not run git: {e}")
+        sys.exit(1)
+    if completed.returncode != 0:
+        print(f"Error: git diff {base} failed: {completed.stderr.strip()}")
+        sys.exit(1)
+    return completed.stdout.splitlines()
+
+def source_changes(changed: Dict[str, Set[int]], package_name: str) -> Dict[str, Set[int]]:
+    """Keep the package's Swift sources, keyed by their path under Sources/<Package>/."""
+    sources = {}
+    for path, lines in changed.items():
+        if not path.endswith('.swift'):
+            continue
+        classified = classify_source_file('/' + path.lstrip('/'), package_name)
+        if classified is not None:
+            sources[classified[2]] = lines
+    return sources
+
+def export_line_indexes(coverage_file: Path, package_name: str, wanted: Set[str]) -> Dict[str, LineIndex]:
+    """
+    Line indexes of the wanted files. A file listed more than once keeps its
+    last entry, as in the analysis, so the whole export is read; only the
+    wanted files' segments are decoded.
+    """
+    def include(filename: str) -> bool:
+        classified = classify_source_file(filename, package_name)
+        return classified is not None and classified[2] in wanted
+
+    if not wanted:
+        return {}
+    segments = {}
+    for entry in iter_export_files(str(coverage_file), include, raw=True):
+        segments[classify_source_file(entry['filename'], package_name)[2]] = entry.get('segments', '[]')
+    return {relative_path: build_line_index(json.loads(text)) for relative_path, text in segments.items()}
+
+def pack_line_indexes(pack: CoveragePack, wanted: Set[str]) -> Dict[str, LineIndex]:
+    """Line indexes of the wanted files, decoding only their segments."""
+    indexes = {}
+    relative = pack.columns['f.relative']
+    for index in range(len(pack)):
+        relative_path = pack.string(relative[index])
+        if relative_path in wanted:
+            indexes[relative_path] = build_line_index(pack.segments(index))
+    return indexes
+
+def patch_coverage(changes: Dict[str, Set[int]], indexes: Dict[str, LineIndex], package_name: str) -> Dict:
+    """Coverage of the changed lines per file, and in total."""
+    files = {}
+    covered_total = executable_total = 0
+    for relative_path in sorted(changes):
+        changed_lines = sorted(changes[relative_path])
+        index = indexes.get(relative_path)
+        covered, uncovered = [], []
+        if index is not None:
+            lines, hits = index[0], index[1]
+            for line in changed_lines:
+                position = bisect_left(lines, line)
+                if position < len(lines) and lines[position] == line:
+                    (covered if hits[position] > 0 else uncovered).append(line)
+        executable = len(covered) + len(uncovered)
+        category = classify_source_file(f'/Sources/{package_name}/{relative_path}', package_name)[0]
+        files[relative_path] = {
+            'category': category,
+            'in_coverage': index is not None,
+            'changed_lines': len(changed_lines),
+            'executable_lines': executable,
+            'covered_lines': len(covered),
+            'percentage': (len(covered) / executable * 100) if executable > 0 else None,
+            'uncovered': line_ranges(uncovered),
+        }
+        covered_total += len(covered)
+        executable_total += executable
+    return {
+        'package': package_name,
+        'files': files,
+        'covered_lines': covered_total,
+        'executable_lines': executable_total,
+        'percentage': (covered_total / executable_total * 100) if executable_total > 0 else None,
+    }
+
+def generate_patch_report(result: Dict) -> str:
+    """Format patch coverage as a short text report."""
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"PATCH COVERAGE - {result['package']}")
+    lines.append("=" * 100)
+    if not result['files']:
+        lines.append("No changed Swift sources in this package.")
+        return "\n".join(lines)
+
+    for relative_path, stats in result['files'].items():
+        if not stats['in_coverage']:
+            lines.append(f"❔ {relative_path}: not in the coverage data ({stats['changed_lines']} changed lines)")
+            continue
+        if stats['percentage'] is None:
+            lines.append(f"➖ {relative_path}: no executable lines changed")
+            continue
+        status = "✅" if stats['covered_lines'] == stats['executable_lines'] else "⚠️ "
+        lines.append(f"{status} {relative_path}: {stats['covered_lines']}/{stats['executable_lines']} "
+                     f"({stats['percentage']:.1f}%)")
+        if stats['uncovered']:
+            ranges = ', '.join(str(first) if first == last else f'{first}-{last}'
+                               for first, last in stats['uncovered'])
+            lines.append(f"   Uncovered lines: {ranges}")
+    lines.append("-" * 100)
+    if result['percentage'] is None:
+        lines.append("Patch Coverage: no executable lines changed")
+    else:
+        lines.append(f"Patch Coverage: {result['covered_lines']}/{result['executable_lines']} "
+                     f"({result['percentage']:.1f}%)")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Coverage of the lines changed in a diff',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('--diff', help="Unified diff to read ('-' for stdin)")
+    parser.add_argument('--base', default='HEAD', help='Diff the working tree against this git ref (default: HEAD)')
+    parser.add_argument('--pack', help='Read coverage from a coverage pack (coverage_pack.py) instead of the export')
+    parser.add_argument('--no-pack', action='store_true',
+                        help='Read the export even when an up-to-date default pack exists')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+    parser.add_argument('--json', help='Also write the result as JSON')
+    parser.add_argument('--fail-under', type=float,
+                        help='Exit with status 1 when patch coverage is below this percentage')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+    package_name = package_path.name
+
+    started = time.perf_counter()
+    if args.diff == '-':
+        diff_lines = sys.stdin.readlines()
+    elif args.diff:
+        try:
+            with open(args.diff, 'r', encoding='utf-8', errors='replace') as f:
+                diff_lines = f.readlines()
+        except OSError as e:
+            print(f"Error: Could not read diff: {e}")
+            sys.exit(1)
+    else:
+        diff_lines = read_git_diff(package_path, args.base)
+    changes = source_changes(parse_unified_diff(diff_lines), package_name)
+
+    pack_path = Path(args.pack) if args.pack else None
+    if pack_path is None and changes and not args.no_pack:
+        pack_path = fresh_default_pack(package_path, args.merge)
+    try:
+        indexes = None
+        if pack_path is not None:
+            with CoveragePack(pack_path) as pack:
+                if pack.package_name != package_name:
+                    print(f"Error: {pack_path} holds coverage for {pack.package_name}, not {package_name}")
+                    sys.exit(1)
+                if args.pack or pack.meta.get('filter') is None:
+                    print(f"Reading coverage pack: {pack_path}")
+                    indexes = pack_line_indexes(pack, set(changes))
+        if indexes is None and changes:
+            if args.merge:
+                coverage_file = require_merged_coverage_file(package_path)
+            else:
+                coverage_file = require_coverage_file(package_path)
+            indexes = export_line_indexes(coverage_file, package_name, set(changes))
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read coverage data: {e}")
+        sys.exit(1)
+
+    result = patch_coverage(changes, indexes or {}, package_name)
+    print(generate_patch_report(result))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ JSON saved to: {args.json}")
+    print(f"Computed in {time.perf_counter() - started:.2f}s")
+
+    if args.fail_under is not None and result['percentage'] is not None and result['percentage'] < args.fail_under:
+        print(f"❌ Patch coverage {result['percentage']:.1f}% is below {args.fail_under:.1f}%")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Per-phase profiling for the coverage scripts.
+
+With `--profile` each script records how long every phase takes (finding the
+export, loading it, analyzing it, rendering each report) and the process's
+peak RSS once the phase has finished. The analysis also records how many files
+and segments it processed and the slowest files by analysis time. The result
+is printed as a table and written as a JSON trace that CI can archive.
+
+Usage:
+    from coverage_profile import CoverageProfiler, profile_phase
+
+    profiler = CoverageProfiler('Troop900Application')
+    with profile_phase(profiler, 'load_coverage_data'):
+        coverage_data = load_coverage_data(path)
+    print(profiler.format_report())
+    profiler.write_trace(Path('coverage_profile.json'))
+
+`profile_phase` accepts None, so call sites don't need a separate path for
+unprofiled runs.
+"""
+
+import heapq
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_TOP_FILES = 10
+
+DEFAULT_TRACE_NAME = 'coverage_profile.json'
+
+# Bump when the trace layout changes
+TRACE_VERSION = 1
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, where the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def segment_count(segments: Union[str, List]) -> int:
+    """Number of segments in decoded segments or their raw JSON text."""
+    if isinstance(segments, str):
+        return max(0, segments.count('[') - 1)
+    return len(segments)
+
+class CoverageProfiler:
+    """Collects phase timings, memory and per-file analysis times for one package."""
+
+    def __init__(self, label: str, top_files: int = DEFAULT_TOP_FILES):
+        self.label = label
+        self.top_files = top_files
+        self.phases = []
+        self.files = 0
+        self.segments = 0
+        self.export_cached = False
+        self._slowest = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase and note the peak RSS when it ends."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'seconds': time.perf_counter() - started,
+                'peak_rss_mb': peak_rss_mb(),
+            })
+
+    def record_file(self, filename: str, seconds: float, segments: int):
+        """Count one analyzed file, keeping only the slowest top_files in a bounded heap."""
+        self.files += 1
+        self.segments += segments
+        entry = (seconds, filename, segments)
+        if len(self._slowest) < self.top_files:
+            heapq.heappush(self._slowest, entry)
+        elif self.top_files > 0:
+            heapq.heappushpop(self._slowest, entry)
+
+    def to_dict(self) -> Dict:
+        """The JSON trace."""
+        slowest = sorted(self._slowest, reverse=True)
+        return {
+            'version': TRACE_VERSION,
+            'label': self.label,
+            'total_seconds': time.perf_counter() - self._started,
+            'peak_rss_mb': peak_rss_mb(),
+            'files': self.files,
+            'segments': self.segments,
+            'export_cached': self.export_cached,
+            'phases': self.phases,
+            'slowest_files': [
+                {'file': filename, 'seconds': seconds, 'segments': segments}
+                for seconds, filename, segments in slowest
+            ],
+        }
+
+    def format_report(self) -> str:
+        return format_profile(self.to_dict())
+
+    def write_trace(self, path: Path) -> Path:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+def profile_phase(profiler: Optional[CoverageProfiler], name: str):
+    """Context manager timing a phase, or doing nothing when profiler is None."""
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+def save_profile(profiler: CoverageProfiler, trace_path: Path):
+    """Print the profile and write its JSON trace."""
+    profiler.write_trace(trace_path)
+    print("")
+    print(profiler.format_report())
+    print(f"\n📈 Profile trace saved to: {trace_path}")
+
+def format_profile(trace: Dict) -> str:
+    """Render a profile trace as a human-readable table."""
+    def megabytes(value: Optional[float]) -> str:
+        return f"{value:.1f} MB" if value is not None else 'n/a'
+
+    total = trace['total_seconds']
+    lines = []
+    lines.append(f"PROFILE - {trace['label']}")
+    lines.append("-" * 72)
+    lines.append(f"{'Phase':<28} {'Time':>10} {'Share':>7} {'Peak RSS':>12}")
+    for phase in trace['phases']:
+        share = (phase['seconds'] / total * 100) if total > 0 else 0.0
+        lines.append(f"{phase['name']:<28} {phase['seconds']:>9.3f}s {share:>6.1f}% "
+                     f"{megabytes(phase['peak_rss_mb']):>12}")
+    lines.append(f"{'Total':<28} {total:>9.3f}s {'':>7} {megabytes(trace['peak_rss_mb']):>12}")
+    lines.append("")
+
+    if trace['export_cached']:
+        lines.append("Analysis served from the cache (export unchanged)")
+    else:
+        lines.append(f"Files analyzed: {trace['files']}, segments: {trace['segments']}")
+    if trace['slowest_files']:
+        lines.append(f"Slowest {len(trace['slowest_files'])} file(s) by analysis time:")
+        for entry in trace['slowest_files']:
+            lines.append(f"  {entry['seconds'] * 1000:>9.2f} ms  {entry['segments']:>8} segments  "
+                         f"{Path(entry['file']).name}")
+    return "\n".join(lines)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Query
+
+Answers "is this line covered, and how many times did it run?" for single
+source locations without parsing the export. Queries are read from the
+package's coverage pack (coverage_pack.py), which acts as the cache: the
+first query writes it when it is missing or older than the export, and every
+later query only maps it.
+
+A file's segments are stored sorted by position, so they form an interval
+index: each segment's count holds from its (line, column) up to the next
+segment. A query finds the file by binary search over the pack's path index,
+then the line and column by binary search over that file's segment columns,
+in place in the mapped file. Nothing is decoded beyond the file name.
+
+- file:line      The line's hit count: the highest count of the segments that
+                 start on it, the rule the reports use for line coverage. A line
+                 where no segment starts isn't counted by the reports; the count
+                 of the region it lies in is shown instead.
+- file:line:col  The count of the region in effect at that column.
+
+Files are given by their path under Sources/<Package>/ or any unambiguous
+suffix of it, e.g. SignUpForShiftUseCase.swift.
+
+Usage:
+    python3 coverage_query.py <package_path> <file:line[:col]> [...] [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --pack <path>         Query this coverage pack instead of the package's default pack
+    --merge              Merge every export found for the package before writing the pack
+    --json               Print the results as JSON
+    --help               Show this help message
+
+Examples:
+    # Is line 42 covered, and how often did it run?
+    python3 coverage_query.py ios/Packages/Troop900Application UseCases/Shifts/SignUpForShiftUseCase.swift:42
+
+    # The count at a column, and several locations at once
+    python3 coverage_query.py ios/Packages/Troop900Application SignUpForShiftUseCase.swift:42:17 \\
+        SignUpForShiftUseCase.swift:57
+
+Querying from Python:
+    from coverage_pack import CoveragePack
+    from coverage_query import SegmentIndex, resolve_file
+
+    with CoveragePack(path) as pack:
+        index = SegmentIndex.from_pack(pack, resolve_file(pack, 'UseCases/Shifts/SignUpForShiftUseCase.swift'))
+        hits = index.line_hits(42)
+"""
+
+import re
+import sys
+import json
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import redirect_stdout
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from coverage_core import require_coverage_file
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import CoveragePack, default_pack_path, fresh_default_pack, write_coverage_pack
+
+_LOCATION_RE = re.compile(r'^(.+?):(\d+)(?::(\d+))?$')
+
+# Candidates listed when a file name is ambiguous
+MAX_CANDIDATES = 5
+
+class SegmentIndex:
+    """
+    Interval index over one file's segments, sorted by (line, column): each
+    segment's count applies from its position up to the next segment. The
+    columns may be arrays or memoryviews over a pack; lookups are binary
+    searches and copy nothing.
+    """
+
+    def __init__(self, lines: Sequence[int], cols: Sequence[int], counts: Sequence[int], flags: Sequence[int]):
+        self.lines = lines
+        self.cols = cols
+        self.counts = counts
+        self.flags = flags
+
+    @classmethod
+    def from_segments(cls, segments: List) -> 'SegmentIndex':
+        """Index decoded [line, col, count, has_count, is_region_entry, is_gap_region] segments."""
+        segments = sorted(segments, key=itemgetter(0, 1))
+        return cls(array('i', [segment[0] for segment in segments]), array('i', [segment[1] for segment in segments]),
+                   array('q', [segment[2] for segment in segments]),
+                   array('B', [(1 if segment[3] else 0) | (2 if segment[4] else 0) | (4 if segment[5] else 0)
+                               for segment in segments]))
+
+    @classmethod
+    def from_pack(cls, pack: CoveragePack, index: int) -> 'SegmentIndex':
+        """Index one pack file's segments in place."""
+        c = pack.columns
+        start = c['f.seg_start'][index]
+        end = start + c['f.seg_count'][index]
+        return cls(c['s.line'][start:end], c['s.col'][start:end], c['s.count'][start:end], c['s.flags'][start:end])
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def _line_range(self, line: int) -> Tuple[int, int]:
+        return bisect_left(self.lines, line), bisect_right(self.lines, line)
+
+    def _region(self, position: int) -> Optional[Dict]:
+        """The region that segment `position` opens, or None outside any counted region."""
+        if position < 0 or not self.flags[position] & 1:
+            return None
+        return {'line': self.lines[position], 'column': self.cols[position], 'count': self.counts[position]}
+
+    def line_hits(self, line: int) -> Dict:
+        """
+        A line's hits, following the reports: executable when a segment starts
+        on it, with the highest count among those segments. For a line where no
+        segment starts, 'region' is the counted region it lies in, if any.
+        """
+        first, last = self._line_range(line)
+        hits = max(self.counts[first:last]) if last > first else None
+        return {
+            'line': line,
+            'executable': last > first,
+            'hits': hits,
+            'covered': hits is not None and hits > 0,
+            'segments': last - first,
+            'region': self._region(first - 1) if last == first else None,
+        }
+
+    def position_count(self, line: int, col: int) -> Dict:
+        """The count in effect at (line, col): the last segment at or before it, if it has a count."""
+        first, last = self._line_range(line)
+        position = first + bisect_right(self.cols[first:last], col) - 1
+        region = self._region(position)
+        return {
+            'line': line,
+            'column': col,
+            'hits': region['count'] if region is not None else None,
+            'covered': region is not None and region['count'] > 0,
+            'region': region,
+        }
+
+def resolve_file(pack: CoveragePack, name: str) -> int:
+    """
+    Index of a pack file given its full path, its path under Sources/<Package>/
+    or an unambiguous suffix. Raises KeyError when nothing or several files match.
+    """
+    marker = f'Sources/{pack.package_name}/'
+    relative_name = name.split(marker, 1)[1] if marker in name else name.lstrip('/')
+    index = pack.find(name)
+    if index is None and len(pack):
+        # Files share one sources root, so the full path is found by binary search
+        first = pack.filename(0)
+        root = first[:len(first) - len(pack.string(pack.columns['f.relative'][0]))]
+        index = pack.find(root + relative_name)
+    if index is not None:
+        return index
+
+    suffix = '/' + relative_name
+    relative = pack.columns['f.relative']
+    matches = [candidate for candidate in range(len(pack))
+               if ('/' + pack.string(relative[candidate])).endswith(suffix)]
+    if len(matches) == 1:
+        return matches[0]
+    if not matches:
+        raise KeyError(f"no file matching '{name}' in {pack.package_name}")
+    names = ', '.join(pack.string(relative[candidate]) for candidate in matches[:MAX_CANDIDATES])
+    more = f' and {len(matches) - MAX_CANDIDATES} more' if len(matches) > MAX_CANDIDATES else ''
+    raise KeyError(f"'{name}' matches {len(matches)} files: {names}{more}")
+
+def parse_location(value: str) -> Tuple[str, int, Optional[int]]:
+    """Split 'file:line[:col]' into its parts, for argparse."""
+    match = _LOCATION_RE.match(value)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"expected file:line[:col], got '{value}'")
+    return match.group(1), int(match.group(2)), int(match.group(3)) if match.group(3) else None
+
+def query_location(pack: CoveragePack, name: str, line: int, col: Optional[int] = None) -> Dict:
+    """Resolve a file and answer one line or line:column query."""
+    index = resolve_file(pack, name)
+    segments = SegmentIndex.from_pack(pack, index)
+    result = segments.line_hits(line) if col is None else segments.position_count(line, col)
+    return {'file': pack.string(pack.columns['f.relative'][index]), **result}
+
+def format_result(result: Dict) -> str:
+    """One line describing a query result."""
+    location = f"{result['file']}:{result['line']}"
+    region = result['region']
+    if 'column' in result:
+        location += f":{result['column']}"
+        if region is None:
+            return f"➖ {location}  outside any counted region"
+        marker = '✅' if result['covered'] else '❌'
+        return f"{marker} {location}  {result['hits']:,} hits (region from {region['line']}:{region['column']})"
+    if not result['executable']:
+        if region is None:
+            return f"➖ {location}  not executable, outside any counted region"
+        return (f"➖ {location}  not executable, inside the region from {region['line']}:{region['column']} "
+                f"({region['count']:,} hits)")
+    status = "✅ covered" if result['covered'] else "❌ not covered"
+    starts = f"{result['segments']} segment{'s' if result['segments'] != 1 else ''} start{'s' if result['segments'] == 1 else ''} here"
+    return f"{status}: {location}  {result['hits']:,} hits ({starts})"
+
+def open_query_pack(package_path: Path, merge: bool = False) -> CoveragePack:
+    """
+    The package's default pack, written first unless it is current for the
+    requested mode (see fresh_default_pack).
+    """
+    pack_path = fresh_default_pack(package_path, merge)
+    if pack_path is not None:
+        return CoveragePack(pack_path)
+
+    # Progress goes to stderr so --json output stays parseable
+    with redirect_stdout(sys.stderr):
+        if merge:
+            coverage_file = require_merged_coverage_file(package_path)
+        else:
+            coverage_file = require_coverage_file(package_path)
+        pack_path = default_pack_path(package_path)
+        print(f"Packing coverage for {package_path.name} (reused by later queries)...")
+        write_coverage_pack(coverage_file, pack_path, package_path.name)
+    return CoveragePack(pack_path)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query line and column hit counts from a coverage pack',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('locations', nargs='+', type=parse_location, help='file:line[:col] to look up')
+    parser.add_argument('--pack', help="Query this coverage pack instead of the package's default pack")
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package before writing the pack')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+
+    try:
+        pack = CoveragePack(Path(args.pack)) if args.pack else open_query_pack(package_path, args.merge)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read coverage pack: {e}")
+        sys.exit(1)
+
+    with pack:
+        if pack.package_name != package_path.name:
+            print(f"Error: {pack.path} holds coverage for {pack.package_name}, not {package_path.name}")
+            sys.exit(1)
+        results = []
+        for name, line, col in args.locations:
+            try:
+                results.append(query_location(pack, name, line, col))
+            except KeyError as e:
+                print(f"Error: {e.args[0]}")
+                sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(format_result(result))
+
+if __name__ == '__main__':
+    main()
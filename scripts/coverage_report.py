@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Swift Code Coverage Report Tool
+
+Parses a package's coverage export once and writes any combination of report
+formats from the same in-memory analysis. Use this instead of running
+analyze_swift_coverage.py and generate_html_coverage.py back to back.
+
+Usage:
+    python3 coverage_report.py <package_path> [options]
+
+    package_path: Path to the Swift package directory (required)
+
+Options:
+    --format <list>       Comma-separated formats to write: markdown, html, json, summary
+                          (default: markdown,html,summary)
+    --filter <pattern>    Only analyze files matching this pattern
+    --output-dir <path>   Directory for the reports (default: package dir)
+    --stream             Stream the export instead of loading it into memory
+    --merge              Merge every export found for the package (architectures, shards) first
+    --pack <path>         Read the analysis from a coverage pack (coverage_pack.py) instead of the export
+    --summary-only       Use llvm-cov's per-file summaries only; skip segment analysis
+    --annotate           With html, also write annotated source pages for files with gaps
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --cache-dir <path>    Analysis cache directory (default: <package>/.build/coverage-cache)
+    --no-cache           Analyze every file from scratch without reading or writing the cache
+    --profile            Print per-phase timing and memory and write a JSON trace
+    --profile-trace <path> Where to write the trace (default: coverage_profile.json in output dir)
+    --profile-top <n>     Number of slowest files to list in the profile (default: 10)
+    --history <path>      Also record the run in a coverage history database (coverage_history.py)
+    --thresholds <path>   Check the analysis against a threshold file (coverage_thresholds.py) and
+                          exit with status 2, listing the violations, if any is missed
+    --help               Show this help message
+
+Formats:
+    markdown   COVERAGE_REPORT.md      Detailed text report
+    html       coverage_report.html    Interactive HTML report
+    json       coverage_report.json    Per-file statistics
+    summary    coverage_summary.json   Overall, category and per-file totals plus quality buckets,
+                                       for scripts and CI (instead of parsing the Markdown)
+
+Examples:
+    # Text and HTML reports from a single parse
+    python3 coverage_report.py ios/Packages/Troop900Application
+
+    # All formats for UseCases only
+    python3 coverage_report.py ios/Packages/Troop900Application --filter "UseCases" --format markdown,html,json
+
+    # Quick numbers from llvm-cov's summaries, without segment analysis
+    python3 coverage_report.py ios/Packages/Troop900Application --summary-only --format json
+
+    # Fail when a package, category or file is below its threshold
+    python3 coverage_report.py ios/Packages/Troop900Domain --thresholds ios/Packages/coverage-thresholds.json
+
+    # Where does the time go?
+    python3 coverage_report.py ios/Packages/Troop900Application --profile --no-cache
+"""
+
+import json
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from analyze_swift_coverage import generate_report
+from coverage_core import (ENGINE_CHOICES, build_coverage_summary, build_directory_tree, collect_coverage_stats,
+                           open_coverage_cache, parse_choices, require_coverage_file)
+from coverage_history import CoverageHistory, git_commit
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import load_pack_stats
+from coverage_profile import DEFAULT_TOP_FILES, DEFAULT_TRACE_NAME, CoverageProfiler, profile_phase, save_profile
+from coverage_source import annotate_report
+from coverage_thresholds import VIOLATION_EXIT_STATUS, check_thresholds, format_violations, load_thresholds
+from generate_html_coverage import iter_html_report
+
+def generate_json_report(coverage_stats: Dict[str, Dict], package_name: str, filter_pattern: Optional[str]) -> str:
+    """Serialize the per-file statistics model, with its directory roll-up."""
+    return json.dumps({
+        'package': package_name,
+        'filter': filter_pattern,
+        'directories': build_directory_tree(coverage_stats, package_name),
+        'files': coverage_stats,
+    }, indent=2)
+
+def generate_summary_report(coverage_stats: Dict[str, Dict], package_name: str, filter_pattern: Optional[str]) -> str:
+    """Serialize the machine-readable summary (see build_coverage_summary)."""
+    return json.dumps(build_coverage_summary(coverage_stats, package_name, filter_pattern), indent=2)
+
+# format name -> (default file name, renderer returning the report text or an iterable of chunks)
+REPORT_FORMATS = {
+    'markdown': ('COVERAGE_REPORT.md', generate_report),
+    'html': ('coverage_report.html', iter_html_report),
+    'json': ('coverage_report.json', generate_json_report),
+    'summary': ('coverage_summary.json', generate_summary_report),
+}
+
+DEFAULT_FORMATS = ['markdown', 'html', 'summary']
+
+# argparse type for --format, shared with coverage_all.py and coverage_dashboard.py
+parse_formats = parse_choices(REPORT_FORMATS)
+
+def write_reports(coverage_stats: Dict[str, Dict], package_name: str, filter_pattern: Optional[str],
+                  formats: List[str], output_dir: Path,
+                  profiler: Optional[CoverageProfiler] = None,
+                  source_pages: Optional[Tuple[str, Dict[str, int]]] = None) -> Dict[str, Path]:
+    """
+    Render each requested format from the same statistics and write it to
+    output_dir. source_pages, from coverage_source.annotate_report, links the
+    HTML report to annotated sources.
+    """
+    written = {}
+    for name in formats:
+        file_name, render = REPORT_FORMATS[name]
+        output_path = output_dir / file_name
+        with profile_phase(profiler, f'render_{name}'):
+            if name == 'html' and source_pages is not None:
+                report = render(coverage_stats, package_name, filter_pattern, *source_pages)
+            else:
+                report = render(coverage_stats, package_name, filter_pattern)
+            with open(output_path, 'w') as f:
+                if isinstance(report, str):
+                    f.write(report)
+                else:
+                    f.writelines(report)
+        written[name] = output_path
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate Swift coverage reports from a single parse',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('package_path', help='Path to the Swift package directory')
+    parser.add_argument('--format', type=parse_formats, default=DEFAULT_FORMATS,
+                        help=f"Comma-separated formats: {', '.join(REPORT_FORMATS)} (default: {','.join(DEFAULT_FORMATS)})")
+    parser.add_argument('--filter', help='Only analyze files matching this pattern')
+    parser.add_argument('--output-dir', help='Directory for the reports (default: package dir)')
+    parser.add_argument('--stream', action='store_true', help='Stream the export instead of loading it into memory')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+    parser.add_argument('--pack', help='Read the analysis from a coverage pack (coverage_pack.py) instead of the export')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Use llvm-cov's per-file summaries only; skip segment analysis")
+    parser.add_argument('--annotate', action='store_true',
+                        help='With the html format, also write annotated source pages for files with gaps')
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--cache-dir', help='Analysis cache directory (default: <package>/.build/coverage-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    parser.add_argument('--profile', action='store_true', help='Print per-phase timing and memory and write a JSON trace')
+    parser.add_argument('--profile-trace', help='Trace path (default: coverage_profile.json in the output dir)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_FILES,
+                        help=f'Slowest files to list in the profile (default: {DEFAULT_TOP_FILES})')
+    parser.add_argument('--history', help='Also record the run in a coverage history database (coverage_history.py)')
+    parser.add_argument('--thresholds',
+                        help='Check the analysis against a threshold file (coverage_thresholds.py); exit 2 on violations')
+
+    args = parser.parse_args()
+
+    package_path = Path(args.package_path).resolve()
+    if not package_path.exists():
+        print(f"Error: Package path does not exist: {package_path}")
+        sys.exit(1)
+
+    package_name = package_path.name
+    output_dir = Path(args.output_dir) if args.output_dir else package_path
+
+    thresholds = None
+    if args.thresholds:
+        try:
+            thresholds = load_thresholds(Path(args.thresholds))
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid thresholds file {args.thresholds}: {e}")
+            sys.exit(1)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    profiler = CoverageProfiler(package_name, args.profile_top) if args.profile else None
+    coverage_file = None
+    if args.pack:
+        coverage_stats = load_pack_stats(Path(args.pack), package_name, args.filter, profiler)
+    else:
+        if args.merge:
+            coverage_file = require_merged_coverage_file(package_path, profiler)
+        else:
+            coverage_file = require_coverage_file(package_path, profiler)
+        cache = open_coverage_cache(package_path, args.cache_dir, not args.no_cache)
+        coverage_stats = collect_coverage_stats(coverage_file, package_name, args.filter, args.stream, cache,
+                                                args.engine, args.summary_only, profiler)
+
+    print(f"Found {len(coverage_stats)} files")
+
+    source_pages = None
+    if args.annotate and 'html' in args.format:
+        source_pages = annotate_report(coverage_stats, package_path, output_dir / REPORT_FORMATS['html'][0],
+                                       coverage_file, Path(args.pack) if args.pack else None,
+                                       merge=args.merge, profiler=profiler)
+
+    written = write_reports(coverage_stats, package_name, args.filter, args.format, output_dir, profiler,
+                            source_pages)
+    for name, output_path in written.items():
+        print(f"✅ {name} report saved to: {output_path}")
+
+    if args.history:
+        with CoverageHistory(Path(args.history)) as history:
+            run_id = history.record_run(package_name, coverage_stats, git_commit(package_path),
+                                        filter_pattern=args.filter)
+        print(f"✅ Run {run_id} recorded in: {args.history}")
+
+    if profiler is not None:
+        save_profile(profiler, Path(args.profile_trace) if args.profile_trace else output_dir / DEFAULT_TRACE_NAME)
+
+    if thresholds is not None:
+        violations = check_thresholds(coverage_stats, package_name, thresholds)
+        if violations:
+            print(format_violations(violations))
+            sys.exit(VIOLATION_EXIT_STATUS)
+        print(f"✅ Coverage thresholds met: {args.thresholds}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Columnar segment analysis engines.
+
+`coverage_core.analyze_segments` walks segments one at a time in Python. The
+engines here load a file's segments into compact columns first and compute
+covered/total lines and regions with whole-column reductions:
+
+- `numpy`  NumPy arrays and vectorized reductions. Given the raw JSON text of a
+           `segments` array (as the streaming reader provides it), the numbers
+           are parsed straight from the bytes into columns, skipping
+           `json.loads` and per-segment Python objects entirely.
+- `array`  `array`/`bytes` columns reduced with C-level builtins; needs only the
+           standard library.
+
+Every engine accepts decoded segments or raw JSON text and returns exactly what
+the Python engine returns:
+(covered_lines, total_lines, covered_branches, total_branches, uncovered),
+where `uncovered` lists the never-executed code as merged ranges (see
+merge_uncovered_segments).
+"""
+
+import re
+import json
+import operator
+from array import array
+from itertools import compress, repeat
+from typing import List, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# (line, column, end line, end column, uncovered regions in the range)
+UncoveredRange = Tuple[int, int, int, int, int]
+
+SegmentResult = Tuple[int, int, int, int, List[UncoveredRange]]
+
+# A run of segments in the never-executed state, in the array engine's state bytes
+_RUN_RE = re.compile(b'\x01+')
+
+def merge_uncovered_segments(segments: List) -> List[UncoveredRange]:
+    """
+    Merge the never-executed stretches of position-sorted segments (as
+    llvm-cov emits them) into ranges, in one pass. A range starts at a
+    zero-count region entry and takes in every following segment whose count
+    is also zero, so adjacent and nested uncovered regions become one range.
+    It ends, exclusive, where the next segment is executed or not counted, or
+    at the last segment. Stretches without a region entry are not reported.
+    """
+    ranges = []
+    start = None
+    regions = 0
+    for segment in segments:
+        if segment[3] and segment[2] == 0:
+            if segment[4]:
+                if start is None:
+                    start = segment
+                regions += 1
+        elif start is not None:
+            ranges.append((start[0], start[1], segment[0], segment[1], regions))
+            start = None
+            regions = 0
+    if start is not None:
+        ranges.append((start[0], start[1], segments[-1][0], segments[-1][1], regions))
+    return ranges
+
+
+def _columns(segments: List) -> Tuple[list, list, list, list, list]:
+    """Split segments into (line, column, count, is_region, has_count) columns."""
+    return tuple(list(map(operator.itemgetter(i), segments)) for i in range(5))
+
+def analyze_segments_array(segments: Union[str, List]) -> SegmentResult:
+    """Columnar engine using the standard library only."""
+    if isinstance(segments, str):
+        segments = json.loads(segments)
+    if not segments:
+        return 0, 0, 0, 0, []
+
+    line_col, column_col, count_col, region_col, has_count_col = _columns(segments)
+
+    lines = array('q', line_col)
+    covered = bytes(map(operator.lt, repeat(0), count_col))
+    zero = bytes(map(operator.eq, repeat(0), count_col))
+    counted = bytes(map(bool, region_col))
+    regions = bytes(map(operator.and_, counted, map(bool, has_count_col)))
+
+    total_lines = len(set(lines))
+    covered_lines = len(set(compress(lines, covered)))
+    total_branches = sum(regions)
+    covered_branches = sum(map(operator.and_, regions, covered))
+
+    # Runs of counted zero-count segments, kept from their first region entry
+    state = bytes(map(operator.and_, counted, zero))
+    entries = bytes(map(operator.and_, regions, zero))
+    last = len(lines) - 1
+    uncovered = []
+    for run in _RUN_RE.finditer(state):
+        first = entries.find(1, run.start(), run.end())
+        if first < 0:
+            continue
+        end = min(run.end(), last)
+        uncovered.append((lines[first], column_col[first], lines[end], column_col[end],
+                          entries.count(1, first, run.end())))
+
+    return covered_lines, total_lines, covered_branches, total_branches, uncovered
+
+if np is not None:
+    # Counts are unsigned 64-bit, so up to 20 digits
+    _POW10 = 10.0 ** np.arange(21)
+
+def _parse_segment_matrix(text: str):
+    """
+    Parse a compact `segments` JSON array into an (n, width) float64 matrix.
+    Returns None when the text isn't a rectangular array of non-negative
+    integers and booleans, so the caller can fall back to json.loads.
+    """
+    if '-' in text or '.' in text or '"' in text:
+        return None
+    raw = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    row_opens = np.flatnonzero(raw == ord('['))[1:]
+    rows = row_opens.size
+    if rows == 0:
+        return np.zeros((0, 5))
+
+    # Value tokens are runs of digits, or the `t`/`f` starting a boolean; the
+    # remaining letters, brackets, commas and whitespace all separate them.
+    digit = (raw >= ord('0')) & (raw <= ord('9'))
+    digit |= raw == ord('t')
+    digit |= raw == ord('f')
+    edges = np.diff(digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size % rows:
+        return None
+    # Every row must hold the same number of values
+    row_firsts = np.searchsorted(starts, row_opens)
+    if row_firsts[0] != 0 or np.any(np.diff(row_firsts) != starts.size // rows):
+        return None
+
+    # Each digit contributes digit * 10**(places before the end of its token)
+    positions = np.flatnonzero(digit)
+    lengths = ends - starts
+    places = np.repeat(ends, lengths) - 1 - positions
+    digits = raw[positions]
+    values = (digits - ord('0')).astype(np.float64)
+    values[digits == ord('t')] = 1.0
+    values[digits == ord('f')] = 0.0
+    values *= _POW10[places]
+    offsets = np.zeros(starts.size, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return np.add.reduceat(values, offsets).reshape(rows, -1)
+
+def analyze_segments_numpy(segments: Union[str, List]) -> SegmentResult:
+    """Columnar engine using NumPy arrays and vectorized reductions."""
+    matrix = _parse_segment_matrix(segments) if isinstance(segments, str) else None
+    if matrix is None:
+        if isinstance(segments, str):
+            segments = json.loads(segments)
+        if not segments:
+            return 0, 0, 0, 0, []
+        # float64 keeps `count > 0` exact for unsigned 64-bit counts
+        matrix = np.array(_columns(segments), dtype=np.float64).T
+    if matrix.shape[0] == 0 or matrix.shape[1] < 5:
+        return 0, 0, 0, 0, []
+
+    lines = matrix[:, 0].astype(np.int64)
+    covered = matrix[:, 2] > 0
+    regions = (matrix[:, 3] != 0) & (matrix[:, 4] != 0)
+
+    total_lines = int(np.unique(lines).size)
+    covered_lines = int(np.unique(lines[covered]).size)
+    total_branches = int(np.count_nonzero(regions))
+    covered_branches = int(np.count_nonzero(regions & covered))
+
+    # Runs of counted zero-count segments, kept from their first region entry
+    zero = matrix[:, 2] == 0
+    entries = regions & zero
+    edges = np.diff(np.concatenate(([0], ((matrix[:, 3] != 0) & zero).view(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    cumulative = np.concatenate(([0], np.cumsum(entries)))
+    counts = cumulative[run_ends] - cumulative[run_starts]
+    kept = counts > 0
+    entry_rows = np.flatnonzero(entries)
+    firsts = entry_rows[np.searchsorted(entry_rows, run_starts[kept])]
+    ends = np.minimum(run_ends[kept], lines.size - 1)
+    columns = matrix[:, 1].astype(np.int64)
+    uncovered = list(zip(lines[firsts].tolist(), columns[firsts].tolist(),
+                         lines[ends].tolist(), columns[ends].tolist(), counts[kept].tolist()))
+
+    return covered_lines, total_lines, covered_branches, total_branches, uncovered
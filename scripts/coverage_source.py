@@ -0,0 +1,189 @@
+"""
+Annotated source pages for the HTML report.
+
+For every file with a gap (uncovered lines or ranges), writes one page
+fragment holding the file's source and the hit count of each line. The report
+loads a fragment only when a file's source is opened, so the report itself
+stays the size of its file list. Fragments are small scripts
+(`coverageSource(id, {...})`) rather than JSON so they also load from
+`file://`, where browsers block fetch().
+
+Line hits follow the reports: a line where segments start shows the highest of
+their counts. Lines without a segment start that lie inside a region that
+never ran are marked -1, so the page can tint the whole gap.
+
+Segments come from a coverage pack or from the export, reading only the files
+with gaps. Sources are read from the path in the export, or from
+Sources/<Package>/ under the package when the export was made elsewhere,
+through a cache bounded by total size.
+
+Usage:
+    from coverage_source import SourceCache, write_source_pages
+
+    pages = write_source_pages(coverage_stats, package_path, pages_dir, coverage_file=coverage_file)
+    # pages maps each annotated file's relative path to its fragment id
+
+    # Or next to an HTML report, picking the package's default pack when it is up to date
+    source_dir, pages = annotate_report(coverage_stats, package_path, html_path, coverage_file)
+"""
+
+import json
+from collections import OrderedDict
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from coverage_diff import build_line_index
+from coverage_pack import CoveragePack, fresh_default_pack
+from coverage_profile import CoverageProfiler, profile_phase
+from coverage_stream import iter_export_files
+
+# Total source text kept in memory by a SourceCache
+DEFAULT_SOURCE_CACHE_BYTES = 32 * 1024 * 1024
+
+# Marks a line inside a region that never ran, where no segment starts
+GAP_LINE = -1
+
+class SourceCache:
+    """
+    Source files as lists of lines, least recently used dropped first once
+    the cached text exceeds max_bytes. Missing files are cached as None.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SOURCE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def lines(self, path: Path) -> Optional[List[str]]:
+        key = str(path)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            lines, size = None, 0
+        else:
+            lines, size = data.decode('utf-8', errors='replace').splitlines(), len(data)
+        self.entries[key] = (lines, size)
+        self.size += size
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+        return lines
+
+def source_paths(filename: str, stats: Dict, package_path: Path) -> List[Path]:
+    """Where a file's source may be: its path in the export, then under the package's Sources/."""
+    return [Path(filename), package_path / 'Sources' / package_path.name / stats['relative_path']]
+
+def has_gaps(stats: Dict) -> bool:
+    """Whether a file has uncovered lines or ranges worth annotating."""
+    return bool(stats['uncovered_ranges']) or stats['line_coverage']['covered'] < stats['line_coverage']['total']
+
+def annotate_lines(segments: List, line_count: int) -> List[Optional[int]]:
+    """
+    Per source line: its hits when segments start on it, GAP_LINE inside a
+    region that never ran, otherwise None.
+    """
+    lines, counts, _, _ = build_line_index(segments)
+    annotations = [None] * line_count
+    for line, count in zip(lines, counts):
+        if 1 <= line <= line_count:
+            annotations[line - 1] = count
+    ordered = sorted(segments, key=itemgetter(0, 1))
+    for segment, following in zip(ordered, ordered[1:] + [None]):
+        # A counted, non-gap region with no executions covers the lines up to the next segment
+        if segment[3] and not segment[5] and segment[2] == 0:
+            end = following[0] if following is not None else segment[0] + 1
+            for line in range(segment[0] + 1, min(end, line_count + 1)):
+                if annotations[line - 1] is None:
+                    annotations[line - 1] = GAP_LINE
+    return annotations
+
+def _gap_segments(coverage_stats: Dict[str, Dict], coverage_file: Optional[Path],
+                  pack_path: Optional[Path]) -> Iterator[Tuple[str, List]]:
+    """
+    (filename, segments) of every file with gaps, each once, from a pack or
+    the export. A file listed more than once uses its last entry, the one the
+    statistics count.
+    """
+    wanted = {filename for filename, stats in coverage_stats.items() if has_gaps(stats)}
+    if not wanted:
+        return
+    if pack_path is not None:
+        with CoveragePack(pack_path) as pack:
+            for filename in sorted(wanted):
+                index = pack.find(filename)
+                if index is not None:
+                    yield filename, pack.segments(index)
+        return
+    segments = {}
+    for entry in iter_export_files(str(coverage_file), lambda filename: filename in wanted, raw=True):
+        segments[entry['filename']] = entry.get('segments', '[]')
+    for filename, text in segments.items():
+        yield filename, json.loads(text)
+
+def write_source_pages(coverage_stats: Dict[str, Dict], package_path: Path, pages_dir: Path,
+                       coverage_file: Optional[Path] = None, pack_path: Optional[Path] = None,
+                       cache: Optional[SourceCache] = None) -> Dict[str, int]:
+    """
+    Write one fragment per file with gaps to pages_dir, replacing the
+    fragments of an earlier report, and return {relative path: fragment id}.
+    Files whose source can't be found get no fragment.
+    """
+    cache = cache or SourceCache()
+    pages_dir.mkdir(parents=True, exist_ok=True)
+    for stale in pages_dir.glob('*.js'):
+        stale.unlink()
+
+    pages = {}
+    missing = 0
+    for filename, segments in _gap_segments(coverage_stats, coverage_file, pack_path):
+        stats = coverage_stats[filename]
+        source = None
+        for path in source_paths(filename, stats, package_path):
+            source = cache.lines(path)
+            if source is not None:
+                break
+        if source is None:
+            missing += 1
+            continue
+        page_id = len(pages)
+        page = {
+            'file': stats['relative_path'],
+            'lines': source,
+            'hits': annotate_lines(segments, len(source)),
+            'uncovered': [[uncovered['line'], uncovered['column'], uncovered['end_line'], uncovered['end_column']]
+                          for uncovered in stats['uncovered_ranges']],
+        }
+        with open(pages_dir / f'{page_id}.js', 'w', encoding='utf-8') as f:
+            f.write(f"coverageSource({page_id}, {json.dumps(page, separators=(',', ':'))});\n")
+        pages[stats['relative_path']] = page_id
+
+    if missing:
+        print(f"⚠️  No source found for {missing} file(s) with gaps; they have no annotated page")
+    return pages
+
+def source_pages_dir(html_path: Path) -> Path:
+    """Directory of a report's source fragments: `<report name>_files` next to it."""
+    return html_path.with_name(html_path.stem + '_files')
+
+def annotate_report(coverage_stats: Dict[str, Dict], package_path: Path, html_path: Path,
+                    coverage_file: Optional[Path] = None, pack_path: Optional[Path] = None,
+                    merge: bool = False,
+                    profiler: Optional[CoverageProfiler] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Write the source fragments of an HTML report and return (their directory
+    name relative to the report, {relative path: fragment id}). Segments are
+    read from pack_path, else from the package's default pack when it is
+    current for the report's mode (merged or not), else from the export.
+    """
+    if pack_path is None:
+        pack_path = fresh_default_pack(package_path, merge)
+    pages_dir = source_pages_dir(html_path)
+    with profile_phase(profiler, 'annotate_sources'):
+        pages = write_source_pages(coverage_stats, package_path, pages_dir, coverage_file, pack_path)
+    print(f"✅ {len(pages)} annotated source page(s) saved to: {pages_dir}")
+    return pages_dir.name, pages
@@ -0,0 +1,339 @@
+"""
+Streaming reader for llvm-cov export JSON.
+
+`json.load` on a full `codecov/<Package>.json` export keeps the whole document
+in memory as Python objects, which costs several times the file size. This
+module walks `data[].files[]` incrementally instead: the export is read in
+fixed-size chunks, each file entry is yielded as soon as it has been read, and
+only the keys a caller asks for are decoded. Entries whose filename is rejected
+are skipped by scanning over their text without building any objects.
+
+Usage:
+    from coverage_stream import iter_export_entries, iter_export_files
+
+    for file_data in iter_export_files(path, include=lambda name: '/Sources/' in name):
+        segments = file_data['segments']
+
+    # Files and functions in one pass, e.g. for merging exports
+    for kind, entry in iter_export_entries(path, raw=True):
+        key = entry['filename'] if kind == 'files' else entry['name']
+"""
+
+import json
+import re
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE_RE = re.compile(r'\s*')
+_STRUCTURAL_RE = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+_SCALAR_RE = re.compile(r'[^\s,\]}]+')
+_MATRIX_END_RE = re.compile(r'\]\s*\]')
+_DECODER = json.JSONDecoder()
+
+# Keys whose values are arrays of arrays of numbers, skipped with skip_number_matrix
+NUMBER_MATRIX_KEYS = ('segments', 'branches')
+
+
+class _JsonStream:
+    """Minimal pull parser over a text file, buffering one chunk at a time."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._eof = False
+        self._mark = None
+        self.buf = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping text that has already been consumed."""
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        keep_from = self.pos if self._mark is None else min(self.pos, self._mark)
+        if keep_from:
+            self.buf = self.buf[keep_from:]
+            self.pos -= keep_from
+            if self._mark is not None:
+                self._mark -= keep_from
+        self.buf += chunk
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buf, min(self.pos, len(self.buf)))
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def _scan_string(self):
+        """Advance past the string whose opening quote is at the current position."""
+        self.pos += 1
+        while True:
+            match = _STRING_SPECIAL_RE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise self._error('Unterminated string')
+                continue
+            self.pos = match.start()
+            if match.group() == '"':
+                self.pos += 1
+                return
+            while self.pos + 1 >= len(self.buf):
+                if not self._fill():
+                    raise self._error('Unterminated string')
+            self.pos += 2
+
+    def _scan_value(self):
+        """Advance past the next value without decoding it."""
+        char = self.peek()
+        if char == '"':
+            self._scan_string()
+            return
+        if char in ('[', '{'):
+            depth = 0
+            while True:
+                match = _STRUCTURAL_RE.search(self.buf, self.pos)
+                if match is None:
+                    self.pos = len(self.buf)
+                    if not self._fill():
+                        raise self._error('Unexpected end of input')
+                    continue
+                token = match.group()
+                if token == '"':
+                    self.pos = match.start()
+                    self._scan_string()
+                    continue
+                self.pos = match.end()
+                if token in '[{':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return
+        if not char:
+            raise self._error('Expecting value')
+        while True:
+            match = _SCALAR_RE.match(self.buf, self.pos)
+            if match is None:
+                raise self._error('Expecting value')
+            if match.end() < len(self.buf) or not self._fill():
+                self.pos = match.end()
+                return
+
+    def skip_value(self):
+        self._scan_value()
+
+    def skip_number_matrix(self):
+        """
+        Advance past an array of arrays of scalars, such as `segments`. Inner
+        arrays can't nest, so the first `]]` closes the outer array; finding it
+        costs one regex search per chunk instead of one step per row.
+        """
+        if self.peek() != '[':
+            self._scan_value()
+            return
+        start = self.pos
+        self.pos += 1
+        char = self.peek()
+        if char == ']':
+            self.pos += 1
+            return
+        if char != '[':
+            self.pos = start
+            self._scan_value()
+            return
+        while True:
+            match = _MATRIX_END_RE.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return
+            # Resume from the last ']' in case the closing pair spans two chunks
+            last = self.buf.rfind(']', self.pos)
+            self.pos = last if last >= 0 else len(self.buf)
+            if not self._fill():
+                raise self._error('Unexpected end of input')
+
+    def read_raw(self, number_matrix: bool = False) -> str:
+        """
+        Return the JSON text of the next value without decoding it. With
+        number_matrix the value is scanned like skip_number_matrix does.
+        """
+        self.peek()
+        self._mark = self.pos
+        try:
+            if number_matrix:
+                self.skip_number_matrix()
+            else:
+                self._scan_value()
+            return self.buf[self._mark:self.pos]
+        finally:
+            self._mark = None
+
+    def read_value(self):
+        """Decode the next value, which is held in the buffer only while it is read."""
+        return json.loads(self.read_raw())
+
+    def decode_value(self):
+        """
+        Decode the next value straight from the buffer with the C decoder,
+        reading more input while the value runs past the end of the buffer.
+        Faster than read_value for values made of many small tokens.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Possibly cut off at the chunk boundary rather than invalid
+                if self._fill():
+                    continue
+                raise
+            if end < len(self.buf) or not self._fill():
+                self.pos = end
+                return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield each key of the next object; the caller must consume its value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error('Expecting property name enclosed in double quotes')
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self.pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def iter_array(self) -> Iterator[int]:
+        """Yield once per element of the next array; the caller must consume it."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self.pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+
+def _read_file_entry(stream: _JsonStream, include: Optional[Callable[[str], bool]],
+                     fields: Sequence[str], raw: bool = False) -> Optional[dict]:
+    """Read one `files[]` entry, decoding only `filename` and the requested fields."""
+    entry = {}
+    keep = None
+    for key in stream.iter_object():
+        if key == 'filename':
+            entry['filename'] = stream.read_value()
+            keep = include is None or include(entry['filename'])
+        elif key in fields and keep is not False:
+            # llvm-cov sorts keys, so `filename` precedes `segments` and
+            # `summary`; a field seen earlier has to be kept until we know.
+            entry[key] = stream.read_raw(key in NUMBER_MATRIX_KEYS) if raw else stream.read_value()
+        elif key in NUMBER_MATRIX_KEYS:
+            stream.skip_number_matrix()
+        else:
+            stream.skip_value()
+    if keep is None:
+        entry['filename'] = ''
+        keep = include is None or include('')
+    return entry if keep else None
+
+
+def iter_export_files(coverage_path: str, include: Optional[Callable[[str], bool]] = None,
+                      fields: Sequence[str] = ('segments',), raw: bool = False,
+                      chunk_size: int = CHUNK_SIZE, files_only: bool = False) -> Iterator[dict]:
+    """
+    Yield `data[].files[]` entries from an llvm-cov export one at a time.
+
+    Each yielded dict holds `filename` plus whichever of `fields` the entry has.
+    With raw=True those fields are left as undecoded JSON text, e.g. for hashing.
+    Entries for which `include(filename)` is false are never decoded.
+    Raises FileNotFoundError or json.JSONDecodeError like `json.load` would.
+
+    llvm-cov writes a single `data` entry whose `functions` and `totals` follow
+    its `files`. With files_only=True reading stops at the end of that first
+    `files` array, so the (often larger) rest of the export is neither read
+    nor validated.
+    """
+    with open(coverage_path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.iter_object():
+            if key != 'data':
+                stream.skip_value()
+                continue
+            for _ in stream.iter_array():
+                for export_key in stream.iter_object():
+                    if export_key != 'files':
+                        stream.skip_value()
+                        continue
+                    for _ in stream.iter_array():
+                        entry = _read_file_entry(stream, include, fields, raw)
+                        if entry is not None:
+                            yield entry
+                    if files_only:
+                        return
+        if stream.peek():
+            raise stream._error('Extra data')
+
+
+def iter_export_entries(coverage_path: str, include: Optional[Callable[[str], bool]] = None,
+                        fields: Sequence[str] = ('segments',), raw: bool = False,
+                        chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield every `data[].files[]` and `data[].functions[]` entry in a single
+    pass, as ('files', entry) and ('functions', entry) pairs in export order.
+    File entries are read like iter_export_files reads them, including the
+    `include` filter; functions are always decoded.
+    """
+    with open(coverage_path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size)
+        for key in stream.iter_object():
+            if key != 'data':
+                stream.skip_value()
+                continue
+            for _ in stream.iter_array():
+                for export_key in stream.iter_object():
+                    if export_key == 'files':
+                        for _ in stream.iter_array():
+                            entry = _read_file_entry(stream, include, fields, raw)
+                            if entry is not None:
+                                yield 'files', entry
+                    elif export_key == 'functions':
+                        for _ in stream.iter_array():
+                            yield 'functions', stream.decode_value()
+                    else:
+                        stream.skip_value()
+        if stream.peek():
+            raise stream._error('Extra data')
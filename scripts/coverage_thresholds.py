@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Swift Coverage Thresholds
+
+Checks coverage against a declarative threshold file and exits with status 2
+and a short list of violations when one is missed (1 is left for errors).
+coverage_report.py and coverage_all.py take the same file with --thresholds
+and check it against the statistics they have just computed, so gating never
+parses the export a second time. This script checks coverage_summary.json
+files that were already written, without any analysis.
+
+Threshold file (JSON):
+    {
+      "global":     {"overall": 70},
+      "packages":   {"Troop900Domain": {"overall": 85, "line": 90}},
+      "categories": {"Troop900Domain/Entities": {"overall": 95}},
+      "files":      {"Troop900Application/UseCases/*": {"overall": 85}}
+    }
+
+    Every entry maps metrics (overall, line, branch) to a minimum percentage.
+
+    global      Minimums for each package's totals
+    packages    Per package; overrides the global minimums metric by metric
+    categories  Category totals, for every "<Package>/<Category>" matching the pattern
+    files       Every file whose "<Package>/<path under Sources/<Package>/>" matches the pattern
+
+Patterns use shell-style wildcards (`*`, `?`, `[...]`); `*` also matches `/`,
+so "*/UseCases/*" covers every use case file in any package, at any depth.
+Category and file entries are independent: each matching entry is checked.
+Totals follow the reports, so a package or category without branches has an
+overall score of 0; gate those on "line" instead.
+
+Usage:
+    python3 coverage_thresholds.py <summary> [<summary> ...] [options]
+
+    summary: coverage_summary.json written by coverage_report.py (--format summary),
+             or a package directory containing one
+
+Options:
+    --thresholds <path>   Threshold file (default: ios/Packages/coverage-thresholds.json)
+    --max-violations <n>  Violations listed before the rest are counted (default: 50)
+    --json <path>         Also write the violations as JSON
+    --help               Show this help message
+
+Examples:
+    # Gate while generating the reports (single parse)
+    python3 coverage_report.py ios/Packages/Troop900Domain --thresholds ios/Packages/coverage-thresholds.json
+
+    # Gate every package from summaries written earlier
+    python3 coverage_thresholds.py ios/Packages/*/coverage_summary.json
+"""
+
+import re
+import sys
+import json
+import fnmatch
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from coverage_core import SUMMARY_VERSION, summarize_coverage
+
+DEFAULT_THRESHOLDS_PATH = Path(__file__).resolve().parent.parent / 'ios' / 'Packages' / 'coverage-thresholds.json'
+
+THRESHOLD_SCOPES = ['global', 'packages', 'categories', 'files']
+
+# metric name -> key of the statistic it reads
+THRESHOLD_METRICS = {
+    'overall': None,
+    'line': 'line_coverage',
+    'branch': 'branch_coverage',
+}
+
+DEFAULT_MAX_VIOLATIONS = 50
+
+# Exit status for missed thresholds, distinct from 1 for errors
+VIOLATION_EXIT_STATUS = 2
+
+def parse_minimums(value, where: str) -> Dict[str, float]:
+    """Validate one {metric: minimum percentage} entry."""
+    if not isinstance(value, dict):
+        raise ValueError(f"{where}: expected an object of minimums, got {type(value).__name__}")
+    minimums = {}
+    for metric, minimum in value.items():
+        if metric not in THRESHOLD_METRICS:
+            raise ValueError(f"{where}: unknown metric '{metric}' (choose from {', '.join(THRESHOLD_METRICS)})")
+        if isinstance(minimum, bool) or not isinstance(minimum, (int, float)) or not 0 <= minimum <= 100:
+            raise ValueError(f"{where}.{metric}: minimum must be a percentage between 0 and 100")
+        minimums[metric] = float(minimum)
+    return minimums
+
+def parse_thresholds(config: Dict) -> Dict:
+    """
+    Validate a threshold config and normalize it to
+    {'global': minimums, 'packages': {name: minimums},
+     'categories': [(pattern, minimums)], 'files': [(pattern, minimums)]}.
+    Raises ValueError with the offending key.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("expected a JSON object")
+    unknown = [key for key in config if key not in THRESHOLD_SCOPES]
+    if unknown:
+        raise ValueError(f"unknown key(s) {', '.join(unknown)} (choose from {', '.join(THRESHOLD_SCOPES)})")
+
+    thresholds = {'global': parse_minimums(config.get('global', {}), 'global'),
+                  'packages': {}, 'categories': [], 'files': []}
+    for scope in ('packages', 'categories', 'files'):
+        entries = config.get(scope, {})
+        if not isinstance(entries, dict):
+            raise ValueError(f"{scope}: expected an object, got {type(entries).__name__}")
+        for key, value in entries.items():
+            minimums = parse_minimums(value, f"{scope}.{key}")
+            if scope == 'packages':
+                thresholds['packages'][key] = minimums
+            else:
+                thresholds[scope].append((key, minimums))
+    return thresholds
+
+def load_thresholds(path: Path) -> Dict:
+    """Read and validate a threshold file (see parse_thresholds)."""
+    with open(path, 'r') as f:
+        return parse_thresholds(json.load(f))
+
+def metric_value(stats: Dict, metric: str) -> float:
+    """A file's or a total's percentage for one metric."""
+    key = THRESHOLD_METRICS[metric]
+    return stats['overall_percentage'] if key is None else stats[key]['percentage']
+
+def check_minimums(stats: Dict, minimums: Dict[str, float], package_name: str, scope: str, target: str,
+                   rule: Optional[str], violations: List[Dict]):
+    """Append a violation for every metric of stats below its minimum."""
+    for metric, minimum in minimums.items():
+        actual = metric_value(stats, metric)
+        if actual < minimum:
+            violations.append({'package': package_name, 'scope': scope, 'target': target, 'rule': rule,
+                               'metric': metric, 'actual': actual, 'minimum': minimum})
+
+def check_thresholds(coverage_stats: Dict[str, Dict], package_name: str, thresholds: Dict) -> List[Dict]:
+    """
+    Check one package's per-file statistics against parsed thresholds.
+    Files are visited once: file rules are checked and category members
+    collected in the same loop, then category and package totals are checked.
+    Returns violations ordered package, categories, files.
+    """
+    file_rules = [(pattern, re.compile(fnmatch.translate(pattern)), minimums)
+                  for pattern, minimums in thresholds['files']]
+    by_category = {}
+    file_violations = []
+    for filepath, stats in coverage_stats.items():
+        by_category.setdefault(stats['category'], {})[filepath] = stats
+        target = f"{package_name}/{stats['relative_path']}"
+        for pattern, matcher, minimums in file_rules:
+            if matcher.match(target):
+                check_minimums(stats, minimums, package_name, 'file', target, pattern, file_violations)
+
+    violations = []
+    package_minimums = thresholds['packages'].get(package_name, {})
+    global_minimums = {metric: minimum for metric, minimum in thresholds['global'].items()
+                       if metric not in package_minimums}
+    if package_minimums or global_minimums:
+        totals = summarize_coverage(coverage_stats)
+        check_minimums(totals, package_minimums, package_name, 'package', package_name, package_name, violations)
+        check_minimums(totals, global_minimums, package_name, 'package', package_name, 'global', violations)
+    for category in sorted(by_category):
+        target = f"{package_name}/{category}"
+        rules = [(pattern, minimums) for pattern, minimums in thresholds['categories']
+                 if fnmatch.fnmatchcase(target, pattern)]
+        if rules:
+            totals = summarize_coverage(by_category[category])
+            for pattern, minimums in rules:
+                check_minimums(totals, minimums, package_name, 'category', target, pattern, violations)
+    violations.extend(sorted(file_violations, key=lambda violation: violation['target']))
+    return violations
+
+def format_violations(violations: List[Dict], max_violations: int = DEFAULT_MAX_VIOLATIONS) -> str:
+    """Concise violation list, one line each, capped at max_violations."""
+    lines = [f"❌ {len(violations)} coverage threshold violation(s):"]
+    for violation in violations[:max_violations]:
+        rule = f'  [{violation["rule"]}]' if violation['rule'] not in (None, violation['target']) else ''
+        lines.append(f"   {violation['target']} ({violation['scope']}): {violation['metric']} "
+                     f"{violation['actual']:.1f}% < {violation['minimum']:.1f}%{rule}")
+    if len(violations) > max_violations:
+        lines.append(f"   ... and {len(violations) - max_violations} more")
+    return "\n".join(lines)
+
+def summary_coverage_stats(summary: Dict) -> Dict[str, Dict]:
+    """Per-file statistics from a coverage_summary.json, in the shape check_thresholds reads."""
+    if summary.get('version') != SUMMARY_VERSION:
+        raise ValueError(f"unsupported summary version {summary.get('version')} (expected {SUMMARY_VERSION})")
+    return {relative_path: {**stats, 'relative_path': relative_path}
+            for relative_path, stats in summary['files'].items()}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check Swift coverage summaries against thresholds',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('summaries', nargs='+', help='coverage_summary.json files or package directories')
+    parser.add_argument('--thresholds', default=str(DEFAULT_THRESHOLDS_PATH),
+                        help='Threshold file (default: ios/Packages/coverage-thresholds.json)')
+    parser.add_argument('--max-violations', type=int, default=DEFAULT_MAX_VIOLATIONS,
+                        help=f'Violations listed before the rest are counted (default: {DEFAULT_MAX_VIOLATIONS})')
+    parser.add_argument('--json', help='Also write the violations as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        thresholds = load_thresholds(Path(args.thresholds))
+    except (OSError, ValueError) as e:
+        print(f"Error: Invalid thresholds file {args.thresholds}: {e}")
+        sys.exit(1)
+
+    violations = []
+    for value in args.summaries:
+        summary_path = Path(value)
+        if summary_path.is_dir():
+            summary_path = summary_path / 'coverage_summary.json'
+        try:
+            with open(summary_path, 'r') as f:
+                summary = json.load(f)
+            coverage_stats = summary_coverage_stats(summary)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: Could not read coverage summary {summary_path}: {e}")
+            sys.exit(1)
+        violations.extend(check_thresholds(coverage_stats, summary['package'], thresholds))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'violations': violations}, f, indent=2)
+        print(f"✅ JSON saved to: {args.json}")
+
+    if violations:
+        print(format_violations(violations, args.max_violations))
+        sys.exit(VIOLATION_EXIT_STATUS)
+    print(f"✅ Coverage thresholds met for {len(args.summaries)} package(s)")
+
+if __name__ == '__main__':
+    main()
@@ -13,180 +13,207 @@ Usage:
 Options:
     --filter <pattern>    Only analyze files matching this pattern
     --output <path>       Output HTML file path (default: coverage_report.html in package dir)
+    --stream             Stream the export instead of loading it into memory
+    --merge              Merge every export found for the package (architectures, shards) first
+    --pack <path>         Read the analysis from a coverage pack (coverage_pack.py) instead of the export
+    --summary-only       Use llvm-cov's per-file summaries only; skip segment analysis
+    --annotate           Also write annotated source pages for files with gaps (<report>_files/)
+    --engine <name>       Segment analysis engine: python, array, numpy (default: python)
+    --cache-dir <path>    Analysis cache directory (default: <package>/.build/coverage-cache)
+    --no-cache           Analyze every file from scratch without reading or writing the cache
+    --profile            Print per-phase timing and memory and write a JSON trace
+    --profile-trace <path> Where to write the trace (default: coverage_profile.json in package dir)
+    --profile-top <n>     Number of slowest files to list in the profile (default: 10)
     --help               Show this help message
 
 Examples:
     python3 generate_html_coverage.py ios/Packages/Troop900Application
     python3 generate_html_coverage.py ios/Packages/Troop900Domain --filter "Entities"
     python3 generate_html_coverage.py ios/Packages/Troop900Application --output reports/app_coverage.html
+    python3 generate_html_coverage.py ios/Packages/Troop900Application --stream
+    python3 generate_html_coverage.py ios/Packages/Troop900Application --annotate
+    python3 generate_html_coverage.py ios/Packages/Troop900Application --profile
 """
 
-import json
 import sys
+import html
+import json
 import argparse
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, Optional
-
-def load_coverage_data(coverage_path: str) -> dict:
-    """Load the JSON coverage data file."""
-    try:
-        with open(coverage_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Error: Coverage data not found at {coverage_path}")
-        print("Make sure to run 'swift test --enable-code-coverage' first")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in coverage data: {e}")
-        sys.exit(1)
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
 
-def analyze_segments(segments):
-    """Analyze coverage segments."""
-    if not segments:
-        return 0, 0, 0, 0
-    
-    lines = {}
-    branches = []
-    
-    for segment in segments:
-        line = segment[0]
-        col = segment[1]
-        count = segment[2]
-        is_region = segment[3]
-        has_count = segment[4]
-        
-        if line not in lines:
-            lines[line] = count > 0
-        else:
-            lines[line] = lines[line] or (count > 0)
-        
-        if is_region and has_count:
-            branches.append(count > 0)
-    
-    covered_lines = sum(1 for covered in lines.values() if covered)
-    total_lines = len(lines)
-    covered_branches = sum(1 for covered in branches if covered)
-    total_branches = len(branches)
-    
-    return covered_lines, total_lines, covered_branches, total_branches
+from coverage_core import (ENGINE_CHOICES, QUALITY_BUCKETS, collect_coverage_stats, open_coverage_cache,
+                           build_directory_tree, iter_directory_tree, quality_bucket, require_coverage_file,
+                           uncovered_line_count)
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import load_pack_stats
+from coverage_profile import DEFAULT_TOP_FILES, DEFAULT_TRACE_NAME, CoverageProfiler, profile_phase, save_profile
+from coverage_source import annotate_report
 
-def analyze_file_coverage(coverage_data: dict, package_name: str, filter_pattern: Optional[str] = None):
-    """Analyze coverage data for files in the package."""
-    results = {}
-    
-    data = coverage_data.get('data', [])
-    
-    for file_entry in data:
-        for file_data in file_entry.get('files', []):
-            filename = file_data.get('filename', '')
-            
-            if f'/Sources/{package_name}/' not in filename:
-                continue
-            
-            if filter_pattern and filter_pattern not in filename:
-                continue
-            
-            parts = filename.split(f'/Sources/{package_name}/')
-            if len(parts) == 2:
-                relative_path = parts[1]
-                path_parts = relative_path.split('/')
-                
-                category = path_parts[0] if len(path_parts) > 1 else 'Root'
-                file_name = Path(filename).stem
-                
-                segments = file_data.get('segments', [])
-                covered_lines, total_lines, covered_branches, total_branches = analyze_segments(segments)
-                
-                line_pct = (covered_lines / total_lines * 100) if total_lines > 0 else 100.0
-                branch_pct = (covered_branches / total_branches * 100) if total_branches > 0 else 100.0
-                
-                if total_lines > 0 and total_branches > 0:
-                    overall_pct = (line_pct * 0.5 + branch_pct * 0.5)
-                elif total_lines > 0:
-                    overall_pct = line_pct
-                elif total_branches > 0:
-                    overall_pct = branch_pct
-                else:
-                    overall_pct = 100.0
-                
-                uncovered_regions = []
-                for segment in segments:
-                    line = segment[0]
-                    col = segment[1]
-                    count = segment[2]
-                    is_region = segment[3]
-                    has_count = segment[4]
-                    
-                    if is_region and has_count and count == 0:
-                        uncovered_regions.append({'line': line, 'column': col})
-                
-                results[filename] = {
-                    'category': category,
-                    'name': file_name,
-                    'relative_path': relative_path,
-                    'line_coverage': {
-                        'covered': covered_lines,
-                        'total': total_lines,
-                        'percentage': line_pct
-                    },
-                    'branch_coverage': {
-                        'covered': covered_branches,
-                        'total': total_branches,
-                        'percentage': branch_pct
-                    },
-                    'overall_percentage': overall_pct,
-                    'uncovered_regions': uncovered_regions
-                }
-    
-    return results
+# Files per data chunk yielded while writing the embedded dataset
+DATA_CHUNK_FILES = 1000
 
-def generate_html_report(coverage_stats, package_name: str, filter_pattern: Optional[str]):
-    """Generate an interactive HTML report."""
-    
-    # Group by category
+# Uncovered ranges embedded per file (the total is always included); the same
+# as the markdown report lists, and each range often spans several regions
+MAX_UNCOVERED_SHOWN = 5
+
+LEVEL_BUTTONS = [
+    ('perfect', '🎯 Perfect (100%)'),
+    ('excellent', '✅ Excellent (95%+)'),
+    ('good', '👍 Good (85-95%)'),
+    ('fair', '⚠️ Fair (70-85%)'),
+    ('poor', '🔴 Poor (<70%)'),
+]
+
+def _coverage_totals(stats_list) -> Tuple[int, int, int, int, float, float, float]:
+    """(lines covered, lines, branches covered, branches, line %, branch %, overall %) of a group of files."""
+    lines_covered = sum(s['line_coverage']['covered'] for s in stats_list)
+    lines = sum(s['line_coverage']['total'] for s in stats_list)
+    branches_covered = sum(s['branch_coverage']['covered'] for s in stats_list)
+    branches = sum(s['branch_coverage']['total'] for s in stats_list)
+    line_pct = (lines_covered / lines * 100) if lines > 0 else 0.0
+    branch_pct = (branches_covered / branches * 100) if branches > 0 else 0.0
+    return lines_covered, lines, branches_covered, branches, line_pct, branch_pct, line_pct * 0.5 + branch_pct * 0.5
+
+def _file_row(stats: Dict, page_id: Optional[int]) -> List:
+    """
+    One file as a compact row: name, path, line and branch counts, overall %,
+    uncovered ranges, the id of its annotated source page (or null) and the
+    number of lines its uncovered ranges span.
+    """
+    uncovered = []
+    for uncovered_range in stats['uncovered_ranges'][:MAX_UNCOVERED_SHOWN]:
+        uncovered.extend((uncovered_range['line'], uncovered_range['column'], uncovered_range['end_line'],
+                          uncovered_range['end_column'], uncovered_range['regions']))
+    return [stats['name'], stats['relative_path'],
+            stats['line_coverage']['covered'], stats['line_coverage']['total'],
+            stats['branch_coverage']['covered'], stats['branch_coverage']['total'],
+            round(stats['overall_percentage'], 2), len(stats['uncovered_ranges']), uncovered, page_id,
+            uncovered_line_count(stats)]
+
+def _directory_rows(tree: Dict) -> Tuple[List[List], Dict[str, int]]:
+    """
+    The directory tree as compact rows in preorder: name, parent, files, line
+    and branch counts, overall %, level and the end of its subtree, so a
+    directory's descendants are the rows in (its index, end). Also returns
+    each directory's index by path.
+    """
+    levels = [level for level, _ in QUALITY_BUCKETS]
+    rows, index_of = [], {}
+    parents = []
+    for depth, node in iter_directory_tree(tree):
+        del parents[depth:]
+        index_of[node['path']] = len(rows)
+        rows.append([node['name'], parents[-1] if parents else -1, node['files'],
+                     node['line_coverage']['covered'], node['line_coverage']['total'],
+                     node['branch_coverage']['covered'], node['branch_coverage']['total'],
+                     round(node['overall_percentage'], 2), levels.index(quality_bucket(node['overall_percentage'])),
+                     0])
+        parents.append(len(rows) - 1)
+    for index in range(len(rows) - 1, -1, -1):
+        parent = rows[index][1]
+        rows[index][9] = max(rows[index][9], index + 1)
+        if parent >= 0:
+            rows[parent][9] = max(rows[parent][9], rows[index][9])
+    return rows, index_of
+
+def iter_html_data(coverage_stats: Dict[str, Dict], source_dir: Optional[str] = None,
+                   source_pages: Optional[Dict[str, int]] = None, package_name: str = '') -> Iterator[str]:
+    """
+    The report's dataset as compact JSON, in chunks:
+    {"files": [row, ...], "categories": [...], "levels": {level: [file index, ...]},
+     "orders": {"name": [file index, ...], "path": [...]}, "sources": source_dir,
+     "directories": [directory row, ...], "fileDirectories": [directory index, ...]}.
+    Files are ordered by category, then name, so each category is the range
+    [start, end) of the file list; the level lists are ascending file indexes
+    and the orders sort the files by name and by path. fileDirectories holds
+    the index of each file's directory (see _directory_rows).
+    """
+    directories, directory_index = _directory_rows(build_directory_tree(coverage_stats, package_name))
+    file_directories = []
     by_category = defaultdict(list)
-    for filepath, stats in coverage_stats.items():
-        by_category[stats['category']].append((filepath, stats))
-    
-    # Calculate overall statistics
-    total_lines_covered = sum(s['line_coverage']['covered'] for s in coverage_stats.values())
-    total_lines = sum(s['line_coverage']['total'] for s in coverage_stats.values())
-    total_branches_covered = sum(s['branch_coverage']['covered'] for s in coverage_stats.values())
-    total_branches = sum(s['branch_coverage']['total'] for s in coverage_stats.values())
-    
-    overall_line_pct = (total_lines_covered / total_lines * 100) if total_lines > 0 else 0.0
-    overall_branch_pct = (total_branches_covered / total_branches * 100) if total_branches > 0 else 0.0
-    overall_pct = (overall_line_pct * 0.5 + overall_branch_pct * 0.5)
-    
-    filter_info = f" (Filtered: {filter_pattern})" if filter_pattern else ""
-    
-    html = f"""<!DOCTYPE html>
+    for stats in coverage_stats.values():
+        by_category[stats['category']].append(stats)
+
+    levels = {level: [] for level, _ in QUALITY_BUCKETS}
+    names, paths = [], []
+    categories = []
+    index = 0
+    separator = ''
+    yield '{"files":['
+    for category in sorted(by_category):
+        files = sorted(by_category[category], key=lambda stats: stats['name'])
+        totals = _coverage_totals(files)
+        categories.append({'name': category, 'start': index, 'end': index + len(files),
+                           'overall': round(totals[6], 2)})
+        for first in range(0, len(files), DATA_CHUNK_FILES):
+            chunk = files[first:first + DATA_CHUNK_FILES]
+            rows = []
+            for stats in chunk:
+                levels[quality_bucket(stats['overall_percentage'])].append(index)
+                names.append(stats['name'])
+                paths.append(stats['relative_path'].lower())
+                file_directories.append(directory_index[stats['relative_path'].rpartition('/')[0]])
+                page_id = source_pages.get(stats['relative_path']) if source_pages else None
+                rows.append(json.dumps(_file_row(stats, page_id), ensure_ascii=False, separators=(',', ':')))
+                index += 1
+            yield separator + ','.join(rows)
+            separator = ','
+    yield '],"categories":' + json.dumps(categories, ensure_ascii=False, separators=(',', ':'))
+    yield ',"levels":' + json.dumps(levels, separators=(',', ':'))
+    orders = {'name': sorted(range(index), key=names.__getitem__), 'path': sorted(range(index), key=paths.__getitem__)}
+    yield ',"orders":' + json.dumps(orders, separators=(',', ':'))
+    yield ',"sources":' + json.dumps(source_dir, ensure_ascii=False)
+    yield ',"directories":' + json.dumps(directories, ensure_ascii=False, separators=(',', ':'))
+    yield ',"fileDirectories":' + json.dumps(file_directories, separators=(',', ':')) + '}'
+
+def iter_html_report(coverage_stats, package_name: str, filter_pattern: Optional[str],
+                     source_dir: Optional[str] = None, source_pages: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """
+    Generate an interactive HTML report as a sequence of chunks. The files are
+    embedded as a compact JSON dataset and drawn by a virtualized list, which
+    only creates elements for the rows in view, so the page stays responsive
+    with tens of thousands of files. Files in source_pages link to their
+    annotated source fragment in source_dir (see coverage_source.py), which
+    is loaded when opened.
+    """
+    total_lines_covered, total_lines, total_branches_covered, total_branches, \
+        overall_line_pct, overall_branch_pct, overall_pct = _coverage_totals(coverage_stats.values())
+    level_counts = Counter(quality_bucket(stats['overall_percentage']) for stats in coverage_stats.values())
+
+    title = html.escape(package_name)
+    filter_info = f" (Filtered: {html.escape(filter_pattern)})" if filter_pattern else ""
+    level_buttons = ''.join(
+        f'\n            <button class="filter-btn" data-level="{level}">{label} · {level_counts[level]}</button>'
+        for level, label in LEVEL_BUTTONS)
+
+    yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Code Coverage Report - {package_name}</title>
+    <title>Code Coverage Report - {title}</title>
     <style>
         * {{
             margin: 0;
             padding: 0;
             box-sizing: border-box;
         }}
-        
+
         body {{
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
             background: #f5f5f7;
             color: #1d1d1f;
             line-height: 1.6;
         }}
-        
+
         .container {{
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
         }}
-        
+
         header {{
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
@@ -195,25 +222,25 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             border-radius: 12px;
             box-shadow: 0 4px 12px rgba(0,0,0,0.15);
         }}
-        
+
         h1 {{
             font-size: 2.5em;
             margin-bottom: 10px;
             font-weight: 600;
         }}
-        
+
         .subtitle {{
             font-size: 1.1em;
             opacity: 0.9;
         }}
-        
+
         .stats-grid {{
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
         }}
-        
+
         .stat-card {{
             background: white;
             padding: 25px;
@@ -221,12 +248,12 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
             transition: transform 0.2s;
         }}
-        
+
         .stat-card:hover {{
             transform: translateY(-2px);
             box-shadow: 0 4px 12px rgba(0,0,0,0.15);
         }}
-        
+
         .stat-label {{
             font-size: 0.9em;
             color: #666;
@@ -234,73 +261,194 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             letter-spacing: 0.5px;
             margin-bottom: 8px;
         }}
-        
+
         .stat-value {{
             font-size: 2.5em;
             font-weight: 700;
             margin-bottom: 8px;
         }}
-        
+
         .stat-detail {{
             font-size: 0.9em;
             color: #666;
         }}
-        
-        .category-section {{
+
+        .directory-tree {{
+            margin-bottom: 20px;
+            font-size: 0.9em;
+        }}
+
+        .directory-tree details {{
+            margin-left: 18px;
+        }}
+
+        .directory-tree > details {{
+            margin-left: 0;
+        }}
+
+        .directory-tree summary {{
+            display: flex;
+            align-items: center;
+            gap: 12px;
+            padding: 4px 8px;
+            border-radius: 6px;
+            cursor: pointer;
+        }}
+
+        .directory-tree summary:hover {{
+            background: #f5f5f7;
+        }}
+
+        .directory-tree details.leaf > summary {{
+            list-style: none;
+            padding-left: 22px;
+        }}
+
+        .directory-tree .directory-name {{
+            flex: 1;
+            font-family: 'Monaco', 'Courier New', monospace;
+        }}
+
+        .directory-tree .directory-stats {{
+            color: #666;
+            white-space: nowrap;
+        }}
+
+        .directory-tree .directory-files {{
+            border: none;
+            background: none;
+            color: #667eea;
+            cursor: pointer;
+            font-size: 1em;
+        }}
+
+        .directory-tree .coverage-badge {{
+            padding: 0 10px;
+            min-width: 64px;
+            text-align: center;
+        }}
+
+        .toolbar {{
+            display: flex;
+            gap: 10px;
+            margin-bottom: 20px;
+            flex-wrap: wrap;
+        }}
+
+        .toolbar input, .toolbar select {{
+            padding: 10px 16px;
+            border: 1px solid #d2d2d7;
+            border-radius: 20px;
+            font-size: 0.95em;
+            background: white;
+        }}
+
+        .toolbar input {{
+            flex: 1;
+            min-width: 240px;
+        }}
+
+        .list-status {{
+            font-size: 0.9em;
+            color: #666;
+            margin-bottom: 10px;
+        }}
+
+        .file-list {{
+            position: relative;
+            height: 70vh;
+            overflow-y: auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            margin-bottom: 20px;
+        }}
+
+        .file-list-canvas {{
+            position: relative;
+        }}
+
+        .category-row, .file-row {{
+            position: absolute;
+            left: 0;
+            right: 0;
             overflow: hidden;
         }}
-        
-        .category-header {{
+
+        .category-row {{
+            height: 52px;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
-            padding: 20px;
+            padding: 12px 20px;
             cursor: pointer;
             display: flex;
             justify-content: space-between;
             align-items: center;
         }}
-        
-        .category-header:hover {{
+
+        .category-row:hover {{
             background: linear-gradient(135deg, #5568d3 0%, #654b8f 100%);
         }}
-        
+
         .category-name {{
-            font-size: 1.3em;
+            font-size: 1.1em;
             font-weight: 600;
         }}
-        
+
         .category-stats {{
             font-size: 0.9em;
             opacity: 0.9;
         }}
-        
-        .category-content {{
-            display: none;
-            padding: 20px;
+
+        .file-row {{
+            height: 76px;
+            padding: 8px 20px;
+            border-left: 4px solid #667eea;
+            border-bottom: 1px solid #e5e5e7;
+            cursor: pointer;
+        }}
+
+        .file-row:hover, .file-row.selected {{
+            background: #f9f9fb;
+        }}
+
+        .file-row.perfect, .file-item.perfect {{ border-left-color: #34c759; }}
+        .file-row.excellent, .file-item.excellent {{ border-left-color: #30d158; }}
+        .file-row.good, .file-item.good {{ border-left-color: #ffd60a; }}
+        .file-row.fair, .file-item.fair {{ border-left-color: #ff9f0a; }}
+        .file-row.poor, .file-item.poor {{ border-left-color: #ff3b30; }}
+
+        .file-row .file-name {{
+            font-size: 1em;
+            margin-bottom: 0;
         }}
-        
-        .category-content.active {{
-            display: block;
+
+        .file-row .file-path {{
+            margin-bottom: 0;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
         }}
-        
+
+        .row-metrics {{
+            display: flex;
+            gap: 20px;
+            font-size: 0.8em;
+            color: #666;
+        }}
+
         .file-item {{
             border-left: 4px solid #667eea;
             padding: 15px;
-            margin-bottom: 15px;
-            background: #f9f9fb;
+            margin-bottom: 20px;
+            background: white;
             border-radius: 6px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }}
+
+        .file-item[hidden] {{
+            display: none;
         }}
-        
-        .file-item.perfect {{ border-left-color: #34c759; }}
-        .file-item.excellent {{ border-left-color: #30d158; }}
-        .file-item.good {{ border-left-color: #ffd60a; }}
-        .file-item.fair {{ border-left-color: #ff9f0a; }}
-        .file-item.poor {{ border-left-color: #ff3b30; }}
-        
+
         .file-name {{
             font-size: 1.1em;
             font-weight: 600;
@@ -309,14 +457,14 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             align-items: center;
             gap: 10px;
         }}
-        
+
         .file-path {{
             font-size: 0.85em;
             color: #666;
             font-family: 'Monaco', 'Courier New', monospace;
             margin-bottom: 10px;
         }}
-        
+
         .coverage-badge {{
             display: inline-block;
             padding: 4px 12px;
@@ -325,25 +473,29 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             font-weight: 600;
             color: white;
         }}
-        
+
+        .file-row .coverage-badge {{
+            padding: 0 10px;
+        }}
+
         .coverage-badge.perfect {{ background: #34c759; }}
         .coverage-badge.excellent {{ background: #30d158; }}
         .coverage-badge.good {{ background: #ffd60a; color: #000; }}
         .coverage-badge.fair {{ background: #ff9f0a; }}
         .coverage-badge.poor {{ background: #ff3b30; }}
-        
+
         .coverage-details {{
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 10px;
             margin-top: 10px;
         }}
-        
+
         .coverage-metric {{
             font-size: 0.9em;
             color: #666;
         }}
-        
+
         .coverage-bar {{
             height: 8px;
             background: #e5e5e7;
@@ -351,18 +503,18 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             overflow: hidden;
             margin-top: 5px;
         }}
-        
+
         .coverage-bar-fill {{
             height: 100%;
             transition: width 0.3s ease;
         }}
-        
+
         .coverage-bar-fill.perfect {{ background: #34c759; }}
         .coverage-bar-fill.excellent {{ background: #30d158; }}
         .coverage-bar-fill.good {{ background: #ffd60a; }}
         .coverage-bar-fill.fair {{ background: #ff9f0a; }}
         .coverage-bar-fill.poor {{ background: #ff3b30; }}
-        
+
         .uncovered-regions {{
             margin-top: 10px;
             padding: 10px;
@@ -370,26 +522,71 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             border-left: 3px solid #ffc107;
             border-radius: 4px;
         }}
-        
+
         .uncovered-title {{
             font-weight: 600;
             margin-bottom: 5px;
             color: #856404;
         }}
-        
+
         .uncovered-list {{
             font-size: 0.9em;
             color: #856404;
             font-family: 'Monaco', 'Courier New', monospace;
         }}
-        
+
+        .source-view {{
+            margin-top: 15px;
+            max-height: 60vh;
+            overflow: auto;
+            border: 1px solid #e5e5e7;
+            border-radius: 6px;
+        }}
+
+        .source-view:empty {{
+            display: none;
+        }}
+
+        .source-table {{
+            border-collapse: collapse;
+            width: 100%;
+            font-family: 'Monaco', 'Courier New', monospace;
+            font-size: 0.8em;
+            line-height: 1.5;
+        }}
+
+        .source-table td {{
+            padding: 0 8px;
+            vertical-align: top;
+        }}
+
+        .line-number, .line-hits {{
+            text-align: right;
+            color: #999;
+            user-select: none;
+            white-space: nowrap;
+        }}
+
+        .line-code {{
+            white-space: pre;
+        }}
+
+        .source-table tr.hit .line-hits {{ color: #248a3d; background: #e8f8ec; }}
+        .source-table tr.miss {{ background: #ffe5e3; }}
+        .source-table tr.miss .line-hits {{ color: #ff3b30; font-weight: 600; }}
+        .source-table tr.gap {{ background: #fff3f2; }}
+
+        .region-start {{
+            text-decoration: underline wavy #ff3b30;
+        }}
+
         .filter-buttons {{
             display: flex;
             gap: 10px;
             margin-bottom: 20px;
             flex-wrap: wrap;
         }}
-        
+
         .filter-btn {{
             padding: 10px 20px;
             border: none;
@@ -401,14 +598,14 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
             transition: all 0.2s;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
         }}
-        
+
         .filter-btn:hover {{
             background: #667eea;
             color: white;
             transform: translateY(-1px);
             box-shadow: 0 4px 8px rgba(0,0,0,0.15);
         }}
-        
+
         .filter-btn.active {{
             background: #667eea;
             color: white;
@@ -419,9 +616,9 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
     <div class="container">
         <header>
             <h1>📊 Code Coverage Report</h1>
-            <div class="subtitle">{package_name}{filter_info}</div>
+            <div class="subtitle">{title}{filter_info}</div>
         </header>
-        
+
         <div class="stats-grid">
             <div class="stat-card">
                 <div class="stat-label">Overall Coverage</div>
@@ -444,165 +641,391 @@ def generate_html_report(coverage_stats, package_name: str, filter_pattern: Opti
                 <div class="stat-detail">Total analyzed</div>
             </div>
         </div>
-        
+
+        <div class="directory-tree" id="directory-tree"></div>
+
         <div class="filter-buttons">
-            <button class="filter-btn active" onclick="filterByLevel('all')">All Files</button>
-            <button class="filter-btn" onclick="filterByLevel('perfect')">🎯 Perfect (100%)</button>
-            <button class="filter-btn" onclick="filterByLevel('excellent')">✅ Excellent (95%+)</button>
-            <button class="filter-btn" onclick="filterByLevel('good')">👍 Good (85-95%)</button>
-            <button class="filter-btn" onclick="filterByLevel('fair')">⚠️ Fair (70-85%)</button>
-            <button class="filter-btn" onclick="filterByLevel('poor')">🔴 Poor (<70%)</button>
+            <button class="filter-btn active" data-level="all">All Files · {len(coverage_stats)}</button>{level_buttons}
         </div>
-"""
-    
-    # Add each category section
-    for category in sorted(by_category.keys()):
-        files = sorted(by_category[category], key=lambda x: x[1]['name'])
-        
-        # Calculate category stats
-        cat_lines_covered = sum(s['line_coverage']['covered'] for _, s in files)
-        cat_lines_total = sum(s['line_coverage']['total'] for _, s in files)
-        cat_branches_covered = sum(s['branch_coverage']['covered'] for _, s in files)
-        cat_branches_total = sum(s['branch_coverage']['total'] for _, s in files)
-        
-        cat_line_pct = (cat_lines_covered / cat_lines_total * 100) if cat_lines_total > 0 else 0.0
-        cat_branch_pct = (cat_branches_covered / cat_branches_total * 100) if cat_branches_total > 0 else 0.0
-        cat_overall = (cat_line_pct * 0.5 + cat_branch_pct * 0.5)
-        
-        html += f"""
-        <div class="category-section">
-            <div class="category-header" onclick="toggleCategory(this)">
-                <div class="category-name">{category}</div>
-                <div class="category-stats">{len(files)} files | {cat_overall:.1f}% coverage</div>
-            </div>
-            <div class="category-content active">
-"""
-        
-        for filepath, stats in files:
-            pct = stats['overall_percentage']
-            if pct == 100:
-                level = 'perfect'
-            elif pct >= 95:
-                level = 'excellent'
-            elif pct >= 85:
-                level = 'good'
-            elif pct >= 70:
-                level = 'fair'
-            else:
-                level = 'poor'
-            
-            html += f"""
-                <div class="file-item {level}" data-level="{level}">
-                    <div class="file-name">
-                        {stats['name']}
-                        <span class="coverage-badge {level}">{pct:.1f}%</span>
-                    </div>
-                    <div class="file-path">{stats['relative_path']}</div>
-                    <div class="coverage-details">
-                        <div>
-                            <div class="coverage-metric">
-                                Line Coverage: {stats['line_coverage']['covered']}/{stats['line_coverage']['total']} ({stats['line_coverage']['percentage']:.1f}%)
-                            </div>
-                            <div class="coverage-bar">
-                                <div class="coverage-bar-fill {level}" style="width: {stats['line_coverage']['percentage']}%"></div>
-                            </div>
-                        </div>
-                        <div>
-                            <div class="coverage-metric">
-                                Branch Coverage: {stats['branch_coverage']['covered']}/{stats['branch_coverage']['total']} ({stats['branch_coverage']['percentage']:.1f}%)
-                            </div>
-                            <div class="coverage-bar">
-                                <div class="coverage-bar-fill {level}" style="width: {stats['branch_coverage']['percentage']}%"></div>
-                            </div>
-                        </div>
-                    </div>
-"""
-            
-            if stats['uncovered_regions']:
-                html += f"""
-                    <div class="uncovered-regions">
-                        <div class="uncovered-title">⚠️ {len(stats['uncovered_regions'])} Uncovered Region(s):</div>
-                        <div class="uncovered-list">
-"""
-                for i, region in enumerate(stats['uncovered_regions'][:10]):
-                    html += f"Line {region['line']}, Col {region['column']}<br>"
-                
-                if len(stats['uncovered_regions']) > 10:
-                    html += f"... and {len(stats['uncovered_regions']) - 10} more"
-                
-                html += """
-                        </div>
-                    </div>
-"""
-            
-            html += """
-                </div>
-"""
-        
-        html += """
-            </div>
+
+        <div class="toolbar">
+            <input id="search" type="search" placeholder="Search files by path" autocomplete="off">
+            <select id="category">
+                <option value="-1">All categories</option>
+            </select>
+            <select id="sort">
+                <option value="category">Sort: Category</option>
+                <option value="name">Sort: Name</option>
+                <option value="path">Sort: Path</option>
+                <option value="lowest">Sort: Lowest coverage</option>
+                <option value="highest">Sort: Highest coverage</option>
+                <option value="uncovered">Sort: Most uncovered ranges</option>
+            </select>
+            <button class="filter-btn" id="directory-clear" hidden></button>
+        </div>
+
+        <div class="file-item" id="file-detail" hidden></div>
+
+        <div class="list-status" id="list-status"></div>
+        <div class="file-list" id="file-list">
+            <div class="file-list-canvas" id="file-list-canvas"></div>
         </div>
-"""
-    
-    html += """
     </div>
-    
+
+    <script type="application/json" id="coverage-data">"""
+
+    # '<' only occurs inside JSON strings; escaping it keeps '</script>' and '<!--' out of the element
+    for chunk in iter_html_data(coverage_stats, source_dir, source_pages, package_name):
+        yield chunk.replace('<', '\\u003c')
+
+    yield """</script>
     <script>
-        function toggleCategory(header) {
-            const content = header.nextElementSibling;
-            content.classList.toggle('active');
-        }
-        
-        function filterByLevel(level) {
-            document.querySelectorAll('.filter-btn').forEach(btn => {
-                btn.classList.remove('active');
+        (function () {
+            // Row layout: name, path, lines covered, lines, branches covered, branches, overall %, uncovered ranges,
+            // [line, column, end line, end column, regions, ...]
+            // Row layout continued: ..., id of the annotated source page or null, lines in uncovered ranges
+            // Directory rows, in preorder: name, parent, files, lines covered, lines, branches covered, branches,
+            // overall %, level, end of its subtree
+            const data = JSON.parse(document.getElementById('coverage-data').textContent);
+            const files = data.files;
+            const categories = data.categories;
+            const directories = data.directories;
+            const fileDirectory = Uint32Array.from(data.fileDirectories);
+            const levelNames = Object.keys(data.levels);
+            const FILE_HEIGHT = 76, CATEGORY_HEIGHT = 52, OVERSCAN = 8;
+
+            // Per-file indexes built once from the precomputed ranges and level lists
+            const levelOf = new Uint8Array(files.length);
+            levelNames.forEach((level, number) => data.levels[level].forEach(index => { levelOf[index] = number; }));
+            const categoryOf = new Uint32Array(files.length);
+            categories.forEach((category, number) => categoryOf.fill(number, category.start, category.end));
+            const searchText = files.map(file => file[1].toLowerCase());
+
+            // Name and path orders come precomputed. Numeric orders pack (value, index) into
+            // one float per file and sort those natively, ties keeping file order
+            const INDEX_SPAN = 4194304;
+            function packedOrder(value) {
+                const keys = new Float64Array(files.length);
+                for (let index = 0; index < keys.length; index++) keys[index] = value(index) * INDEX_SPAN + index;
+                keys.sort();
+                return Uint32Array.from(keys, key => ((key % INDEX_SPAN) + INDEX_SPAN) % INDEX_SPAN);
+            }
+            const sorts = {
+                name: () => Uint32Array.from(data.orders.name),
+                path: () => Uint32Array.from(data.orders.path),
+                lowest: () => packedOrder(index => Math.round(files[index][6] * 100)),
+                highest: () => packedOrder(index => -Math.round(files[index][6] * 100)),
+                uncovered: () => packedOrder(index => -files[index][7]),
+            };
+            const orders = {};
+            function sortOrder(key) {
+                if (!orders[key]) orders[key] = sorts[key]();
+                return orders[key];
+            }
+
+            const state = {level: 'all', category: -1, sort: 'category', query: '', selected: -1, collapsed: new Set(), directory: 0};
+            const list = document.getElementById('file-list');
+            const canvas = document.getElementById('file-list-canvas');
+            const status = document.getElementById('list-status');
+            const detail = document.getElementById('file-detail');
+            let rows = [], offsets = new Float64Array(1), shown = 0;
+
+            const escapeHTML = text => text.replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+            const percentage = (covered, total) => (total > 0 ? covered / total * 100 : 100);
+
+            // A directory's files are those whose own directory is in its preorder range
+            let directoryStart = 0, directoryEnd = directories.length;
+            function matches(index, level, query) {
+                return (level < 0 || levelOf[index] === level) && (!query || searchText[index].includes(query))
+                    && fileDirectory[index] >= directoryStart && fileDirectory[index] < directoryEnd;
+            }
+
+            // Rows are file indexes; a category header is stored as -(category + 1)
+            function rebuild() {
+                const level = state.level === 'all' ? -1 : levelNames.indexOf(state.level);
+                const query = state.query;
+                directoryStart = state.directory;
+                directoryEnd = directories[state.directory][9];
+                rows = [];
+                shown = 0;
+                if (state.sort === 'category') {
+                    categories.forEach((category, number) => {
+                        if (state.category >= 0 && state.category !== number) return;
+                        const header = rows.length;
+                        rows.push(-(number + 1));
+                        const collapsed = state.collapsed.has(number);
+                        let found = 0;
+                        for (let index = category.start; index < category.end; index++) {
+                            if (!matches(index, level, query)) continue;
+                            found++;
+                            if (!collapsed) rows.push(index);
+                        }
+                        if (found === 0) rows.length = header;
+                        shown += found;
+                    });
+                } else {
+                    for (const index of sortOrder(state.sort)) {
+                        if ((state.category < 0 || categoryOf[index] === state.category) && matches(index, level, query)) {
+                            rows.push(index);
+                        }
+                    }
+                    shown = rows.length;
+                }
+                offsets = new Float64Array(rows.length + 1);
+                for (let row = 0; row < rows.length; row++) {
+                    offsets[row + 1] = offsets[row] + (rows[row] < 0 ? CATEGORY_HEIGHT : FILE_HEIGHT);
+                }
+                canvas.style.height = offsets[rows.length] + 'px';
+                const scope = state.directory ? ` in ${directoryPath(state.directory)}/` : '';
+                status.textContent = `Showing ${shown.toLocaleString()} of ${files.length.toLocaleString()} files${scope}`;
+                render();
+            }
+
+            function rowAt(top) {
+                let low = 0, high = rows.length;
+                while (low < high) {
+                    const middle = (low + high) >> 1;
+                    if (offsets[middle + 1] <= top) low = middle + 1; else high = middle;
+                }
+                return low;
+            }
+
+            function categoryRow(number, top) {
+                const category = categories[number];
+                const marker = state.collapsed.has(number) ? '▸' : '▾';
+                return `<div class="category-row" data-category="${number}" style="top: ${top}px">
+                    <div class="category-name">${marker} ${escapeHTML(category.name)}</div>
+                    <div class="category-stats">${category.end - category.start} files | ${category.overall.toFixed(1)}% coverage</div>
+                </div>`;
+            }
+
+            function fileRow(index, top) {
+                const file = files[index], level = levelNames[levelOf[index]];
+                const selected = index === state.selected ? ' selected' : '';
+                const uncovered = file[7] ? `<span>⚠️ ${file[7]} uncovered range(s)</span>` : '';
+                return `<div class="file-row ${level}${selected}" data-index="${index}" style="top: ${top}px">
+                    <div class="file-name">${escapeHTML(file[0])} <span class="coverage-badge ${level}">${file[6].toFixed(1)}%</span></div>
+                    <div class="file-path">${escapeHTML(file[1])}</div>
+                    <div class="row-metrics">
+                        <span>Lines ${file[2]}/${file[3]} (${percentage(file[2], file[3]).toFixed(1)}%)</span>
+                        <span>Branches ${file[4]}/${file[5]} (${percentage(file[4], file[5]).toFixed(1)}%)</span>
+                        ${uncovered}
+                    </div>
+                </div>`;
+            }
+
+            function render() {
+                const first = Math.max(0, rowAt(list.scrollTop) - OVERSCAN);
+                const last = Math.min(rows.length, rowAt(list.scrollTop + list.clientHeight) + OVERSCAN + 1);
+                const parts = [];
+                for (let row = first; row < last; row++) {
+                    const value = rows[row];
+                    parts.push(value < 0 ? categoryRow(-value - 1, offsets[row]) : fileRow(value, offsets[row]));
+                }
+                canvas.innerHTML = parts.join('');
+            }
+
+            // Directory tree: the top level is rendered up front, deeper levels when first opened
+            const tree = document.getElementById('directory-tree');
+            const directoryClear = document.getElementById('directory-clear');
+            const childrenOf = directories.map(() => []);
+            directories.forEach((directory, index) => { if (directory[1] >= 0) childrenOf[directory[1]].push(index); });
+            const share = (covered, total) => (total > 0 ? covered / total * 100 : 0);
+
+            function directoryPath(index) {
+                const names = [];
+                for (let current = index; current > 0; current = directories[current][1]) names.push(directories[current][0]);
+                return names.reverse().join('/');
+            }
+
+            function directoryNode(index) {
+                const directory = directories[index], level = levelNames[directory[8]];
+                const leaf = childrenOf[index].length === 0;
+                return `<details data-directory="${index}"${leaf ? ' class="leaf"' : ''}><summary>
+                    <span class="directory-name">${escapeHTML(directory[0])}/</span>
+                    <span class="directory-stats">${directory[2].toLocaleString()} files · Lines ${share(directory[3], directory[4]).toFixed(1)}% · Branches ${share(directory[5], directory[6]).toFixed(1)}%</span>
+                    <span class="coverage-badge ${level}">${directory[7].toFixed(1)}%</span>
+                    <button class="directory-files" data-directory-files="${index}">Show files</button>
+                </summary></details>`;
+            }
+
+            function openDirectory(element) {
+                if (element.dataset.loaded) return;
+                element.dataset.loaded = 'true';
+                element.insertAdjacentHTML('beforeend', childrenOf[Number(element.dataset.directory)].map(directoryNode).join(''));
+            }
+
+            tree.innerHTML = directoryNode(0);
+            const rootDirectory = tree.querySelector('details');
+            openDirectory(rootDirectory);
+            rootDirectory.open = true;
+            // toggle doesn't bubble, so listen while it is captured
+            tree.addEventListener('toggle', event => { if (event.target.open) openDirectory(event.target); }, true);
+            tree.addEventListener('click', event => {
+                const button = event.target.closest('[data-directory-files]');
+                if (!button) return;
+                event.preventDefault();
+                state.directory = Number(button.dataset.directoryFiles);
+                directoryClear.textContent = `✕ ${directoryPath(state.directory) || directories[0][0]}/`;
+                directoryClear.hidden = state.directory === 0;
+                list.scrollTop = 0;
+                rebuild();
+            });
+            directoryClear.addEventListener('click', () => {
+                state.directory = 0;
+                directoryClear.hidden = true;
+                list.scrollTop = 0;
+                rebuild();
+            });
+
+            function metric(label, covered, total, level) {
+                const value = percentage(covered, total);
+                return `<div>
+                    <div class="coverage-metric">${label}: ${covered}/${total} (${value.toFixed(1)}%)</div>
+                    <div class="coverage-bar"><div class="coverage-bar-fill ${level}" style="width: ${value}%"></div></div>
+                </div>`;
+            }
+
+            function showDetail(index) {
+                state.selected = index;
+                const file = files[index], level = levelNames[levelOf[index]];
+                let regions = '';
+                if (file[7]) {
+                    const lines = [];
+                    for (let position = 0; position < file[8].length; position += 5) {
+                        const [line, column, endLine, endColumn, count] = file[8].slice(position, position + 5);
+                        lines.push(`${line === endLine ? 'Line' : 'Lines'} ${line}:${column}-${endLine}:${endColumn} ` +
+                            `(${count} region${count === 1 ? '' : 's'})`);
+                    }
+                    const more = file[7] > lines.length ? `<br>... and ${file[7] - lines.length} more` : '';
+                    regions = `<div class="uncovered-regions">
+                        <div class="uncovered-title">⚠️ ${file[7]} Uncovered Range(s) over ${file[10]} line(s):</div>
+                        <div class="uncovered-list">${lines.join('<br>')}${more}</div>
+                    </div>`;
+                }
+                const source = file[9] === null ? '' : `<button class="filter-btn" data-source="${file[9]}" style="margin-top: 10px">📄 Show annotated source</button>
+                    <div class="source-view"></div>`;
+                detail.className = `file-item ${level}`;
+                detail.innerHTML = `<div class="file-name">${escapeHTML(file[0])} <span class="coverage-badge ${level}">${file[6].toFixed(1)}%</span></div>
+                    <div class="file-path">${escapeHTML(file[1])} · ${escapeHTML(categories[categoryOf[index]].name)}</div>
+                    <div class="coverage-details">${metric('Line Coverage', file[2], file[3], level)}${metric('Branch Coverage', file[4], file[5], level)}</div>
+                    ${regions}${source}`;
+                detail.hidden = false;
+                render();
+            }
+
+            // Annotated source pages are scripts calling coverageSource(id, page), loaded on
+            // first use (fetch() is blocked for file:// pages); the last few stay in memory
+            const MAX_SOURCE_PAGES = 20;
+            const sourcePages = new Map(), sourceWaiting = new Map();
+            window.coverageSource = (id, page) => {
+                sourcePages.set(id, page);
+                if (sourcePages.size > MAX_SOURCE_PAGES) sourcePages.delete(sourcePages.keys().next().value);
+                (sourceWaiting.get(id) || []).forEach(callback => callback(page));
+                sourceWaiting.delete(id);
+            };
+            function loadSource(id, callback) {
+                if (sourcePages.has(id)) return callback(sourcePages.get(id));
+                if (sourceWaiting.has(id)) return sourceWaiting.get(id).push(callback);
+                sourceWaiting.set(id, [callback]);
+                const script = document.createElement('script');
+                script.src = `${encodeURI(data.sources)}/${id}.js`;
+                script.onload = () => script.remove();
+                script.onerror = () => {
+                    script.remove();
+                    sourceWaiting.delete(id);
+                    callback(null);
+                };
+                document.head.appendChild(script);
+            }
+
+            function sourceTable(page) {
+                const regionStarts = new Map();
+                page.uncovered.forEach(([line, column]) => { if (!regionStarts.has(line)) regionStarts.set(line, column); });
+                const rows = page.lines.map((text, position) => {
+                    const number = position + 1, hits = page.hits[position];
+                    const kind = hits === null ? '' : hits === -1 ? 'gap' : hits > 0 ? 'hit' : 'miss';
+                    const column = regionStarts.get(number);
+                    const code = column === undefined ? escapeHTML(text)
+                        : escapeHTML(text.slice(0, column - 1)) + `<span class="region-start">${escapeHTML(text.slice(column - 1))}</span>`;
+                    return `<tr class="${kind}"><td class="line-number">${number}</td>` +
+                        `<td class="line-hits">${hits === null || hits === -1 ? '' : hits.toLocaleString()}</td>` +
+                        `<td class="line-code">${code}</td></tr>`;
+                });
+                return `<table class="source-table">${rows.join('')}</table>`;
+            }
+
+            detail.addEventListener('click', event => {
+                const button = event.target.closest('[data-source]');
+                if (!button) return;
+                const index = state.selected, view = detail.querySelector('.source-view');
+                button.disabled = true;
+                loadSource(Number(button.dataset.source), page => {
+                    if (state.selected !== index) return;
+                    button.remove();
+                    if (!page) {
+                        view.textContent = 'The annotated source could not be loaded.';
+                        return;
+                    }
+                    view.innerHTML = sourceTable(page);
+                    const gap = view.querySelector('tr.miss, tr.gap');
+                    if (gap) view.scrollTop = gap.offsetTop - view.clientHeight / 3;
+                });
+            });
+
+            const categorySelect = document.getElementById('category');
+            categories.forEach((category, number) => categorySelect.add(new Option(`${category.name} (${category.end - category.start})`, number)));
+            categorySelect.addEventListener('change', () => { state.category = Number(categorySelect.value); list.scrollTop = 0; rebuild(); });
+            document.getElementById('sort').addEventListener('change', event => { state.sort = event.target.value; list.scrollTop = 0; rebuild(); });
+
+            let pending = 0;
+            document.getElementById('search').addEventListener('input', event => {
+                state.query = event.target.value.trim().toLowerCase();
+                cancelAnimationFrame(pending);
+                pending = requestAnimationFrame(() => { list.scrollTop = 0; rebuild(); });
             });
-            event.target.classList.add('active');
-            
-            document.querySelectorAll('.file-item').forEach(item => {
-                if (level === 'all' || item.dataset.level === level) {
-                    item.style.display = 'block';
+
+            document.querySelectorAll('.filter-btn[data-level]').forEach(button => button.addEventListener('click', () => {
+                document.querySelectorAll('.filter-btn[data-level]').forEach(other => other.classList.remove('active'));
+                button.classList.add('active');
+                state.level = button.dataset.level;
+                list.scrollTop = 0;
+                rebuild();
+            }));
+
+            canvas.addEventListener('click', event => {
+                const row = event.target.closest('.category-row, .file-row');
+                if (!row) return;
+                if (row.dataset.category !== undefined) {
+                    const number = Number(row.dataset.category);
+                    if (!state.collapsed.delete(number)) state.collapsed.add(number);
+                    rebuild();
                 } else {
-                    item.style.display = 'none';
+                    showDetail(Number(row.dataset.index));
                 }
             });
-            
-            document.querySelectorAll('.category-section').forEach(section => {
-                const hasVisibleItems = level === 'all' || 
-                    Array.from(section.querySelectorAll('.file-item')).some(item => 
-                        item.style.display !== 'none' && item.dataset.level === level
-                    );
-                
-                section.style.display = hasVisibleItems ? 'block' : 'none';
+
+            let scrolling = 0;
+            list.addEventListener('scroll', () => {
+                if (!scrolling) scrolling = requestAnimationFrame(() => { scrolling = 0; render(); });
             });
-        }
+            window.addEventListener('resize', render);
+            rebuild();
+        })();
     </script>
 </body>
 </html>
 """
-    
-    return html
-
-def find_coverage_file(package_path: Path) -> Optional[Path]:
-    """Find the coverage JSON file for a package."""
-    build_dirs = [
-        package_path / '.build' / 'arm64-apple-macosx' / 'debug' / 'codecov',
-        package_path / '.build' / 'x86_64-apple-macosx' / 'debug' / 'codecov',
-        package_path / '.build' / 'debug' / 'codecov',
-    ]
-    
-    package_name = package_path.name
-    
-    for build_dir in build_dirs:
-        if build_dir.exists():
-            coverage_file = build_dir / f'{package_name}.json'
-            if coverage_file.exists():
-                return coverage_file
-            json_files = list(build_dir.glob('*.json'))
-            if json_files:
-                return json_files[0]
-    
-    return None
+
+def generate_html_report(coverage_stats, package_name: str, filter_pattern: Optional[str]) -> str:
+    """Generate an interactive HTML report."""
+    return ''.join(iter_html_report(coverage_stats, package_name, filter_pattern))
+
+def write_html_report(coverage_stats, package_name: str, filter_pattern: Optional[str], output_path: Path,
+                      source_dir: Optional[str] = None, source_pages: Optional[Dict[str, int]] = None):
+    """Stream the HTML report to output_path chunk by chunk."""
+    with open(output_path, 'w') as f:
+        f.writelines(iter_html_report(coverage_stats, package_name, filter_pattern, source_dir, source_pages))
 
 def main():
     parser = argparse.ArgumentParser(
@@ -613,6 +1036,22 @@ def main():
     parser.add_argument('package_path', help='Path to the Swift package directory')
     parser.add_argument('--filter', help='Only analyze files matching this pattern')
     parser.add_argument('--output', help='Output HTML file path (default: coverage_report.html in package dir)')
+    parser.add_argument('--stream', action='store_true', help='Stream the export instead of loading it into memory')
+    parser.add_argument('--merge', action='store_true',
+                        help='Merge every export found for the package (architectures, shards) first')
+    parser.add_argument('--pack', help='Read the analysis from a coverage pack (coverage_pack.py) instead of the export')
+    parser.add_argument('--summary-only', action='store_true',
+                        help="Use llvm-cov's per-file summaries only; skip segment analysis")
+    parser.add_argument('--annotate', action='store_true',
+                        help='Also write annotated source pages for files with gaps (<report>_files/)')
+    parser.add_argument('--engine', choices=ENGINE_CHOICES, default='python',
+                        help='Segment analysis engine (default: python)')
+    parser.add_argument('--cache-dir', help='Analysis cache directory (default: <package>/.build/coverage-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    parser.add_argument('--profile', action='store_true', help='Print per-phase timing and memory and write a JSON trace')
+    parser.add_argument('--profile-trace', help='Trace path (default: coverage_profile.json in package dir)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_FILES,
+                        help=f'Slowest files to list in the profile (default: {DEFAULT_TOP_FILES})')
     
     args = parser.parse_args()
     
@@ -623,41 +1062,41 @@ def main():
     
     package_name = package_path.name
     
-    print(f"Looking for coverage data for {package_name}...")
-    coverage_file = find_coverage_file(package_path)
-    
-    if not coverage_file:
-        print(f"\nError: Coverage data not found for {package_name}")
-        print(f"Expected location: {package_path}/.build/.../codecov/{package_name}.json")
-        print("\nPlease run tests with coverage enabled first:")
-        print(f"  cd {package_path}")
-        print(f"  swift test --enable-code-coverage")
-        sys.exit(1)
-    
-    print(f"Found coverage data: {coverage_file}")
-    print("Loading coverage data...")
-    coverage_data = load_coverage_data(str(coverage_file))
-    
-    print(f"Analyzing coverage for {package_name}...")
-    if args.filter:
-        print(f"Filtering files containing: '{args.filter}'")
-    
-    coverage_stats = analyze_file_coverage(coverage_data, package_name, args.filter)
+    profiler = CoverageProfiler(package_name, args.profile_top) if args.profile else None
+    coverage_file = None
+    if args.pack:
+        coverage_stats = load_pack_stats(Path(args.pack), package_name, args.filter, profiler)
+    else:
+        if args.merge:
+            coverage_file = require_merged_coverage_file(package_path, profiler)
+        else:
+            coverage_file = require_coverage_file(package_path, profiler)
+        cache = open_coverage_cache(package_path, args.cache_dir, not args.no_cache)
+        coverage_stats = collect_coverage_stats(coverage_file, package_name, args.filter, args.stream, cache,
+                                                args.engine, args.summary_only, profiler)
     
     print(f"Found {len(coverage_stats)} files")
     print("Generating HTML report...")
-    html_report = generate_html_report(coverage_stats, package_name, args.filter)
     
     if args.output:
         output_path = Path(args.output)
     else:
         output_path = package_path / 'coverage_report.html'
     
-    with open(output_path, 'w') as f:
-        f.write(html_report)
+    source_dir = source_pages = None
+    if args.annotate:
+        source_dir, source_pages = annotate_report(coverage_stats, package_path, output_path, coverage_file,
+                                                   Path(args.pack) if args.pack else None,
+                                                   merge=args.merge, profiler=profiler)
+
+    with profile_phase(profiler, 'render_html'):
+        write_html_report(coverage_stats, package_name, args.filter, output_path, source_dir, source_pages)
     
     print(f"\n✅ Interactive HTML report generated: {output_path}")
     print(f"   Open this file in your browser to view the interactive coverage report.")
 
+    if profiler is not None:
+        save_profile(profiler, Path(args.profile_trace) if args.profile_trace else package_path / DEFAULT_TRACE_NAME)
+
 if __name__ == '__main__':
     main()
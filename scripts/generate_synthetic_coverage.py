@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Synthetic llvm-cov Export Generator
+
+Writes a realistic `llvm-cov export` JSON document for benchmarking the coverage
+scripts at sizes no real package reaches yet. Source files follow the
+`Sources/<Package>/<Category>/<Feature>/` layout, with a few test and dependency
+entries mixed in that the analysis has to skip. Each file is a run of functions
+whose segments, `functions[]` regions and `summary` blocks agree with each other.
+
+Segment counts per file are heavy-tailed, like real code: most files are small
+and a few are very large. The export is written incrementally, so generating
+100M segments needs memory for one file at a time only. The same seed always
+produces the same export.
+
+Usage:
+    python3 generate_synthetic_coverage.py <output_path> [options]
+
+Options:
+    --package <name>      Package name used in the paths (default: Troop900Application)
+    --files <n>           Number of file entries (default: 100)
+    --segments <n>        Total number of segments (default: 200 per file)
+    --seed <n>            Random seed (default: 0)
+    --help               Show this help message
+
+Examples:
+    # 1k files, 1M segments, where the scripts expect the package's export
+    python3 generate_synthetic_coverage.py \\
+        /tmp/bench/Troop900Application/.build/debug/codecov/Troop900Application.json \\
+        --files 1000 --segments 1000000
+"""
+
+import json
+import random
+import shutil
+import sys
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from coverage_core import analyze_segments
+
+EXPORT_ROOT = '/Users/ci/Troop900/ios/Packages'
+
+# Top-level source folders per package; anything else gets DEFAULT_CATEGORIES
+PACKAGE_CATEGORIES = {
+    'Troop900Application': ['UseCases', 'UseCases', 'UseCases', 'BoundaryObjects'],
+    'Troop900Domain': ['Entities', 'Errors', 'Repositories', 'Services', 'ValueObjects'],
+    'Troop900Data': ['Repositories', 'Stubs', 'Mappers'],
+    'Troop900DesignSystem': ['Components', 'Tokens', 'Resources'],
+}
+DEFAULT_CATEGORIES = ['Models', 'Services', 'Views']
+
+FEATURES = [
+    'Admin', 'Attendance', 'Auth', 'Automation', 'Family', 'Messaging',
+    'Onboarding', 'Privacy', 'Profile', 'Schedule', 'Shifts', 'Settings',
+]
+VERBS = ['Get', 'Update', 'Create', 'Delete', 'Observe', 'Mark', 'Generate', 'Sync']
+METHODS = ['execute', 'validate', 'map', 'load', 'save', 'handle', 'build', 'apply']
+
+# Execution counts of covered code; zero counts are decided separately
+HIT_COUNTS = [1, 1, 1, 2, 3, 5, 8, 13, 42, 120, 1000, 65536]
+
+# No single file gets more than this many times the average number of segments
+MAX_FILE_SHARE = 50
+
+def _segment_budget(rng: random.Random, files: int, segments: int) -> List[int]:
+    """Split the segment total over the files with a heavy-tailed distribution."""
+    weights = [rng.paretovariate(1.5) for _ in range(files)]
+    scale = segments / sum(weights)
+    cap = max(1, MAX_FILE_SHARE * segments // files)
+    counts = [min(cap, max(1, int(weight * scale))) for weight in weights]
+
+    # Rounding and capping leave the total off; settle the difference file by file
+    difference = segments - sum(counts)
+    index = 0
+    while difference and index < 2 * files:
+        i = index % files
+        step = min(cap - counts[i], difference) if difference > 0 else max(1 - counts[i], difference)
+        counts[i] += step
+        difference -= step
+        index += 1
+    return counts
+
+def _file_paths(rng: random.Random, package: str, files: int) -> List[str]:
+    """Build file paths: mostly package sources, plus test and dependency entries."""
+    package_root = f"{EXPORT_ROOT}/{package}"
+    categories = PACKAGE_CATEGORIES.get(package, DEFAULT_CATEGORIES)
+    test_files = files // 20
+    dependency_files = files // 50
+    source_files = files - test_files - dependency_files
+
+    paths = []
+    for i in range(source_files):
+        feature = rng.choice(FEATURES)
+        name = f"{rng.choice(VERBS)}{feature}{i}"
+        if rng.random() < 0.05:
+            paths.append(f"{package_root}/Sources/{package}/{name}.swift")
+            continue
+        category = rng.choice(categories)
+        if category == 'UseCases':
+            name += 'UseCase'
+        paths.append(f"{package_root}/Sources/{package}/{category}/{feature}/{name}.swift")
+    for i in range(test_files):
+        paths.append(f"{package_root}/Tests/{package}Tests/{rng.choice(FEATURES)}{i}Tests.swift")
+    for i in range(dependency_files):
+        paths.append(f"{package_root}/.build/checkouts/swift-collections/Sources/Collections/Deque{i}.swift")
+    rng.shuffle(paths)
+    return paths
+
+def _mangled_name(package: str, type_name: str, method: str) -> str:
+    """Swift mangled name of an instance method `Package.Type.method()`."""
+    return f"$s{len(package)}{package}{len(type_name)}{type_name}C{len(method)}{method}yyF"
+
+def _file_coverage(rng: random.Random, package: str, filename: str, count: int) -> Tuple[List, List[Dict]]:
+    """
+    Generate one file's segments and its functions[] entries.
+    Segments are [line, col, count, has_count, is_region_entry, is_gap_region].
+    """
+    segments = []
+    functions = []
+    type_name = Path(filename).stem
+    line = rng.randint(1, 12)
+    # Some files are thoroughly tested and some barely at all
+    tested = rng.betavariate(3, 1)
+
+    while len(segments) < count:
+        executed = rng.random() < tested
+        function_count = rng.choice(HIT_COUNTS) if executed else 0
+        start_line = line
+        regions = []
+        segments.append([line, 5, function_count, True, True, False])
+        line += 1
+        block_end = None
+
+        for _ in range(rng.randint(0, 4)):
+            if len(segments) + 3 > count:
+                break
+            block_count = rng.randint(1, function_count) if executed and rng.random() < tested else 0
+            column = rng.randint(9, 40)
+            # Keep llvm-cov's position order after the previous block's end
+            if line == block_end:
+                line += 1
+            block_start = line
+            segments.append([line, column, block_count, True, True, False])
+            line += rng.randint(1, 6)
+            segments.append([line, 10, function_count, True, False, False])
+            regions.append([block_start, column, line, 10, block_count, 0, 0, 0])
+            block_end = line
+            line += rng.randint(0, 3)
+
+        if line == block_end:
+            line += 1
+        segments.append([line, 2, 0, False, False, False])
+        regions.insert(0, [start_line, 5, line, 2, function_count, 0, 0, 0])
+        functions.append({
+            'branches': [],
+            'count': function_count,
+            'filenames': [filename],
+            'name': _mangled_name(package, type_name, f"{rng.choice(METHODS)}{len(functions)}"),
+            'regions': regions,
+        })
+        line += rng.randint(2, 6)
+
+    return segments[:count], functions
+
+def _summary_block(count: int, covered: int) -> Dict:
+    percent = (covered / count * 100) if count > 0 else 0
+    return {'count': count, 'covered': covered, 'percent': percent}
+
+def _file_summary(segments: List, functions: List[Dict]) -> Dict:
+    """An llvm-cov style summary block, consistent with the segments."""
+    covered_lines, total_lines, covered_regions, total_regions = analyze_segments(segments)
+    covered_functions = sum(1 for function in functions if function['count'] > 0)
+    regions = _summary_block(total_regions, covered_regions)
+    regions['notcovered'] = total_regions - covered_regions
+    branches = _summary_block(0, 0)
+    branches['notcovered'] = 0
+    return {
+        'branches': branches,
+        'functions': _summary_block(len(functions), covered_functions),
+        'instantiations': _summary_block(len(functions), covered_functions),
+        'lines': _summary_block(total_lines, covered_lines),
+        'regions': regions,
+    }
+
+def _add_totals(totals: Dict, summary: Dict):
+    for kind, block in summary.items():
+        total = totals.setdefault(kind, {'count': 0, 'covered': 0})
+        total['count'] += block['count']
+        total['covered'] += block['covered']
+
+def write_synthetic_export(output_path: Path, package: str = 'Troop900Application', files: int = 100,
+                           segments: int = None, seed: int = 0) -> Dict:
+    """
+    Write a synthetic export and return what it contains:
+    files, source_files, segments, functions and bytes.
+    """
+    rng = random.Random(seed)
+    files = max(1, files)
+    segments = max(files, segments if segments is not None else files * 200)
+    paths = _file_paths(rng, package, files)
+    budget = _segment_budget(rng, files, segments)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    totals = {}
+    function_count = 0
+
+    # functions[] follows files[] in the export, so it is spooled to a temp file
+    with open(output_path, 'w', encoding='utf-8') as out, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+        out.write('{"data":[{"files":[')
+        for i, (filename, count) in enumerate(zip(paths, budget)):
+            file_segments, functions = _file_coverage(rng, package, filename, count)
+            summary = _file_summary(file_segments, functions)
+            _add_totals(totals, summary)
+            entry = {
+                'branches': [],
+                'expansions': [],
+                'filename': filename,
+                'segments': file_segments,
+                'summary': summary,
+            }
+            if i:
+                out.write(',')
+            out.write(json.dumps(entry, separators=(',', ':')))
+            for function in functions:
+                if function_count:
+                    spool.write(',')
+                spool.write(json.dumps(function, separators=(',', ':')))
+                function_count += 1
+
+        out.write('],"functions":[')
+        spool.seek(0)
+        shutil.copyfileobj(spool, out)
+
+        for kind, total in totals.items():
+            total['percent'] = (total['covered'] / total['count'] * 100) if total['count'] > 0 else 0
+            if kind in ('branches', 'regions'):
+                total['notcovered'] = total['count'] - total['covered']
+        out.write('],"totals":')
+        out.write(json.dumps({kind: totals[kind] for kind in sorted(totals)}, separators=(',', ':')))
+        out.write('}],"type":"llvm.coverage.json.export","version":"2.0.1"}')
+
+    return {
+        'files': files,
+        'source_files': sum(1 for path in paths if f'/Sources/{package}/' in path),
+        'segments': sum(budget),
+        'functions': function_count,
+        'bytes': output_path.stat().st_size,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic llvm-cov export',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('output_path', help='Path of the export JSON to write')
+    parser.add_argument('--package', default='Troop900Application',
+                        help='Package name used in the paths (default: Troop900Application)')
+    parser.add_argument('--files', type=int, default=100, help='Number of file entries (default: 100)')
+    parser.add_argument('--segments', type=int, help='Total number of segments (default: 200 per file)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+    args = parser.parse_args()
+
+    if args.files < 1 or (args.segments is not None and args.segments < 1):
+        print("Error: --files and --segments must be positive")
+        sys.exit(1)
+
+    info = write_synthetic_export(Path(args.output_path), args.package, args.files, args.segments, args.seed)
+    print(f"✓ Wrote {args.output_path}")
+    print(f"  {info['files']:,} files ({info['source_files']:,} in Sources/{args.package}), "
+          f"{info['segments']:,} segments, {info['functions']:,} functions, "
+          f"{info['bytes'] / (1024 * 1024):.1f} MB")
+
+if __name__ == '__main__':
+    main()
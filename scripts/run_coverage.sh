@@ -51,6 +51,18 @@ ${GREEN}OPTIONS:${NC}
     --text-only                  Generate only text reports
     --no-test                    Skip running tests (use existing coverage data)
     --open                       Open HTML reports in browser after generation
+    --test-jobs N                Run tests for N packages at once (default: 1)
+    --serial                     Test and report one package at a time, showing
+                                 live test output (default: pipelined, where each
+                                 package is analyzed as soon as its tests finish)
+    --profile                    Print per-phase timing and memory for each package
+                                 and write coverage_profile.json next to its reports
+    --thresholds FILE            Check each package against a threshold file (e.g.
+                                 ios/Packages/coverage-thresholds.json) and exit
+                                 non-zero, listing the violations, if any is missed
+    --dashboard                  Also write one dashboard over all processed packages
+                                 (coverage_dashboard.html and COVERAGE_DASHBOARD.md
+                                 in ios/Packages), reusing each package's cached analysis
 
 ${GREEN}AVAILABLE PACKAGES:${NC}
 $(for pkg in "${PACKAGES[@]}"; do echo "    - $pkg"; done)
@@ -80,6 +92,12 @@ ${GREEN}EXAMPLES:${NC}
     # Use existing coverage data without re-running tests
     $0 --all --no-test
 
+    # See where the time goes in each package's analysis
+    $0 --all --no-test --profile
+
+    # Fail when a package, category or file is below its threshold
+    $0 --all --no-test --thresholds ios/Packages/coverage-thresholds.json
+
 EOF
 }
 
@@ -128,34 +146,60 @@ run_tests() {
     fi
 }
 
+# Report formats for the --html-only/--text-only flags; the JSON summary read
+# by show_summary is always written
+report_formats() {
+    local html_only=$1
+    local text_only=$2
+    
+    if [ "$html_only" = "true" ]; then
+        echo "html,summary"
+    elif [ "$text_only" = "true" ]; then
+        echo "markdown,summary"
+    else
+        echo "markdown,html,summary"
+    fi
+}
+
 # Generate coverage reports
 generate_reports() {
     local pkg=$1
     local html_only=$2
     local text_only=$3
+    local profile_flag=$4
+    local thresholds_file=$5
     
     echo -e "${BLUE}Generating coverage reports for ${pkg}...${NC}"
     
+    local formats=$(report_formats "$html_only" "$text_only")
+    local report_args=("$PACKAGES_DIR/$pkg" --format "$formats")
     local success=0
+    local status=0
+    local output
     
-    # Generate text report
-    if [ "$html_only" != "true" ]; then
-        if python3 "$PROJECT_ROOT/scripts/analyze_swift_coverage.py" "$PACKAGES_DIR/$pkg" 2>/dev/null; then
-            echo -e "${GREEN}✓ Text report generated${NC}"
-        else
-            echo -e "${YELLOW}⚠ Text report generation failed or no coverage data${NC}"
-            success=1
-        fi
+    if [ "$profile_flag" = "true" ]; then
+        report_args+=(--profile)
+    fi
+    if [ -n "$thresholds_file" ]; then
+        report_args+=(--thresholds "$thresholds_file")
     fi
     
-    # Generate HTML report
-    if [ "$text_only" != "true" ]; then
-        if python3 "$PROJECT_ROOT/scripts/generate_html_coverage.py" "$PACKAGES_DIR/$pkg" 2>/dev/null; then
-            echo -e "${GREEN}✓ HTML report generated${NC}"
-        else
-            echo -e "${YELLOW}⚠ HTML report generation failed or no coverage data${NC}"
-            success=1
+    # Parse the coverage export once and render every requested format
+    output=$(python3 "$PROJECT_ROOT/scripts/coverage_report.py" "${report_args[@]}" 2>&1) || status=$?
+    if [ $status -eq 0 ]; then
+        echo -e "${GREEN}✓ Reports generated (${formats})${NC}"
+        if [ "$profile_flag" = "true" ]; then
+            echo ""
+            echo "$output" | sed -n '/^PROFILE - /,$p'
         fi
+    elif [ $status -eq 2 ]; then
+        # Reports were written; the analysis is below its thresholds
+        echo -e "${GREEN}✓ Reports generated (${formats})${NC}"
+        echo "$output" | sed -n '/coverage threshold violation/,$p'
+        success=2
+    else
+        echo -e "${YELLOW}⚠ Report generation failed or no coverage data${NC}"
+        success=1
     fi
     
     return $success
@@ -164,31 +208,24 @@ generate_reports() {
 # Extract and display coverage summary
 show_summary() {
     local pkg=$1
-    local report_file="$PACKAGES_DIR/$pkg/COVERAGE_REPORT.md"
+    local summary_file="$PACKAGES_DIR/$pkg/coverage_summary.json"
     
-    if [ -f "$report_file" ]; then
+    if [ -f "$summary_file" ]; then
         echo ""
         echo -e "${BLUE}Coverage Summary for ${pkg}:${NC}"
         
-        # Extract coverage metrics
-        local overall=$(grep "Combined Coverage Score:" "$report_file" | head -1 | grep -oE '[0-9]+\.[0-9]+%' | head -1 || echo "N/A")
-        local line=$(grep "Overall Line Coverage:" "$report_file" | head -1 | grep -oE '[0-9]+\.[0-9]+%' | head -1 || echo "N/A")
-        local branch=$(grep "Overall Branch Coverage:" "$report_file" | head -1 | grep -oE '[0-9]+\.[0-9]+%' | head -1 || echo "N/A")
-        
-        # Determine status emoji
-        local overall_num=$(echo "$overall" | grep -oE '[0-9]+\.[0-9]+' | head -1 || echo "0")
-        local status_emoji="❓"
-        
-        if [ ! -z "$overall_num" ]; then
-            if (( $(echo "$overall_num >= 95" | bc -l) )); then
-                status_emoji="🎯"
-            elif (( $(echo "$overall_num >= 85" | bc -l) )); then
-                status_emoji="✅"
-            elif (( $(echo "$overall_num >= 70" | bc -l) )); then
-                status_emoji="⚠️"
-            else
-                status_emoji="🔴"
-            fi
+        # Read the metrics from the JSON summary written with the reports
+        local status_emoji overall line branch
+        if ! read -r status_emoji overall line branch < <(python3 -c '
+import json, sys
+overall = json.load(open(sys.argv[1]))["overall"]
+print(overall["status"]["marker"], "%.1f%%" % overall["overall_percentage"],
+      "%.1f%%" % overall["line_coverage"]["percentage"], "%.1f%%" % overall["branch_coverage"]["percentage"])
+' "$summary_file" 2>/dev/null); then
+            status_emoji="❓"
+            overall="N/A"
+            line="N/A"
+            branch="N/A"
         fi
         
         echo -e "  Overall:  ${status_emoji} ${GREEN}${overall}${NC}"
@@ -217,6 +254,14 @@ open_report() {
     fi
 }
 
+# Write the combined dashboard; each package's analysis comes from its cache
+generate_dashboard() {
+    echo ""
+    echo -e "${BLUE}Writing the combined dashboard...${NC}"
+    python3 "$PROJECT_ROOT/scripts/coverage_dashboard.py" "$@" --packages-dir "$PACKAGES_DIR" \
+        --format html,markdown
+}
+
 # Process a single package
 process_package() {
     local pkg=$1
@@ -224,6 +269,8 @@ process_package() {
     local html_only=$3
     local text_only=$4
     local open_report_flag=$5
+    local profile_flag=$6
+    local thresholds_file=$7
     
     echo ""
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
@@ -245,7 +292,8 @@ process_package() {
     fi
     
     # Generate reports
-    generate_reports "$pkg" "$html_only" "$text_only"
+    local report_status=0
+    generate_reports "$pkg" "$html_only" "$text_only" "$profile_flag" "$thresholds_file" || report_status=$?
     
     # Show summary
     show_summary "$pkg"
@@ -255,6 +303,11 @@ process_package() {
         open_report "$pkg"
     fi
     
+    if [ $report_status -eq 2 ]; then
+        echo -e "${RED}✗ ${pkg} is below its coverage thresholds${NC}"
+        return 1
+    fi
+    
     echo -e "${GREEN}✓ Completed processing ${pkg}${NC}"
     return 0
 }
@@ -267,6 +320,11 @@ main() {
     local text_only="false"
     local open_report_flag="false"
     local all_packages="false"
+    local serial="false"
+    local test_jobs="1"
+    local profile_flag="false"
+    local thresholds_file=""
+    local dashboard_flag="false"
     
     # Parse arguments
     while [[ $# -gt 0 ]]; do
@@ -299,6 +357,30 @@ main() {
                 open_report_flag="true"
                 shift
                 ;;
+            --serial)
+                serial="true"
+                shift
+                ;;
+            --test-jobs)
+                test_jobs="$2"
+                shift 2
+                ;;
+            --profile)
+                profile_flag="true"
+                shift
+                ;;
+            --dashboard)
+                dashboard_flag="true"
+                shift
+                ;;
+            --thresholds)
+                # Tests run from each package directory, so keep the path absolute
+                case "$2" in
+                    /*) thresholds_file="$2" ;;
+                    *) thresholds_file="$PWD/$2" ;;
+                esac
+                shift 2
+                ;;
             *)
                 if package_exists "$1"; then
                     packages_to_process+=("$1")
@@ -330,18 +412,59 @@ main() {
     echo ""
     echo -e "Processing ${#packages_to_process[@]} package(s)..."
     
+    # Pipeline tests and analysis across packages: each package is analyzed in the
+    # process pool as soon as its own tests finish
+    if [ "$serial" = "false" ]; then
+        local orchestrator_args=(
+            "${packages_to_process[@]}"
+            --packages-dir "$PACKAGES_DIR"
+            --format "$(report_formats "$html_only" "$text_only")"
+            --test-jobs "$test_jobs"
+        )
+        if [ "$run_tests_flag" = "true" ]; then
+            orchestrator_args+=(--run-tests)
+        fi
+        if [ "$profile_flag" = "true" ]; then
+            orchestrator_args+=(--profile)
+        fi
+        if [ -n "$thresholds_file" ]; then
+            orchestrator_args+=(--thresholds "$thresholds_file")
+        fi
+        
+        local status=0
+        python3 "$PROJECT_ROOT/scripts/coverage_all.py" "${orchestrator_args[@]}" || status=$?
+        
+        if [ "$dashboard_flag" = "true" ]; then
+            generate_dashboard "${packages_to_process[@]}" || status=1
+        fi
+        
+        if [ "$open_report_flag" = "true" ]; then
+            for pkg in "${packages_to_process[@]}"; do
+                open_report "$pkg"
+            done
+        fi
+        exit $status
+    fi
+    
     local failed_packages=()
     local success_count=0
     
     # Process each package
     for pkg in "${packages_to_process[@]}"; do
-        if process_package "$pkg" "$run_tests_flag" "$html_only" "$text_only" "$open_report_flag"; then
+        if process_package "$pkg" "$run_tests_flag" "$html_only" "$text_only" "$open_report_flag" "$profile_flag" "$thresholds_file"; then
             ((success_count++))
         else
             failed_packages+=("$pkg")
         fi
     done
     
+    if [ "$dashboard_flag" = "true" ]; then
+        # A failed dashboard fails the run, as on the pipelined path
+        if ! generate_dashboard "${packages_to_process[@]}"; then
+            failed_packages+=("dashboard")
+        fi
+    fi
+    
     # Final summary
     echo ""
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
@@ -0,0 +1,33 @@
+"""Tests for the coverage scripts, which import their siblings by bare module name."""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def write_export(path: Path, files: List[Tuple[str, List]], functions: Sequence[Dict] = ()) -> Path:
+    """Write a minimal llvm-cov export holding (filename, segments) entries, in order, and function records."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    export = {
+        'data': [{'files': [{'filename': filename, 'segments': segments} for filename, segments in files],
+                  'functions': list(functions), 'totals': {}}],
+        'type': 'llvm.coverage.json.export',
+        'version': '2.0.1',
+    }
+    path.write_text(json.dumps(export))
+    return path
+
+@pytest.fixture
+def make_package(tmp_path):
+    """Create a package directory whose default export holds the given files under Sources/<Package>/."""
+    def make(name: str, files: List[Tuple[str, List]]) -> Path:
+        package_path = tmp_path / name
+        entries = [(f'{package_path}/Sources/{name}/{relative_path}', segments)
+                   for relative_path, segments in files]
+        write_export(package_path / '.build' / 'debug' / 'codecov' / f'{name}.json', entries)
+        return package_path
+    return make
@@ -0,0 +1,66 @@
+"""Pipelined test and analysis scheduling, driven by a stub test command."""
+
+import sys
+
+from coverage_all import run_package_tests, run_packages
+
+SEGMENTS = [[1, 1, 3, True, True, False], [2, 1, 0, True, True, False], [3, 1, 0, False, False, False]]
+
+# Sleeps for the seconds in DELAY and fails when FAIL exists, in the package directory
+STUB = """
+import pathlib, sys, time
+delay = pathlib.Path('DELAY')
+if delay.exists():
+    time.sleep(float(delay.read_text()))
+print('stub ran in', pathlib.Path.cwd().name)
+sys.exit(1 if pathlib.Path('FAIL').exists() else 0)
+"""
+
+def stub_command(tmp_path) -> str:
+    script = tmp_path / 'stub_test.py'
+    script.write_text(STUB)
+    return f'{sys.executable} {script}'
+
+def test_run_package_tests_reports_status_and_output(tmp_path, make_package):
+    package = make_package('Alpha', [('UseCases/A.swift', SEGMENTS)])
+    result = run_package_tests(package, stub_command(tmp_path))
+    assert result['ok'] and result['returncode'] == 0
+    assert 'stub ran in Alpha' in result['output']
+
+    (package / 'FAIL').touch()
+    result = run_package_tests(package, stub_command(tmp_path))
+    assert not result['ok'] and result['returncode'] == 1
+
+def test_run_package_tests_missing_command(tmp_path, make_package):
+    package = make_package('Alpha', [('UseCases/A.swift', SEGMENTS)])
+    result = run_package_tests(package, str(tmp_path / 'no-such-command'))
+    assert not result['ok'] and result['returncode'] == 127
+
+def test_failed_tests_skip_analysis(tmp_path, make_package):
+    alpha = make_package('Alpha', [('UseCases/A.swift', SEGMENTS)])
+    beta = make_package('Beta', [('Services/B.swift', SEGMENTS)])
+    (beta / 'FAIL').touch()
+    results = run_packages([alpha, beta], [], jobs=2, test_command=stub_command(tmp_path), use_cache=False)
+
+    assert [result['package'] for result in results] == ['Alpha', 'Beta']
+    assert results[0]['ok'] and results[0]['summary']['files'] == 1
+    assert not results[1]['ok'] and results[1]['error'] == 'Tests failed (exit 1)'
+    assert results[1]['summary'] is None
+
+def test_analysis_starts_while_other_tests_run(tmp_path, make_package, capsys):
+    alpha = make_package('Alpha', [('UseCases/A.swift', SEGMENTS)])
+    beta = make_package('Beta', [('Services/B.swift', SEGMENTS)])
+    (beta / 'DELAY').write_text('3')
+    results = run_packages([alpha, beta], [], jobs=2, test_command=stub_command(tmp_path), test_jobs=2,
+                           use_cache=False)
+
+    assert all(result['ok'] for result in results)
+    events = capsys.readouterr().out.splitlines()
+    # Alpha is analyzed before Beta's slower tests finish
+    assert events.index('✓ Alpha') < events.index(next(line for line in events if line.startswith('✓ Beta tests')))
+
+def test_packages_without_tests_are_analyzed_directly(tmp_path, make_package):
+    alpha = make_package('Alpha', [('UseCases/A.swift', SEGMENTS)])
+    results = run_packages([alpha, tmp_path / 'Missing'], [], jobs=1, use_cache=False)
+    assert results[0]['ok']
+    assert not results[1]['ok'] and 'does not exist' in results[1]['error']
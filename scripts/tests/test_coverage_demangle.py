@@ -0,0 +1,74 @@
+"""Built-in Swift demangler: the forms it supports and the ones it must refuse."""
+
+import pytest
+
+from coverage_demangle import demangle_names, demangle_swift_symbol, split_symbol
+
+DEMANGLED = [
+    # Functions and methods, with and without argument labels
+    ('$s19Troop900Application13SignUpUseCaseC7execute7shiftIdySS_tYaKF', 'SignUpUseCase.execute(shiftId:)'),
+    ('$s4main3fooyyF', 'foo()'),
+    ('$s4main3fooyySiF', 'foo(_:)'),
+    ('$s4main3foo_1byS2i_tF', 'foo(_:b:)'),
+    ('$s4main3addyS2i_SitF', 'add(...)'),
+    ('$s4main3FooC4loadyyYaKF', 'Foo.load()'),
+    ('$s4main5OuterV5InnerC3runyyF', 'Outer.Inner.run()'),
+    ('$s4main3FooV5OtherE3baryyF', 'Foo.bar()'),
+    # Initializers and deinitializers
+    ('_$s4main5PointV1x1yACSi_SitcfC', 'Point.init(x:y:)'),
+    ('$s4main5PointVACycfC', 'Point.init()'),
+    ('$s4main3FooCfD', 'Foo.deinit'),
+    ('$s4main3FooCfd', 'Foo.deinit'),
+    # Accessors
+    ('$s4main3FooC3barSivg', 'Foo.bar.getter'),
+    ('$s4main3FooC3barSivs', 'Foo.bar.setter'),
+    ('$s4main3FooC3barSivM', 'Foo.bar.modify'),
+    ('$s4main3FooC3barSivW', 'Foo.bar.didset'),
+    ('$s4main3FooCyS2icig', 'Foo.subscript.getter'),
+    # Closures
+    ('$s4main3FooC3runyyFyycfU_', 'closure #1 in Foo.run()'),
+    ('$s4main3FooC3runyyFyycfU0_', 'closure #2 in Foo.run()'),
+    ('$s4main3FooC3runyyFSbyXEfu_', 'implicit closure #1 in Foo.run()'),
+    ('$s4main3FooC3barSivgyyXEfU_', 'closure #1 in Foo.bar.getter'),
+    # Word substitutions: a = Troop900, b = Application, c = Sign, d = Up, e = Use, f = Case
+    ('$s19Troop900Application13SignUpUseCaseC06createeF0yyF', 'SignUpUseCase.createUseCase()'),
+    ('$s19Troop900Application0B4CaseC3runyyF', 'ApplicationCase.run()'),
+    ('$s19Troop900Application0bB0C3runyyF', 'ApplicationApplication.run()'),
+    # llvm-cov's file prefix on file-private symbols
+    ('Shifts/SignUp.swift:$s4main3FooC3runyyF', 'Foo.run()'),
+    ('SignUp.swift:_$s4main3FooC3runyyF', 'Foo.run()'),
+]
+
+UNSUPPORTED = [
+    '',
+    'main',
+    '_ZN3foo3barEv',  # C++
+    '$s',
+    '$s4main3FooC',  # a type, not a function
+    '$s4main3FooCMa',  # metadata accessor
+    '$s4main003foo',  # Punycode identifier
+    '$s4main3Fo',  # identifier longer than the symbol
+    '$s4main0zA0yyF',  # word substitution past the known words
+    '$s19Troop900Application0bE4CaseC3runyyF',
+]
+
+@pytest.mark.parametrize('symbol, expected', DEMANGLED)
+def test_demangles_supported_forms(symbol, expected):
+    assert demangle_swift_symbol(symbol) == expected
+
+@pytest.mark.parametrize('symbol', UNSUPPORTED)
+def test_returns_none_for_unsupported_symbols(symbol):
+    assert demangle_swift_symbol(symbol) is None
+
+def test_split_symbol_separates_file_prefix():
+    assert split_symbol('Shifts/SignUp.swift:$s4main3fooyyF') == ('Shifts/SignUp.swift:', '$s4main3fooyyF')
+    assert split_symbol('$s4main3fooyyF') == ('', '$s4main3fooyyF')
+    assert split_symbol('main') == ('', 'main')
+
+def test_demangle_names_keeps_names_it_cannot_read():
+    names = ['$s4main3fooyyF', 'main', '$s4main3fooyyF', '$s4main3FooCMa']
+    assert demangle_names(names, use_toolchain=False) == {
+        '$s4main3fooyyF': 'foo()',
+        'main': 'main',
+        '$s4main3FooCMa': '$s4main3FooCMa',
+    }
@@ -0,0 +1,57 @@
+"""Coverage history: filtered runs are kept apart from full runs, and runs resolve by commit prefix."""
+
+import pytest
+
+from coverage_core import collect_coverage_stats
+from coverage_history import CoverageHistory
+
+# Segments are [line, col, count, has_count, is_region_entry, is_gap_region]
+COVERED = [[1, 1, 4, True, True, False], [3, 1, 0, False, False, False]]
+UNCOVERED = [[1, 1, 0, True, True, False], [3, 1, 0, False, False, False]]
+
+def analyze(make_package, helper_segments):
+    package = make_package('Alpha', [('UseCases/CreateShift.swift', COVERED), ('Helper.swift', helper_segments)])
+    return collect_coverage_stats(package / '.build' / 'debug' / 'codecov' / 'Alpha.json', 'Alpha')
+
+@pytest.fixture
+def history(tmp_path, make_package):
+    stats = analyze(make_package, COVERED)
+    dropped = analyze(make_package, UNCOVERED)
+
+    with CoverageHistory(tmp_path / 'history.sqlite') as history:
+        history.ids = {
+            'first': history.record_run('Alpha', stats, 'aaaa1111', '2026-01-01T00:00:00+00:00'),
+            'second': history.record_run('Alpha', dropped, 'bbbb2222', '2026-01-02T00:00:00+00:00'),
+            # Later, but of one category only
+            'filtered': history.record_run('Alpha', {filename: file_stats for filename, file_stats in stats.items()
+                                                     if 'UseCases' in filename},
+                                           'cccc3333', '2026-01-03T00:00:00+00:00', 'UseCases'),
+        }
+        yield history
+
+def test_filtered_runs_are_not_the_latest(history):
+    assert history.recent_run_ids('Alpha', 2) == [history.ids['second'], history.ids['first']]
+    assert history.recent_run_ids('Alpha', 2, 'UseCases') == [history.ids['filtered']]
+
+def test_rollup_and_trend_skip_filtered_runs(history):
+    runs = history.rollup('Alpha')['Alpha']['runs']
+    assert [entry['run'] for entry in runs] == [history.ids['first'], history.ids['second']]
+    assert [entry['files'] for entry in runs] == [2, 2]
+    assert history.rollup('Alpha', filter_pattern='UseCases')['Alpha']['runs'][0]['files'] == 1
+    trend = history.file_trend('Alpha', 'CreateShift')
+    assert [entry['run'] for entry in trend['UseCases/CreateShift.swift']] == [history.ids['first'],
+                                                                               history.ids['second']]
+
+def test_regressions_between_full_runs(history):
+    regressions = history.regressions('Alpha', history.ids['first'], history.ids['second'])
+    assert [regression['path'] for regression in regressions] == ['Helper.swift']
+    assert regressions[0]['change'] < 0
+
+def test_resolve_run_by_id_or_commit_prefix(history):
+    assert history.resolve_run('Alpha', str(history.ids['first'])) == history.ids['first']
+    assert history.resolve_run('Alpha', 'bbbb') == history.ids['second']
+    assert history.resolve_run('Alpha', 'bbbb2222') == history.ids['second']
+    assert history.resolve_run('Alpha', 'cccc') is None
+    assert history.resolve_run('Alpha', 'cccc', 'UseCases') == history.ids['filtered']
+    assert history.resolve_run('Alpha', 'dddd') is None
+    assert history.resolve_run('Beta', 'aaaa') is None
@@ -0,0 +1,92 @@
+"""Merging exports: counts are summed per position and per function, and a merge is reused while its inputs hold."""
+
+import json
+import os
+
+from conftest import write_export
+from coverage_core import find_coverage_files
+from coverage_merge import (merge_exports, merge_inputs_path, merge_is_current, merge_segments,
+                            merged_export_path, require_merged_coverage_file)
+
+# Segments are [line, col, count, has_count, is_region_entry, is_gap_region]
+SHARD_A = [[1, 1, 2, True, True, False], [3, 5, 0, True, True, False], [6, 1, 0, False, False, False]]
+SHARD_B = [[1, 1, 1, True, True, False], [3, 5, 4, True, True, False], [6, 1, 0, False, False, False]]
+
+def test_copies_with_the_same_positions_are_summed():
+    assert merge_segments([SHARD_A, SHARD_B]) == [
+        [1, 1, 3, True, True, False], [3, 5, 4, True, True, False], [6, 1, 0, False, False, False]]
+
+def test_overlapping_regions_sum_the_counts_in_effect():
+    first = [[1, 1, 2, True, True, False], [5, 1, 0, False, False, False]]
+    second = [[3, 1, 4, True, True, False], [7, 1, 0, False, False, False]]
+    assert merge_segments([first, second]) == [
+        [1, 1, 2, True, True, False],
+        # Both regions are open here
+        [3, 1, 6, True, True, False],
+        # The first has ended; the second's count is still in effect
+        [5, 1, 4, True, False, False],
+        [7, 1, 0, False, False, False],
+    ]
+
+def test_disjoint_regions_are_kept_apart():
+    first = [[1, 1, 3, True, True, False], [2, 1, 0, False, False, False]]
+    second = [[10, 1, 0, True, True, False], [12, 1, 0, False, False, False]]
+    assert merge_segments([first, second]) == first + second
+
+def test_a_single_copy_is_returned_as_is():
+    assert merge_segments([SHARD_A]) is SHARD_A
+
+def function(count, region_count, branch_counts):
+    return {
+        'name': '$s5Alpha11CreateShiftV7executeyyF', 'count': count, 'filenames': ['/src/CreateShift.swift'],
+        'regions': [[1, 1, 6, 1, region_count, 0, 0, 0]],
+        'branches': [[3, 5, 3, 9, *branch_counts, 0, 0, 4]],
+    }
+
+def test_merge_exports_sums_files_and_duplicate_functions(tmp_path):
+    first = write_export(tmp_path / 'shard-1.json', [('/src/CreateShift.swift', SHARD_A)], [function(0, 0, (0, 0))])
+    second = write_export(tmp_path / 'shard-2.json',
+                          [('/src/CreateShift.swift', SHARD_B), ('/src/Helper.swift', SHARD_B)],
+                          [function(5, 5, (3, 2))])
+    output_path = tmp_path / 'merged.json'
+
+    info = merge_exports([first, second], output_path)
+
+    assert (info['exports'], info['entries'], info['files'], info['merged_files'], info['functions']) == (2, 3, 2, 1, 1)
+    data = json.loads(output_path.read_text())['data'][0]
+    files = {entry['filename']: entry for entry in data['files']}
+    assert files['/src/CreateShift.swift']['segments'] == merge_segments([SHARD_A, SHARD_B])
+    assert files['/src/Helper.swift']['segments'] == SHARD_B
+    # The two records of one function become one, with summed counts
+    [merged] = data['functions']
+    assert merged['count'] == 5
+    assert merged['regions'] == [[1, 1, 6, 1, 5, 0, 0, 0]]
+    assert merged['branches'] == [[3, 5, 3, 9, 3, 2, 0, 0, 4]]
+    summary = files['/src/CreateShift.swift']['summary']
+    assert (summary['functions']['count'], summary['functions']['covered']) == (1, 1)
+    assert data['totals']['lines']['count'] == sum(entry['summary']['lines']['count'] for entry in data['files'])
+
+def test_merge_is_reused_until_an_input_changes(make_package, capsys):
+    package = make_package('Alpha', [('CreateShift.swift', SHARD_A)])
+    write_export(package / '.build' / 'arm64-apple-macosx' / 'debug' / 'codecov' / 'Alpha.json',
+                 [(f'{package}/Sources/Alpha/CreateShift.swift', SHARD_B)])
+    export_paths = find_coverage_files(package)
+    assert len(export_paths) == 2
+
+    output_path = require_merged_coverage_file(package)
+    assert output_path == merged_export_path(package)
+    assert merge_inputs_path(output_path).name == 'Alpha.inputs.json'
+    assert merge_is_current(output_path, export_paths)
+    assert not merge_is_current(output_path, export_paths[:1])
+    capsys.readouterr()
+
+    require_merged_coverage_file(package)
+    assert 'Using merged coverage data' in capsys.readouterr().out
+
+    # A re-run of one shard's tests rewrites its export
+    stat = export_paths[0].stat()
+    os.utime(export_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not merge_is_current(output_path, export_paths)
+    require_merged_coverage_file(package)
+    assert 'Merged 2 file entries into 1 files' in capsys.readouterr().out
+    assert merge_is_current(output_path, export_paths)
@@ -0,0 +1,114 @@
+"""Coverage packs: written once from an export, read back without decoding JSON."""
+
+import os
+import struct
+
+import pytest
+
+from coverage_core import collect_coverage_stats
+from coverage_merge import require_merged_coverage_file
+from coverage_pack import (HEADER, PACK_VERSION, CoveragePack, default_pack_path, fresh_default_pack,
+                           load_pack_stats, write_coverage_pack)
+
+# Segments are [line, col, count, has_count, is_region_entry, is_gap_region]
+CREATE = [[1, 1, 5, True, True, False], [3, 5, 0, True, True, False], [5, 2, 0, True, True, False],
+          [6, 1, 5, True, False, False], [8, 1, 0, False, False, False]]
+# Out of position order, with a gap region
+LIST = [[12, 1, 0, True, True, False], [10, 3, 2, True, True, False], [12, 9, 0, True, True, True],
+        [14, 1, 0, False, False, False]]
+HELPER = [[2, 1, 1, True, True, False], [4, 1, 0, False, False, False]]
+
+@pytest.fixture
+def package(make_package):
+    return make_package('Alpha', [
+        ('UseCases/CreateShift.swift', HELPER),
+        ('Services/ListShifts.swift', LIST),
+        ('Helper.swift', HELPER),
+        # A repeated path keeps its last entry
+        ('UseCases/CreateShift.swift', CREATE),
+    ])
+
+def export_of(package):
+    return package / '.build' / 'debug' / 'codecov' / f'{package.name}.json'
+
+def test_pack_matches_the_analysis(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    info = write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    expected = collect_coverage_stats(export_of(package), 'Alpha')
+
+    assert info['files'] == 3
+    with CoveragePack(pack_path) as pack:
+        assert pack.package_name == 'Alpha'
+        assert pack.meta['filter'] is None
+        stats = pack.coverage_stats()
+    assert stats == expected
+    assert list(stats) == list(expected)
+    create = stats[f'{package}/Sources/Alpha/UseCases/CreateShift.swift']
+    assert create['line_coverage']['covered'] == 2 and create['line_coverage']['total'] == 5
+    assert create['uncovered_ranges'] == [{'line': 3, 'column': 5, 'end_line': 6, 'end_column': 1, 'regions': 2}]
+
+def test_segments_round_trip_in_position_order(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    with CoveragePack(pack_path) as pack:
+        index = pack.find(f'{package}/Sources/Alpha/Services/ListShifts.swift')
+        assert index is not None
+        assert pack.segments(index) == sorted(LIST)
+        assert pack.find(f'{package}/Sources/Alpha/Missing.swift') is None
+        assert pack.find('') is None
+
+def test_filtered_pack_records_its_filter(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export_of(package), pack_path, 'Alpha', filter_pattern='UseCases')
+    with CoveragePack(pack_path) as pack:
+        assert pack.meta['filter'] == 'UseCases'
+        assert [stats['relative_path'] for stats in pack.coverage_stats().values()] == ['UseCases/CreateShift.swift']
+
+def test_reading_with_a_filter(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    stats = load_pack_stats(pack_path, 'Alpha', 'Services')
+    assert [entry['relative_path'] for entry in stats.values()] == ['Services/ListShifts.swift']
+
+def test_load_pack_stats_rejects_another_package(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    with pytest.raises(SystemExit):
+        load_pack_stats(pack_path, 'Beta')
+
+def test_rejects_other_versions(tmp_path, package):
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    data = bytearray(pack_path.read_bytes())
+    magic, _, count = HEADER.unpack_from(data, 0)
+    HEADER.pack_into(data, 0, magic, PACK_VERSION - 1, count)
+    pack_path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='version'):
+        CoveragePack(pack_path)
+
+@pytest.mark.parametrize('content', [b'', b'not a pack', struct.pack('<8sII', b'COVPACK?', PACK_VERSION, 0)])
+def test_rejects_files_that_are_not_packs(tmp_path, content):
+    pack_path = tmp_path / 'broken.covpack'
+    pack_path.write_bytes(content)
+    with pytest.raises(ValueError):
+        CoveragePack(pack_path)
+
+def test_default_pack_is_reused_only_for_its_own_mode(package):
+    pack_path = default_pack_path(package)
+    write_coverage_pack(export_of(package), pack_path, 'Alpha')
+    assert fresh_default_pack(package) == pack_path
+    assert fresh_default_pack(package, merge=True) is None
+
+    # A pack of the merged export must not stand in for the single export
+    write_coverage_pack(require_merged_coverage_file(package), pack_path, 'Alpha')
+    assert fresh_default_pack(package) is None
+    assert fresh_default_pack(package, merge=True) == pack_path
+
+    # Nor for a merge of exports that have changed since
+    stat = export_of(package).stat()
+    os.utime(export_of(package), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert fresh_default_pack(package, merge=True) is None
+
+def test_filtered_default_pack_is_not_reused(package):
+    write_coverage_pack(export_of(package), default_pack_path(package), 'Alpha', 'UseCases')
+    assert fresh_default_pack(package) is None
@@ -0,0 +1,123 @@
+"""Patch coverage: unified diff parsing and lookups of the changed lines."""
+
+import pytest
+
+from coverage_diff import build_line_index, line_ranges
+from coverage_pack import CoveragePack, write_coverage_pack
+from coverage_patch import (export_line_indexes, pack_line_indexes, parse_unified_diff, patch_coverage,
+                            source_changes)
+
+SOURCE = 'ios/Packages/Alpha/Sources/Alpha/UseCases/CreateShift.swift'
+
+DIFF = f"""diff --git a/{SOURCE} b/{SOURCE}
+index 1111111..2222222 100644
+--- a/{SOURCE}
++++ b/{SOURCE}
+@@ -1,4 +1,5 @@
+ import Foundation
+-let old = 1
++let new = 1
++let added = 2
+
+ func keep() {{}}
+@@ -10,0 +12,3 @@ func keep() {{}}
++++ looks like a header
++second
++third
+\\ No newline at end of file
+diff --git a/Removed.swift b/Removed.swift
+deleted file mode 100644
+--- a/Removed.swift
++++ /dev/null
+@@ -1,2 +0,0 @@
+-gone
+-gone too
+diff --git a/README.md b/README.md
+--- a/README.md
++++ b/README.md
+@@ -3 +3 @@
+-before
++after
+@@ -8,2 +7,0 @@
+-deleted
+-deleted too
+"""
+
+def test_parse_unified_diff():
+    assert parse_unified_diff(DIFF.splitlines(keepends=True)) == {
+        SOURCE: {2, 3, 12, 13, 14},
+        'README.md': {3},
+    }
+
+@pytest.mark.parametrize('diff, expected', [
+    # Without the a/ and b/ prefixes (git diff --no-prefix), with a timestamp after the path
+    (['--- Foo.swift\t2024-01-01', '+++ Foo.swift\t2024-01-02', '@@ -1 +1,2 @@', ' same', '+new'],
+     {'Foo.swift': {2}}),
+    # Pure deletions and new empty files contribute nothing
+    (['--- a/Foo.swift', '+++ b/Foo.swift', '@@ -4,2 +3,0 @@', '-x', '-y'], {}),
+    (['--- /dev/null', '+++ b/Empty.swift'], {}),
+    ([], {}),
+])
+def test_parse_unified_diff_edge_cases(diff, expected):
+    assert parse_unified_diff(diff) == expected
+
+def test_source_changes_keeps_the_package_swift_sources():
+    changed = {
+        SOURCE: {2},
+        'ios/Packages/Alpha/Sources/Alpha/Root.swift': {1},
+        'ios/Packages/Alpha/Sources/Alpha/Resources/data.json': {1},
+        'ios/Packages/Alpha/Tests/AlphaTests/CreateShiftTests.swift': {1},
+        'ios/Packages/Beta/Sources/Beta/Other.swift': {1},
+        'README.md': {3},
+    }
+    assert source_changes(changed, 'Alpha') == {'UseCases/CreateShift.swift': {2}, 'Root.swift': {1}}
+
+# Lines 1 and 6 ran, 3 and 8 did not; other lines carry no segment
+SEGMENTS = [[1, 1, 5, True, True, False], [3, 5, 0, True, True, False], [6, 1, 5, True, False, False],
+            [8, 1, 0, False, False, False]]
+
+def test_patch_coverage_counts_changed_executable_lines():
+    indexes = {'UseCases/CreateShift.swift': build_line_index(SEGMENTS)}
+    changes = {'UseCases/CreateShift.swift': {1, 2, 3, 6, 8}, 'Services/New.swift': {1, 2}}
+    result = patch_coverage(changes, indexes, 'Alpha')
+
+    create = result['files']['UseCases/CreateShift.swift']
+    assert create['category'] == 'UseCases' and create['in_coverage']
+    assert (create['changed_lines'], create['executable_lines'], create['covered_lines']) == (5, 4, 2)
+    assert create['percentage'] == 50.0
+    assert create['uncovered'] == [(3, 3), (8, 8)]
+
+    missing = result['files']['Services/New.swift']
+    assert not missing['in_coverage'] and missing['executable_lines'] == 0 and missing['percentage'] is None
+    assert (result['covered_lines'], result['executable_lines'], result['percentage']) == (2, 4, 50.0)
+
+def test_patch_coverage_without_executable_lines():
+    result = patch_coverage({'Root.swift': {40}}, {'Root.swift': build_line_index(SEGMENTS)}, 'Alpha')
+    assert result['files']['Root.swift']['category'] == 'Root'
+    assert result['executable_lines'] == 0 and result['percentage'] is None
+
+def test_line_ranges():
+    assert line_ranges([]) == []
+    assert line_ranges([3, 4, 5, 8, 10, 11]) == [(3, 5), (8, 8), (10, 11)]
+
+@pytest.mark.parametrize('wanted', [{'UseCases/CreateShift.swift'}, {'UseCases/CreateShift.swift', 'Missing.swift'}])
+def test_export_and_pack_indexes_agree(tmp_path, make_package, wanted):
+    package = make_package('Alpha', [
+        ('UseCases/CreateShift.swift', [[1, 1, 0, True, True, False], [2, 1, 0, False, False, False]]),
+        ('Root.swift', SEGMENTS[:2]),
+        # A repeated file keeps its last entry, as in the reports
+        ('UseCases/CreateShift.swift', SEGMENTS),
+    ])
+    export = package / '.build' / 'debug' / 'codecov' / 'Alpha.json'
+
+    from_export = export_line_indexes(export, 'Alpha', wanted)
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export, pack_path, 'Alpha')
+    with CoveragePack(pack_path) as pack:
+        from_pack = pack_line_indexes(pack, wanted)
+
+    assert list(from_export) == list(from_pack) == ['UseCases/CreateShift.swift']
+    assert from_export['UseCases/CreateShift.swift'] == from_pack['UseCases/CreateShift.swift']
+    lines, hits, uncovered, covered = from_export['UseCases/CreateShift.swift']
+    assert list(lines) == [1, 3, 6, 8] and list(hits) == [5, 0, 5, 0]
+    assert uncovered == [(3, 5)] and covered == 2
@@ -0,0 +1,65 @@
+"""Segment engines: the columnar engines return exactly what the Python reference engine returns."""
+
+import json
+import random
+
+import pytest
+
+from coverage_core import SEGMENT_ENGINES, analyze_segments_python
+
+# Segments are [line, col, count, has_count, is_region_entry, is_gap_region]
+CASES = {
+    'empty': [],
+    'covered': [[1, 1, 3, True, True, False], [4, 2, 0, False, False, False]],
+    'uncovered at the end': [[1, 1, 3, True, True, False], [2, 5, 0, True, True, False]],
+    # Nested zero-count regions merge into one range; the gap region counts as a line but not a branch
+    'nested': [[1, 1, 5, True, True, False], [3, 5, 0, True, True, False], [4, 9, 0, True, True, False],
+               [5, 2, 0, True, False, False], [6, 1, 5, True, False, False], [7, 3, 0, True, True, True],
+               [8, 1, 0, False, False, False]],
+    # Several segments on one line, covered by any of them
+    'same line': [[2, 1, 0, True, True, False], [2, 9, 4, True, True, False], [2, 14, 0, True, False, False],
+                  [3, 1, 0, False, False, False]],
+    # A zero-count stretch without a region entry isn't reported
+    'no region entry': [[1, 1, 2, True, True, False], [2, 1, 0, True, False, False],
+                        [3, 1, 0, False, False, False]],
+    # Counts beyond 2**53 must still compare exactly with zero
+    'large counts': [[1, 1, 2 ** 63 + 1, True, True, False], [2, 1, 1, True, True, False],
+                     [3, 1, 0, False, False, False]],
+    # Older exports have no gap flag
+    'five columns': [[1, 1, 1, True, True], [2, 1, 0, True, True], [3, 1, 0, False, False]],
+}
+
+def random_segments(seed):
+    """Position-sorted segments with the counts and flags llvm-cov produces, from a fixed seed."""
+    rng = random.Random(seed)
+    segments = []
+    line = 1
+    for _ in range(rng.randint(1, 40)):
+        line += rng.choice([0, 0, 1, 1, 2, 5])
+        has_count = rng.random() < 0.85
+        segments.append([line, rng.randint(1, 80), rng.choice([0, 0, 0, 1, 7, 12345]) if has_count else 0,
+                         has_count, has_count and rng.random() < 0.7, rng.random() < 0.1])
+    segments.sort(key=lambda segment: (segment[0], segment[1]))
+    return segments
+
+CASES.update({f'random {seed}': random_segments(seed) for seed in range(40)})
+
+FORMS = {
+    'list': lambda segments: segments,
+    # As the streaming reader hands them over
+    'compact text': lambda segments: json.dumps(segments, separators=(',', ':')),
+    'indented text': lambda segments: json.dumps(segments, indent=2),
+}
+
+ENGINES = [engine if engine in SEGMENT_ENGINES else
+           pytest.param(engine, marks=pytest.mark.skip(reason=f'{engine} engine not available'))
+           for engine in ('array', 'numpy')]
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('form', FORMS)
+@pytest.mark.parametrize('case', CASES)
+def test_engines_match_the_python_engine(engine, form, case):
+    segments = CASES[case]
+    expected = analyze_segments_python(segments)
+    assert SEGMENT_ENGINES[engine](FORMS[form](segments)) == expected
+    assert analyze_segments_python(FORMS[form](segments)) == expected
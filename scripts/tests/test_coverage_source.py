@@ -0,0 +1,34 @@
+"""Annotated source pages follow the entry the statistics count."""
+
+import json
+
+from coverage_core import collect_coverage_stats
+from coverage_pack import write_coverage_pack
+from coverage_source import GAP_LINE, annotate_lines, write_source_pages
+
+RAN = [[1, 1, 7, True, True, False], [2, 1, 0, True, True, False], [3, 1, 0, False, False, False]]
+NEVER_RAN = [[1, 1, 0, True, True, False], [2, 1, 0, True, True, False], [3, 1, 0, False, False, False]]
+
+def read_page(pages_dir, page_id):
+    text = (pages_dir / f'{page_id}.js').read_text()
+    return json.loads(text[text.index(',') + 1:text.rindex(')')])
+
+def test_annotate_lines_marks_hits_and_gaps():
+    segments = [[1, 1, 3, True, True, False], [2, 5, 0, True, True, False], [5, 1, 0, False, False, False]]
+    assert annotate_lines(segments, 6) == [3, 0, GAP_LINE, GAP_LINE, 0, None]
+
+def test_repeated_file_is_annotated_from_its_last_entry(tmp_path, make_package):
+    package = make_package('Alpha', [('UseCases/A.swift', NEVER_RAN), ('UseCases/A.swift', RAN)])
+    source = package / 'Sources' / 'Alpha' / 'UseCases' / 'A.swift'
+    source.parent.mkdir(parents=True)
+    source.write_text('let a = 1\nlet b = 2\nlet c = 3\n')
+    export = package / '.build' / 'debug' / 'codecov' / 'Alpha.json'
+    stats = collect_coverage_stats(export, 'Alpha')
+
+    pages = write_source_pages(stats, package, tmp_path / 'from-export', coverage_file=export)
+    assert read_page(tmp_path / 'from-export', pages['UseCases/A.swift'])['hits'] == [7, 0, 0]
+
+    pack_path = tmp_path / 'Alpha.covpack'
+    write_coverage_pack(export, pack_path, 'Alpha')
+    pages = write_source_pages(stats, package, tmp_path / 'from-pack', pack_path=pack_path)
+    assert read_page(tmp_path / 'from-pack', pages['UseCases/A.swift'])['hits'] == [7, 0, 0]
@@ -0,0 +1,114 @@
+"""Coverage thresholds: validating threshold files, checking statistics and the gate's exit status."""
+
+import json
+import sys
+
+import pytest
+
+from coverage_core import build_coverage_summary, collect_coverage_stats
+from coverage_thresholds import VIOLATION_EXIT_STATUS, check_thresholds, main, parse_thresholds
+
+def file_stats(category, relative_path, lines, branches):
+    """Per-file statistics as the analysis produces them, from (covered, total) line and branch counts."""
+    line_pct = lines[0] / lines[1] * 100
+    branch_pct = branches[0] / branches[1] * 100
+    return {
+        'category': category,
+        'relative_path': relative_path,
+        'line_coverage': {'covered': lines[0], 'total': lines[1], 'percentage': line_pct},
+        'branch_coverage': {'covered': branches[0], 'total': branches[1], 'percentage': branch_pct},
+        'overall_percentage': (line_pct + branch_pct) / 2,
+    }
+
+STATS = {
+    '/src/Shifts/CreateShift.swift': file_stats('UseCases', 'UseCases/Shifts/CreateShift.swift', (5, 10), (1, 2)),
+    '/src/Shifts/ListShifts.swift': file_stats('UseCases', 'UseCases/Shifts/ListShifts.swift', (10, 10), (2, 2)),
+    '/src/Helper.swift': file_stats('Support', 'Helper.swift', (9, 10), (2, 2)),
+}
+
+def violated(violations):
+    return [(violation['scope'], violation['target'], violation['metric'], violation['rule'])
+            for violation in violations]
+
+def test_file_patterns_match_across_directories():
+    # '*' also matches '/', so the rule reaches files at any depth
+    thresholds = parse_thresholds({'files': {'*/UseCases/*': {'line': 80}}})
+    assert violated(check_thresholds(STATS, 'Alpha', thresholds)) == [
+        ('file', 'Alpha/UseCases/Shifts/CreateShift.swift', 'line', '*/UseCases/*')]
+
+def test_category_patterns_check_category_totals():
+    thresholds = parse_thresholds({'categories': {'Alpha/Use*': {'line': 80}, 'Beta/*': {'line': 100}}})
+    # UseCases totals 15/20 lines
+    assert violated(check_thresholds(STATS, 'Alpha', thresholds)) == [
+        ('category', 'Alpha/UseCases', 'line', 'Alpha/Use*')]
+
+def test_package_minimums_override_global_metric_by_metric():
+    # Package totals: 24/30 lines (80%), 5/6 branches (83.3%), 81.7% overall
+    thresholds = parse_thresholds({'global': {'line': 90, 'branch': 90},
+                                   'packages': {'Alpha': {'line': 75}}})
+    assert violated(check_thresholds(STATS, 'Alpha', thresholds)) == [('package', 'Alpha', 'branch', 'global')]
+    # Other packages still get every global minimum
+    assert violated(check_thresholds(STATS, 'Beta', thresholds)) == [
+        ('package', 'Beta', 'line', 'global'), ('package', 'Beta', 'branch', 'global')]
+
+def test_met_thresholds_have_no_violations():
+    thresholds = parse_thresholds({'global': {'overall': 80}, 'files': {'*': {'overall': 50}}})
+    assert check_thresholds(STATS, 'Alpha', thresholds) == []
+
+@pytest.mark.parametrize('config, where', [
+    ([], 'JSON object'),
+    ({'paths': {}}, 'paths'),
+    ({'global': 70}, 'global'),
+    ({'global': {'lines': 70}}, "unknown metric 'lines'"),
+    ({'global': {'overall': 101}}, 'global.overall'),
+    ({'global': {'overall': -1}}, 'global.overall'),
+    ({'global': {'overall': '70'}}, 'global.overall'),
+    ({'global': {'overall': True}}, 'global.overall'),
+    ({'packages': ['Alpha']}, 'packages'),
+    ({'files': {'*/UseCases/*': {'branch': None}}}, 'files.*/UseCases/*.branch'),
+])
+def test_malformed_thresholds_are_rejected(config, where):
+    with pytest.raises(ValueError, match=where.replace('*', r'\*').replace('.', r'\.')):
+        parse_thresholds(config)
+
+def test_minimums_are_normalized_to_floats():
+    thresholds = parse_thresholds({'global': {'overall': 70}, 'files': {'*': {'line': 50.5}}})
+    assert thresholds == {'global': {'overall': 70.0}, 'packages': {}, 'categories': [],
+                          'files': [('*', {'line': 50.5})]}
+
+# Segments are [line, col, count, has_count, is_region_entry, is_gap_region]; 25% of lines, no branches
+QUARTER_COVERED = [[1, 1, 2, True, True, False], [2, 1, 0, False, False, False],
+                   [3, 1, 0, True, True, False], [4, 1, 0, False, False, False]]
+
+@pytest.fixture
+def summary_dir(tmp_path, make_package):
+    package = make_package('Alpha', [('CreateShift.swift', QUARTER_COVERED)])
+    stats = collect_coverage_stats(package / '.build' / 'debug' / 'codecov' / 'Alpha.json', 'Alpha')
+    (package / 'coverage_summary.json').write_text(json.dumps(build_coverage_summary(stats, 'Alpha')))
+    return package
+
+def run_main(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['coverage_thresholds.py', *argv])
+    try:
+        main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+@pytest.mark.parametrize('minimum, status', [(25, 0), (30, VIOLATION_EXIT_STATUS)])
+def test_exit_status_for_met_and_missed_thresholds(tmp_path, monkeypatch, capsys, summary_dir, minimum, status):
+    thresholds = tmp_path / 'thresholds.json'
+    thresholds.write_text(json.dumps({'global': {'line': minimum}}))
+    assert run_main(monkeypatch, str(summary_dir), '--thresholds', str(thresholds)) == status
+    assert ('violation' in capsys.readouterr().out) == bool(status)
+
+@pytest.mark.parametrize('content', ['{"global": {"line": 200}}', 'not json'])
+def test_exit_status_for_a_bad_thresholds_file(tmp_path, monkeypatch, summary_dir, content):
+    thresholds = tmp_path / 'thresholds.json'
+    thresholds.write_text(content)
+    assert run_main(monkeypatch, str(summary_dir), '--thresholds', str(thresholds)) == 1
+
+def test_exit_status_for_a_missing_summary(tmp_path, monkeypatch):
+    thresholds = tmp_path / 'thresholds.json'
+    thresholds.write_text('{}')
+    assert run_main(monkeypatch, str(tmp_path / 'Missing'), '--thresholds', str(thresholds)) == 1